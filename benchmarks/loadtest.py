@@ -0,0 +1,371 @@
+"""
+Нагрузочная проверка бота: обработчики tg_API/core.py работают с локальным сервером,
+имитирующим Telegram Bot API (tg_API/fake_bot_api.py), и синтетическим каталогом во временной базе данных.
+
+Генератор нагрузки выполняет сценарий в --chats одновременных чатах (--iterations повторов в каждом чате):
+/low, выбор компонента, /custom, выбор компонента, ввод диапазона цен, следующая страница (кнопка перехода),
+/history и выбор записи истории. Каждый чат передает следующее обновление после завершения обработки
+предыдущего. Ответы бота проверяются по сценарию чата: наименование выбранного компонента и цены в заголовке,
+цены в подписях записей (минимальная цена для /low, введенный диапазон для /custom); ответ, не соответствующий
+сценарию, учитывается как ошибка. Выводятся пропускная способность (обновлений в секунду), процентили времени обработки
+(от передачи обновления до завершения обработчика), количество запросов к Bot API по методам и доля ошибок.
+
+Запуск: python -m benchmarks.loadtest --chats 50 --iterations 5 --output loadtest.json
+"""
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from argparse import ArgumentParser
+from json import dump
+from os import environ, path
+from random import Random
+from re import compile as re_compile
+from shutil import rmtree
+from tempfile import mkdtemp
+from threading import Event, Thread
+from time import perf_counter, time
+
+# Процентили времени обработки обновлений
+PERCENTILES = (50, 90, 99)
+# Диапазон цен, вводимый по команде /custom (в долларах)
+PRICE_RANGE = '100-400'
+# Стоимость в подписи записи (в конце подписи: "; 123.45$")
+CAPTION_PRICE = re_compile(r'; (\d+(?:\.\d+)?)\$$')
+# Тексты ответов бота об ошибках
+ERROR_REPLIES = ('Записи не найдены', 'Цены не заданы', 'Ошибка', 'Сначала выберите команду', 'Неожиданная команда')
+
+
+def percentile(values: List[float], percent: float) -> float:
+    """
+    Функция возвращает процентиль значений (ближайшее значение по рангу).
+
+    :param: values - упорядоченные значения.
+    :type: List[float]
+    :param: percent - процентиль (от 0 до 100).
+    :type: float
+    :return: - значение процентиля (0 для пустого списка).
+    :rtype: float
+    """
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, round(percent / 100 * len(values) + 0.5) - 1))]
+
+
+def check_replies(texts: List[str], headers: List[str],
+                  price_range: Optional[Tuple[float, float]] = None) -> Optional[str]:
+    """
+    Функция проверяет ответы бота на обновление по сценарию чата.
+
+    :param: texts - тексты (подписи изображений) сообщений бота, отправленных при обработке обновления.
+    :type: List[str]
+    :param: headers - строки, которые должны быть в ответах (наименование компонента и цены).
+    :type: List[str]
+    :param: price_range - диапазон цен записей в долларах (по умолчанию None - записи не проверяются).
+    :type: Optional[Tuple[float, float]]
+    :return: - описание несоответствия сценарию или None.
+    :rtype: Optional[str]
+    """
+    if not texts:
+        return 'нет ответа'
+    for reply in ERROR_REPLIES:
+        if any(reply in text for text in texts):
+            return f'ответ об ошибке ({reply})'
+    for header in headers:
+        if not any(header in text for text in texts):
+            return 'нет компонента или цен сценария в заголовке'
+    if price_range is not None:
+        prices = [float(match.group(1)) for match in map(CAPTION_PRICE.search, texts) if match]
+        if not prices:
+            return 'нет записей'
+        if any(not price_range[0] <= price <= price_range[1] for price in prices):
+            return 'цена записи вне диапазона сценария'
+    return None
+
+
+class ChatSession:
+    """
+    Класс ChatSession - чат пользователя генератора нагрузки: формирует обновления (сообщения и нажатия кнопок),
+    передает их серверу Bot API и ожидает завершения обработки каждого обновления ботом.
+
+    Ответы бота на каждое обновление проверяются по сценарию чата, несоответствие учитывается как ошибка шага.
+
+    Args:
+    chat_id (int): идентификатор чата (и пользователя)
+    server (FakeBotApiServer): сервер, имитирующий Bot API
+    timeout (float): время ожидания обработки обновления (в секундах)
+    names (Dict[str, str]): наименования компонентов для отображения в чате
+    prices (Dict[str, Tuple[int, int]]): минимальная и максимальная цены компонентов (в центах)
+
+    Attributes:
+    results (List[Tuple[str, float, Optional[str]]]): шаги сценария (наименование, время обработки, ошибка)
+    """
+    def __init__(self, chat_id: int, server: Any, timeout: float, names: Dict[str, str],
+                 prices: Dict[str, Tuple[int, int]]) -> None:
+        self.chat_id = chat_id
+        self.server = server
+        self.timeout = timeout
+        self.names = names
+        self.prices = prices
+        self.results: List[Tuple[str, float, Optional[str]]] = list()
+        self._done = Event()
+        self._error: Optional[str] = None
+        self._next_message_id = 1
+        self._user = {'id': chat_id, 'is_bot': False, 'first_name': f'user {chat_id}'}
+
+    def complete(self, error: Optional[BaseException]) -> None:
+        self._error = None if error is None else f'{type(error).__name__}: {error}'
+        self._done.set()
+
+    def _send(self, step: str, update: Dict, check: Optional[Callable[[List[str]], Optional[str]]]) -> None:
+        """
+        Метод передает обновление серверу, ожидает завершения его обработки ботом и проверяет ответы бота.
+
+        :param: step - наименование шага сценария.
+        :type: str
+        :param: update - обновление.
+        :type: Dict
+        :param: check - проверка ответов бота (возвращает описание несоответствия сценарию или None).
+        :type: Optional[Callable[[List[str]], Optional[str]]]
+        """
+        self._done.clear()
+        self._error = None
+        number_texts = len(self.server.texts(self.chat_id))
+        start_time = perf_counter()
+        self.server.push_update(update)
+        if self._done.wait(self.timeout):
+            latency = perf_counter() - start_time
+            error = self._error
+            if error is None and check is not None:
+                error = check(self.server.texts(self.chat_id, number_texts))
+                error = None if error is None else f'неверный ответ ({step}): {error}'
+            self.results.append((step, latency, error))
+        else:
+            self.results.append((step, perf_counter() - start_time, 'timeout'))
+
+    def message(self, step: str, text: str, check: Optional[Callable[[List[str]], Optional[str]]] = None) -> None:
+        self._next_message_id += 1
+        self._send(step, {'message': {'message_id': self._next_message_id, 'date': int(time()),
+                                      'chat': {'id': self.chat_id, 'type': 'private'},
+                                      'from': self._user, 'text': text}}, check)
+
+    def press(self, step: str, data: str, check: Optional[Callable[[List[str]], Optional[str]]] = None) -> None:
+        message = self.server.last_message(self.chat_id)
+        if message is None:
+            self.results.append((step, 0.0, 'нет сообщения с кнопками'))
+            return
+        self._send(step, {'callback_query': {'id': f'{self.chat_id}:{len(self.results)}', 'from': self._user,
+                                             'chat_instance': str(self.chat_id), 'data': data,
+                                             'message': message}}, check)
+
+    def run_script(self, component: str) -> None:
+        """
+        Метод выполняет сценарий: /low, /custom с диапазоном цен и следующей страницей, /history.
+
+        :param: component - компьютерный компонент, выбираемый в сценарии.
+        :type: str
+        """
+        from tg_API.common.page_cursor import NEXT, decode_page_cursor
+        name = self.names[component]
+        min_price, max_price = (price / 100 for price in self.prices[component])
+        price_from, price_up_to = (float(price) for price in PRICE_RANGE.split('-'))
+        range_header = f'{name}: цена от {price_from}$ до {price_up_to}$'
+
+        self.message('/low', '/low')
+        self.press('low: компонент', component,
+                   lambda texts: check_replies(texts, [f'{name}: минимальная цена {min_price}$'],
+                                               (min_price, min_price)))
+        self.message('/custom', '/custom')
+        self.press('custom: компонент', component,
+                   lambda texts: check_replies(texts, [f'{name}: минимальная цена {min_price}$',
+                                                       f'{name}: максимальная цена {max_price}$']))
+        self.message('custom: диапазон цен', PRICE_RANGE,
+                     lambda texts: check_replies(texts, [range_header], (price_from, price_up_to)))
+        next_buttons = [data for data in self.server.last_keyboard(self.chat_id)
+                        if decode_page_cursor(data) is not None and decode_page_cursor(data).direction == NEXT]
+        if next_buttons:
+            self.press('next_output', next_buttons[-1],
+                       lambda texts: check_replies(texts, [range_header], (price_from, price_up_to)))
+        self.message('/history', '/history', lambda texts: check_replies(texts, ['История запросов:']))
+        history_buttons = [data for data in self.server.last_keyboard(self.chat_id) if data.isdigit()]
+        if history_buttons:
+            # Первая запись истории - последний запрос чата (/custom с диапазоном цен)
+            self.press('history: запись', history_buttons[0],
+                       lambda texts: check_replies(texts, [range_header], (price_from, price_up_to)))
+
+
+def _completion_middleware(sessions: Dict[int, ChatSession]) -> Any:
+    """
+    Функция возвращает middleware бота, сообщающее чату генератора нагрузки о завершении обработки обновления.
+
+    :param: sessions - чаты генератора нагрузки по идентификатору чата.
+    :type: Dict[int, ChatSession]
+    :return: - middleware (telebot BaseMiddleware).
+    :rtype: BaseMiddleware
+    """
+    from telebot.handler_backends import BaseMiddleware
+
+    class CompletionMiddleware(BaseMiddleware):
+        def __init__(self) -> None:
+            super().__init__()
+            self.update_types = ['message', 'callback_query']
+
+        def pre_process(self, update: Any, data: Dict) -> None:
+            pass
+
+        def post_process(self, update: Any, data: Dict, exception: Optional[BaseException]) -> None:
+            message = getattr(update, 'message', None) or update
+            session = sessions.get(message.chat.id)
+            if session is not None:
+                session.complete(exception)
+
+    return CompletionMiddleware()
+
+
+def summarize(sessions: List[ChatSession], duration: float, method_calls: Dict[str, int]) -> Dict[str, Any]:
+    """
+    Функция формирует отчет: пропускная способность, процентили времени обработки (всего и по шагам сценария),
+    количество запросов к Bot API по методам и ошибки.
+
+    :param: sessions - чаты генератора нагрузки.
+    :type: List[ChatSession]
+    :param: duration - длительность нагрузки (в секундах).
+    :type: float
+    :param: method_calls - количество запросов к Bot API по методам.
+    :type: Dict[str, int]
+    :return: - отчет.
+    :rtype: Dict[str, Any]
+    """
+    results = [result for session in sessions for result in session.results]
+    steps: Dict[str, List[float]] = dict()
+    errors: Dict[str, int] = dict()
+    for step, latency, error in results:
+        steps.setdefault(step, list()).append(latency)
+        if error is not None:
+            errors[error] = errors.get(error, 0) + 1
+
+    def latency_summary(values: List[float]) -> Dict[str, float]:
+        values = sorted(values)
+        summary = {f'p{percent}': percentile(values, percent) for percent in PERCENTILES}
+        summary['max'] = values[-1] if values else 0.0
+        return summary
+
+    number_updates = len(results)
+    number_errors = sum(errors.values())
+    bot_api_calls = {method: count for method, count in sorted(method_calls.items()) if method != 'getUpdates'}
+    return {'updates': number_updates, 'duration': duration,
+            'throughput': number_updates / duration if duration else 0.0,
+            'latency': latency_summary([latency for _, latency, _ in results]),
+            'steps': {step: dict(latency_summary(values), count=len(values)) for step, values in steps.items()},
+            'bot_api_calls': bot_api_calls,
+            'bot_api_calls_per_update': sum(bot_api_calls.values()) / number_updates if number_updates else 0.0,
+            'get_updates_calls': method_calls.get('getUpdates', 0),
+            'errors': errors, 'error_rate': number_errors / number_updates if number_updates else 0.0}
+
+
+def print_report(report: Dict[str, Any], output: Callable[[str], None] = print) -> None:
+    def latency_line(name: str, summary: Dict[str, float], count: int) -> str:
+        values = ' '.join(f'{summary[key] * 1000:>9.1f}' for key in (*(f'p{p}' for p in PERCENTILES), 'max'))
+        return f'{name:<24} {count:>7} {values}'
+
+    output(f'Обновлений: {report["updates"]} за {report["duration"]:.1f} с, '
+           f'{report["throughput"]:.1f} обновлений/с, ошибок: {report["error_rate"]:.2%}')
+    header = ' '.join(f'{key:>9}' for key in (*(f'p{p}' for p in PERCENTILES), 'max'))
+    output(f'\n{"шаг (мс)":<24} {"кол-во":>7} {header}')
+    for step, summary in report['steps'].items():
+        output(latency_line(step, summary, summary['count']))
+    output(latency_line('всего', report['latency'], report['updates']))
+    output(f'\nЗапросы к Bot API ({report["bot_api_calls_per_update"]:.2f} на обновление, '
+           f'getUpdates: {report["get_updates_calls"]}):')
+    for method, count in report['bot_api_calls'].items():
+        output(f'  {method:<24} {count:>7}')
+    if report['errors']:
+        output('\nОшибки:')
+        for error, count in sorted(report['errors'].items(), key=lambda item: item[1], reverse=True):
+            output(f'  {count:>7}  {error}')
+
+
+def main() -> int:
+    parser = ArgumentParser(description='Нагрузочная проверка бота с имитацией Telegram Bot API')
+    parser.add_argument('--chats', type=int, default=20, help='количество одновременных чатов')
+    parser.add_argument('--iterations', type=int, default=3, help='количество повторов сценария в каждом чате')
+    parser.add_argument('--rows', type=int, default=2000, help='количество записей каталога по компоненту')
+    parser.add_argument('--components', default='gpu,processor,ram', help='компоненты сценария через запятую')
+    parser.add_argument('--latency', type=float, default=0.0, help='задержка ответов Bot API (в секундах)')
+    parser.add_argument('--timeout', type=float, default=30.0,
+                        help='время ожидания обработки обновления (в секундах)')
+    parser.add_argument('--seed', type=int, default=0, help='начальное значение генератора случайных чисел')
+    parser.add_argument('--output', help='файл отчета (JSON)')
+    args = parser.parse_args()
+
+    # Временная база данных и папка лога (параметры задаются до чтения настроек)
+    folder = mkdtemp(prefix='cc-loadtest-')
+    environ['DB_PATH'] = path.join(folder, 'loadtest.db')
+    environ['FOLDER_LOG'] = folder
+    try:
+        from peewee import Value
+        from telebot import apihelper
+        from benchmarks.suite import computer_components, generate_catalog
+        from tg_API.fake_bot_api import FakeBotApiServer
+
+        components = args.components.split(',')
+        unknown = [name for name in components if name not in computer_components]
+        if unknown:
+            parser.error(f'неизвестные компоненты: {", ".join(unknown)}')
+
+        server = FakeBotApiServer(latency=args.latency).start()
+        apihelper.API_URL = server.api_url
+        generate_catalog(components, args.rows, args.seed)
+        # Изображения компонентов загружаются с сервера, имитирующего Bot API
+        for name in components:
+            model = computer_components[name]
+            model.update(img=Value(server.image_url).concat(model.id).concat('.jpg')).execute()
+
+        from tg_API import core
+        from tg_API.utils.db import ComputerComponentDatabase
+        core.register_commands()
+        # Минимальная и максимальная цены компонентов для проверки ответов бота
+        prices = {name: (ComputerComponentDatabase.min_price()(name), ComputerComponentDatabase.max_price()(name))
+                  for name in components}
+        sessions = {chat_id: ChatSession(chat_id, server, args.timeout, core.names_computer_components, prices)
+                    for chat_id in range(1001, 1001 + args.chats)}
+        core.bot.use_class_middlewares = True
+        core.bot.middlewares = list()
+        core.bot.setup_middleware(_completion_middleware(sessions))
+        polling = Thread(target=core.bot.infinity_polling, kwargs={'timeout': 10, 'long_polling_timeout': 1},
+                         daemon=True)
+        polling.start()
+
+        random = Random(args.seed)
+        scripts = {chat_id: [random.choice(components) for _ in range(args.iterations)] for chat_id in sessions}
+
+        def run_chat(session: ChatSession) -> None:
+            for component in scripts[session.chat_id]:
+                session.run_script(component)
+
+        print(f'Нагрузка: {args.chats} чатов x {args.iterations} сценариев, каталог {args.rows} записей')
+        threads = [Thread(target=run_chat, args=(session,)) for session in sessions.values()]
+        start_time = perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        duration = perf_counter() - start_time
+        core.bot.stop_polling()
+        polling.join(5)
+        server.stop()
+
+        report = summarize(list(sessions.values()), duration, dict(server.method_calls))
+        report['meta'] = {'chats': args.chats, 'iterations': args.iterations, 'rows': args.rows,
+                          'components': components, 'latency': args.latency, 'seed': args.seed}
+        print_report(report)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as file:
+                dump(report, file, ensure_ascii=False, indent=2)
+    finally:
+        from database.core import db
+        if not db.is_closed():
+            db.close()
+        rmtree(folder, ignore_errors=True)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
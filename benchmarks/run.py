@@ -0,0 +1,106 @@
+"""
+Измерение производительности операций с каталогом компонентов на синтетических данных.
+
+Каталог заданного размера формируется во временной базе данных SQLite (реальные модели),
+измеряется время выполнения функций CRUD (min_value, max_value, records_in_range, records_by_single_value),
+преобразования записей (load_data_in_model, load_model_in_json) и формирования подписей записей.
+Результаты сохраняются в JSON и сравниваются с базовыми результатами (по умолчанию benchmarks/baseline.json,
+--baseline '' - без сравнения).
+
+Запуск: python -m benchmarks.run --output bench.json
+Обновление базовых результатов: python -m benchmarks.run --save-baseline
+Код завершения 1 - время выполнения хотя бы одной операции превышает базовое более чем в --threshold раз.
+"""
+from typing import Any, Dict
+from argparse import ArgumentParser
+from json import dump, load
+from os import environ, path
+from tempfile import mkdtemp
+from shutil import rmtree
+from sqlite3 import sqlite_version
+
+# Файл базовых результатов (хранится в репозитории, получен с параметрами запуска по умолчанию)
+BASELINE_FILE = path.join(path.dirname(path.abspath(__file__)), 'baseline.json')
+
+
+def _write_json(file_name: str, data: Dict[str, Any]) -> None:
+    with open(file_name, 'w', encoding='utf-8') as file:
+        dump(data, file, ensure_ascii=False, indent=2)
+
+
+def main() -> int:
+    parser = ArgumentParser(description='Измерение производительности операций с каталогом компонентов')
+    parser.add_argument('--rows', type=int, default=10000, help='количество записей по компоненту')
+    parser.add_argument('--components', default='gpu,processor,ram',
+                        help='компоненты через запятую ("all" - все компоненты)')
+    parser.add_argument('--repeat', type=int, default=5, help='количество серий измерений')
+    parser.add_argument('--min-time', type=float, default=0.2, help='минимальная длительность серии (в секундах)')
+    parser.add_argument('--seed', type=int, default=0, help='начальное значение генератора случайных чисел')
+    parser.add_argument('--output', help='файл результатов (JSON)')
+    parser.add_argument('--baseline', default=BASELINE_FILE,
+                        help='файл базовых результатов для сравнения (JSON, по умолчанию benchmarks/baseline.json, '
+                             '"" - без сравнения)')
+    parser.add_argument('--threshold', type=float, default=1.2,
+                        help='допустимое отношение времени к базовому (по умолчанию 1.2)')
+    parser.add_argument('--save-baseline', action='store_true', help='сохранить результаты в файл --baseline')
+    parser.add_argument('--keep-db', action='store_true', help='не удалять временную базу данных')
+    args = parser.parse_args()
+
+    # Временная база данных и папка лога (параметры задаются до чтения настроек)
+    folder = mkdtemp(prefix='cc-bench-')
+    environ['DB_PATH'] = path.join(folder, 'bench.db')
+    environ['FOLDER_LOG'] = folder
+    environ.setdefault('SLOW_QUERY_THRESHOLD', '60')
+    try:
+        from benchmarks.suite import computer_components, run_suite
+        components = sorted(computer_components) if args.components == 'all' else args.components.split(',')
+        unknown = [name for name in components if name not in computer_components]
+        if unknown:
+            parser.error(f'неизвестные компоненты: {", ".join(unknown)}')
+        results = run_suite(components, args.rows, args.seed, args.repeat, args.min_time, print)
+    finally:
+        if args.keep_db:
+            print(f'База данных: {environ["DB_PATH"]}')
+        else:
+            from database.core import db
+            if not db.is_closed():
+                db.close()
+            rmtree(folder, ignore_errors=True)
+
+    if args.output:
+        _write_json(args.output, results)
+    if not args.baseline:
+        return 0
+    if args.save_baseline or not path.exists(args.baseline):
+        _write_json(args.baseline, results)
+        print(f'Базовые результаты сохранены: {args.baseline}')
+        return 0
+
+    with open(args.baseline, encoding='utf-8') as file:
+        baseline = load(file)
+    baseline_meta = baseline.get('meta', dict())
+    if baseline_meta.get('rows') != args.rows:
+        print(f'Внимание: базовые результаты получены для {baseline_meta.get("rows")} записей')
+    if baseline_meta.get('python') != results['meta']['python'] or baseline_meta.get('sqlite') != sqlite_version:
+        print(f'Внимание: базовые результаты получены на Python {baseline_meta.get("python")}, '
+              f'SQLite {baseline_meta.get("sqlite")}')
+    from benchmarks.suite import compare
+    comparison = compare(results, baseline, args.threshold)
+    print(f'\n{"операция":<45} {"мс":>10} {"базовое":>10} {"отношение":>10}')
+    for item in comparison:
+        base = f'{item["baseline"] * 1000:>10.3f}' if item['baseline'] is not None else f'{"-":>10}'
+        ratio = f'{item["ratio"]:>10.2f}' if item['ratio'] is not None else f'{"-":>10}'
+        mark = ' РЕГРЕССИЯ' if item['regression'] else ''
+        print(f'{item["case"]:<45} {item["median"] * 1000:>10.3f} {base} {ratio}{mark}')
+    if args.output:
+        results['comparison'] = {'baseline': args.baseline, 'threshold': args.threshold, 'cases': comparison}
+        _write_json(args.output, results)
+    regressions = [item['case'] for item in comparison if item['regression']]
+    if regressions:
+        print(f'Регрессии ({len(regressions)}): {", ".join(regressions)}')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,209 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from datetime import datetime
+from platform import python_version
+from random import Random
+from sqlite3 import sqlite_version
+from statistics import mean, median
+from time import perf_counter
+from peewee import chunked
+from database.core import computer_components, crud, db, load_data_in_model, load_query_in_rows, load_model_in_json
+from site_API.fake_server import synthetic_records
+from tg_API.common.captions import render_caption
+from tg_API.common.printing_records import page_captions
+from tg_API.utils.watch import match_subscriptions
+
+# Версия формата результатов
+RESULTS_VERSION = 1
+# Количество записей в одном запросе вставки синтетических данных
+INSERT_BATCH_SIZE = 500
+# Доля записей каталога, попадающих в диапазон стоимости (запросы records_in_range)
+RANGE_FRACTION = 0.05
+# Количество записей страницы вывода (подписи записей)
+PAGE_SIZE = 10
+# Количество подписок на снижение стоимости (сопоставление подписок с новыми ценами)
+NUMBER_SUBSCRIPTIONS = 100000
+# Поля записей, которые не используются для поиска по значению
+_SERVICE_FIELDS = ('id', 'price', 'title', 'link', 'img')
+
+
+def generate_catalog(components: List[str], number_rows: int, seed: int) -> None:
+    """
+    Функция заполняет таблицы компонентов синтетическими записями (стоимость в центах, как после загрузки с API).
+    Записи формируются и вставляются пакетами, список всех записей в памяти не хранится.
+
+    :param: components - наименования компонентов.
+    :type: List[str]
+    :param: number_rows - количество записей по каждому компоненту.
+    :type: int
+    :param: seed - начальное значение генератора случайных чисел.
+    :type: int
+    """
+    random = Random(seed)
+    for name in components:
+        model = computer_components[name]
+        crud.delete()(db, model)
+        records = synthetic_records(name, model, number_rows, random)
+        with db.atomic():
+            for batch in chunked(records, INSERT_BATCH_SIZE):
+                for record in batch:
+                    record['price'] = int(record['price'] * 100)
+                model.insert_many(batch).execute()
+
+
+def _search_field(model: Any) -> Any:
+    return next(field for field in model._meta.sorted_fields if field.name not in _SERVICE_FIELDS)
+
+
+def build_cases(name: str, seed: int) -> List[Tuple[str, Callable[[], Any]]]:
+    """
+    Функция возвращает измеряемые операции по компоненту: функции CRUD (с выполнением запроса),
+    преобразование записей, формирование подписей записей страницы и сопоставление подписок с новыми ценами.
+
+    :param: name - наименование компонента.
+    :type: str
+    :param: seed - начальное значение генератора случайных чисел (параметры запросов).
+    :type: int
+    :return: - список пар (наименование операции, функция без аргументов).
+    :rtype: List[Tuple[str, Callable[[], Any]]]
+    """
+    model = computer_components[name]
+    random = Random(seed)
+    min_price = crud.min_value()(db, model, model.price, False)
+    max_price = crud.max_value()(db, model, model.price, False)
+    width = int((max_price - min_price) * RANGE_FRACTION)
+    price_from = random.randint(min_price, max_price - width)
+    price_up_to = price_from + width
+    search_field = _search_field(model)
+    search_value = getattr(model.select(search_field).limit(1).get(), search_field.name)
+
+    range_query = crud.records_in_range()(db, model, model.price, price_from, price_up_to)
+    rows = load_query_in_rows(range_query)
+    dicts = load_model_in_json(rows, *model._meta.sorted_field_names)
+    # Записи без идентификатора (как записи истории запросов): подписи формируются при выводе
+    history_rows = load_data_in_model(model, dicts)
+    for row in history_rows:
+        row.id = None
+    # Новые цены записей диапазона и подписки со случайными диапазонами цен
+    drop_prices = sorted(row.price for row in rows)
+    subscriptions = [(user_id, *sorted((random.randint(min_price, max_price), random.randint(min_price, max_price))))
+                     for user_id in range(NUMBER_SUBSCRIPTIONS)]
+
+    return [
+        ('min_value', lambda: crud.min_value()(db, model, model.price, False)),
+        ('max_value', lambda: crud.max_value()(db, model, model.price, False)),
+        ('records_in_range', lambda: load_query_in_rows(
+            crud.records_in_range()(db, model, model.price, price_from, price_up_to))),
+        ('records_by_single_value', lambda: load_query_in_rows(
+            crud.records_by_single_value()(db, model, search_field, search_value, model.price, True))),
+        ('load_data_in_model', lambda: load_data_in_model(model, dicts)),
+        ('load_model_in_json[query]', lambda: load_model_in_json(
+            crud.records_in_range()(db, model, model.price, price_from, price_up_to),
+            'title', 'link', 'price', 'img')),
+        ('load_model_in_json[rows]', lambda: load_model_in_json(rows, 'title', 'link', 'price', 'img')),
+        ('render_caption', lambda: [render_caption(row.title, row.link, row.price) for row in rows]),
+        ('page_captions[stored]', lambda: page_captions(name, rows, 1, PAGE_SIZE)),
+        ('page_captions[rendered]', lambda: page_captions(name, history_rows, 1, PAGE_SIZE)),
+        ('match_subscriptions', lambda: match_subscriptions(subscriptions, drop_prices)),
+    ]
+
+
+def measure(func: Callable[[], Any], repeat: int, min_time: float) -> Dict[str, Any]:
+    """
+    Функция измеряет время выполнения операции: операция выполняется серией вызовов
+    (не менее min_time секунд), серия повторяется repeat раз. Время указывается на один вызов.
+
+    :param: func - измеряемая операция (функция без аргументов).
+    :type: Callable[[], Any]
+    :param: repeat - количество серий.
+    :type: int
+    :param: min_time - минимальная длительность серии (в секундах).
+    :type: float
+    :return: - результаты: количество вызовов в серии, min, median, mean (в секундах).
+    :rtype: Dict[str, Any]
+    """
+    func()
+    number = 1
+    while True:
+        start_time = perf_counter()
+        for _ in range(number):
+            func()
+        duration = perf_counter() - start_time
+        if duration >= min_time or number >= 1 << 20:
+            break
+        number *= 2 if duration * 10 < min_time else 1 + int(min_time / max(duration, 1e-9))
+    timings = [duration / number]
+    for _ in range(repeat - 1):
+        start_time = perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((perf_counter() - start_time) / number)
+    return {'number': number, 'repeat': repeat, 'min': min(timings),
+            'median': median(timings), 'mean': mean(timings)}
+
+
+def run_suite(components: List[str], number_rows: int, seed: int, repeat: int, min_time: float,
+              progress: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+    """
+    Функция формирует синтетический каталог и измеряет время выполнения операций по каждому компоненту.
+
+    :param: components - наименования компонентов.
+    :type: List[str]
+    :param: number_rows - количество записей по каждому компоненту.
+    :type: int
+    :param: seed - начальное значение генератора случайных чисел.
+    :type: int
+    :param: repeat - количество серий измерений.
+    :type: int
+    :param: min_time - минимальная длительность серии (в секундах).
+    :type: float
+    :param: progress - функция вывода хода выполнения (по умолчанию None - не выводится).
+    :type: Optional[Callable[[str], None]]
+    :return: - результаты: параметры запуска (meta) и время операций (results, ключ - компонент/операция).
+    :rtype: Dict[str, Any]
+    """
+    start_time = perf_counter()
+    generate_catalog(components, number_rows, seed)
+    generation_time = perf_counter() - start_time
+    if progress:
+        progress(f'Каталог сформирован: {len(components)} x {number_rows} записей, {generation_time:.1f} с')
+
+    results: Dict[str, Dict] = dict()
+    for name in components:
+        for case_name, func in build_cases(name, seed):
+            key = f'{name}/{case_name}'
+            results[key] = measure(func, repeat, min_time)
+            if progress:
+                progress(f'{key:<45} {results[key]["median"] * 1000:>10.3f} мс')
+
+    return {'version': RESULTS_VERSION,
+            'meta': {'created_at': datetime.now().isoformat(timespec='seconds'),
+                     'python': python_version(), 'sqlite': sqlite_version, 'rows': number_rows,
+                     'components': components, 'seed': seed, 'repeat': repeat, 'min_time': min_time,
+                     'generation_seconds': generation_time},
+            'results': results}
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    """
+    Функция сравнивает результаты с базовыми результатами по медиане времени выполнения.
+
+    :param: results - результаты запуска.
+    :type: Dict[str, Any]
+    :param: baseline - базовые результаты.
+    :type: Dict[str, Any]
+    :param: threshold - допустимое отношение времени к базовому (например, 1.2 - замедление не более 20%).
+    :type: float
+    :return: - сравнение по операциям: операция, время, базовое время, отношение, признак регрессии.
+    :rtype: List[Dict[str, Any]]
+    """
+    comparison: List[Dict[str, Any]] = list()
+    for key, result in results['results'].items():
+        base = baseline.get('results', dict()).get(key)
+        if base is None:
+            comparison.append({'case': key, 'median': result['median'], 'baseline': None,
+                               'ratio': None, 'regression': False})
+            continue
+        ratio = result['median'] / base['median'] if base['median'] else float('inf')
+        comparison.append({'case': key, 'median': result['median'], 'baseline': base['median'],
+                           'ratio': ratio, 'regression': ratio > threshold})
+    return comparison
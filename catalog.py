@@ -0,0 +1,187 @@
+"""
+Выгрузка и загрузка каталога компьютерных компонентов в формате NDJSON (при расширении .gz - со сжатием gzip).
+
+Выгрузка: python catalog.py export catalog.ndjson.gz [--history]
+Загрузка: python catalog.py import catalog.ndjson.gz [--clear]
+
+Файл выгрузки содержит для каждой таблицы строку заголовка {"table": <наименование>, "columns": [<столбцы>]},
+за которой следуют строки записей таблицы (списки значений в порядке столбцов заголовка).
+Хеши, подписи и индекс совместимости записей не выгружаются: при загрузке они строятся по загруженным записям
+компонентов так же, как при загрузке данных с API.
+"""
+from typing import Dict, IO, Iterator, List, Tuple
+from argparse import ArgumentParser
+from gzip import open as gzip_open
+from json import dumps, loads
+from time import monotonic
+from uuid import uuid4
+from database.core import crud, db, computer_components, update, history
+from database.common.models import ModelBase
+from database.utils.CRUD import SQLITE_MAX_VARIABLES
+from tg_API.utils.db import ComputerComponentDatabase
+
+# Таблицы каталога: компьютерные компоненты и даты их следующего обновления
+catalog_tables: Dict = dict(computer_components, **update)
+
+
+def _open(file_name: str, mode: str) -> IO[str]:
+    """
+    Функция открывает файл выгрузки в текстовом режиме (файлы с расширением .gz - со сжатием gzip).
+
+    :param: file_name - имя файла.
+    :type: str
+    :param: mode - режим открытия файла ('r' или 'w').
+    :type: str
+    :return: - файловый объект.
+    :rtype: IO[str]
+    """
+    if file_name.endswith('.gz'):
+        return gzip_open(file_name, f'{mode}t', encoding='utf8')
+    return open(file_name, mode, encoding='utf8')
+
+
+def export_catalog(file_name: str, with_history: bool = False) -> Dict[str, int]:
+    """
+    Функция выгружает таблицы каталога в файл NDJSON. Записи читаются из базы данных
+    курсором и записываются в файл по одной, без загрузки таблицы в память.
+
+    :param: file_name - имя файла выгрузки.
+    :type: str
+    :param: with_history - True: выгружается также таблица истории запросов (по умолчанию False).
+    :type: bool
+    :return: numbers - количество выгруженных записей. Ключ - наименование таблицы, значение - количество.
+    :rtype: Dict[str, int]
+    """
+    db_retrieve = crud.retrieve()
+    tables: Dict = dict(catalog_tables, **history) if with_history else catalog_tables
+    numbers: Dict[str, int] = dict()
+    with _open(file_name, 'w') as file, db.atomic():
+        for name, model in tables.items():
+            columns: List[str] = list(model._meta.sorted_field_names)
+            file.write(dumps({'table': name, 'columns': columns}, ensure_ascii=False))
+            file.write('\n')
+            numbers[name] = 0
+            for row in db_retrieve(db, model).tuples().iterator():
+                file.write(dumps(row, ensure_ascii=False, default=str))
+                file.write('\n')
+                numbers[name] += 1
+    return numbers
+
+
+def _read_tables(file: IO[str]) -> Iterator[Tuple[str, List[str], Iterator[List]]]:
+    """
+    Функция последовательно читает таблицы из файла выгрузки.
+
+    :param: file - файловый объект выгрузки.
+    :type: IO[str]
+    :return: - наименование таблицы, столбцы и записи таблицы (читаются из файла по мере обработки).
+    :rtype: Iterator[Tuple[str, List[str], Iterator[List]]]
+    """
+    lines = (loads(line) for line in file if line.strip())
+    header = next(lines, None)
+    while header is not None:
+        if not isinstance(header, dict) or 'table' not in header:
+            raise ValueError(f'Ожидается заголовок таблицы, получено: {str(header)[:50]}')
+        next_header: List = [None]
+
+        def rows() -> Iterator[List]:
+            for line in lines:
+                if isinstance(line, dict):
+                    next_header[0] = line
+                    return
+                yield line
+
+        table_rows = rows()
+        yield header['table'], header['columns'], table_rows
+        # Дочитывание записей таблицы, не обработанных вызывающей функцией
+        for _ in table_rows:
+            pass
+        header = next_header[0]
+
+
+def _store_batch(name: str, model: ModelBase, batch: List[Dict], run_id: str) -> None:
+    """
+    Функция сохраняет пакет записей таблицы (существующие записи заменяются). Для компьютерных компонентов
+    в том же пакете сохраняются хеши и подписи записей и строки индекса совместимости (как при загрузке
+    данных с API), поэтому следующее обновление с API сохраняет только изменившиеся записи.
+
+    :param: name - наименование таблицы.
+    :type: str
+    :param: model - модель таблицы.
+    :type: ModelBase
+    :param: batch - пакет записей.
+    :type: List[Dict]
+    :param: run_id - идентификатор загрузки каталога.
+    :type: str
+    """
+    crud.upsert()(db, model, batch)
+    if name in computer_components and batch:
+        ComputerComponentDatabase.store_record_indexes()(name, batch, run_id)
+
+
+def import_catalog(file_name: str, clear: bool = False) -> Dict[str, int]:
+    """
+    Функция загружает таблицы из файла выгрузки в базу данных одной транзакцией.
+    Записи сохраняются пакетами, существующие записи (по ключевому полю) заменяются.
+    Для компьютерных компонентов сохраняются хеши и подписи записей и индекс совместимости.
+    Таблицы, отсутствующие в базе данных, пропускаются.
+
+    :param: file_name - имя файла выгрузки.
+    :type: str
+    :param: clear - True: записи загружаемых таблиц (и их хеши, подписи и строки индекса совместимости)
+    предварительно удаляются (по умолчанию False).
+    :type: bool
+    :return: numbers - количество загруженных записей. Ключ - наименование таблицы, значение - количество.
+    :rtype: Dict[str, int]
+    """
+    db_delete = crud.delete()
+    db_delete_record_indexes = ComputerComponentDatabase.delete_record_indexes()
+    run_id: str = uuid4().hex
+    tables: Dict = dict(catalog_tables, **history)
+    numbers: Dict[str, int] = dict()
+    with _open(file_name, 'r') as file, db.atomic():
+        for name, columns, rows in _read_tables(file):
+            model = tables.get(name)
+            if model is None:
+                continue
+            if clear:
+                db_delete(db, model)
+                if name in computer_components:
+                    db_delete_record_indexes(name)
+            batch_size: int = max(1, SQLITE_MAX_VARIABLES // len(columns))
+            batch: List[Dict] = list()
+            numbers[name] = 0
+            for row in rows:
+                batch.append(dict(zip(columns, row)))
+                if len(batch) >= batch_size:
+                    _store_batch(name, model, batch, run_id)
+                    numbers[name] += len(batch)
+                    batch = list()
+            _store_batch(name, model, batch, run_id)
+            numbers[name] += len(batch)
+    return numbers
+
+
+def main() -> None:
+    parser = ArgumentParser(description='Выгрузка и загрузка каталога компьютерных компонентов (NDJSON)')
+    commands = parser.add_subparsers(dest='command', required=True)
+    parser_export = commands.add_parser('export', help='выгрузить каталог в файл')
+    parser_export.add_argument('file_name', help='имя файла (.ndjson или .ndjson.gz)')
+    parser_export.add_argument('--history', action='store_true', help='выгрузить также историю запросов')
+    parser_import = commands.add_parser('import', help='загрузить каталог из файла')
+    parser_import.add_argument('file_name', help='имя файла (.ndjson или .ndjson.gz)')
+    parser_import.add_argument('--clear', action='store_true', help='удалить записи загружаемых таблиц')
+    args = parser.parse_args()
+
+    start = monotonic()
+    if args.command == 'export':
+        numbers = export_catalog(args.file_name, args.history)
+    else:
+        numbers = import_catalog(args.file_name, args.clear)
+    for name, number in numbers.items():
+        print(f'{name}: {number}')
+    print(f'Всего записей: {sum(numbers.values())}, время: {monotonic() - start:.2f} с')
+
+
+if __name__ == '__main__':
+    main()
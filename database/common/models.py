@@ -1,14 +1,101 @@
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterable, List, Optional
 from datetime import datetime
+from threading import Lock
+from time import perf_counter
 import peewee as pw
 from playhouse.sqlite_ext import JSONField
-from settings import SiteSettings
-
-# Общие параметры
-site = SiteSettings()
-
-# База данных
-db = pw.SqliteDatabase(site.db_path)
+from settings import get_settings
+from startup import startup_timer
+from metrics.core import db_query_seconds
+from metrics.tracing import span
+from database.utils.query_log import query_statistics, slow_query_log
+
+
+class LazySqliteDatabase(pw.SqliteDatabase):
+    """
+    Класс LazySqliteDatabase - база данных SQLite с отложенной инициализацией.
+    Путь к базе данных читается из общих параметров, а таблицы зарегистрированных моделей
+    создаются один раз - при первом подключении к базе данных (а не при импорте модулей).
+    Родитель: pw.SqliteDatabase
+
+    Args:
+    **kwargs: параметры подключения к базе данных SQLite
+    """
+    def __init__(self, **kwargs) -> None:
+        super().__init__(None, **kwargs)
+        self._init_kwargs = kwargs
+        self._table_models: List[pw.Model] = list()
+        self._tables_created = False
+        self._init_lock = Lock()
+
+    def register_tables(self, models: Iterable[pw.Model]) -> None:
+        """
+        Метод регистрирует модели, таблицы которых создаются при первом подключении к базе данных.
+        Если база данных уже используется, таблицы создаются сразу.
+
+        :param: models - классы-модели.
+        :type: Iterable[pw.Model]
+        """
+        models = list(models)
+        with self._init_lock:
+            self._table_models.extend(models)
+            if self._tables_created:
+                self.create_tables(models)
+
+    def connect(self, reuse_if_open: bool = False) -> bool:
+        """
+        Метод открывает подключение к базе данных. При первом подключении база данных
+        инициализируется (путь из общих параметров) и создаются таблицы зарегистрированных моделей.
+
+        :param: reuse_if_open - не открывать новое подключение, если подключение уже открыто.
+        :type: bool
+        :return: - True, если открыто новое подключение.
+        :rtype: bool
+        """
+        if self.deferred:
+            with self._init_lock:
+                if self.deferred:
+                    self.init(get_settings().db_path, **self._init_kwargs)
+        result = super().connect(reuse_if_open)
+        if not self._tables_created:
+            with self._init_lock:
+                if not self._tables_created:
+                    with startup_timer.stage('database'):
+                        self.create_tables(self._table_models)
+                    self._tables_created = True
+        return result
+
+    def execute_sql(self, sql: str, params=None):
+        """
+        Метод выполняет SQL запрос. Время выполнения добавляется в трассировку обновления Telegram
+        и в статистику по видам запросов, медленные запросы записываются в журнал с планом выполнения.
+        """
+        start_time = perf_counter()
+        with span('db'):
+            cursor = super().execute_sql(sql, params)
+        duration = perf_counter() - start_time
+        shape = query_statistics.shape(sql)
+        query_statistics.observe(shape, duration)
+        slow_query_log.record(self._state.conn, shape, sql, params, duration)
+        return cursor
+
+    def execute(self, query, **context_options):
+        """
+        Метод выполняет запрос. Время выполнения запросов, сформированных функциями CRUD
+        (атрибут crud_function), добавляется в гистограмму db_query_seconds.
+        """
+        function_name = getattr(query, 'crud_function', None)
+        if function_name is None:
+            return super().execute(query, **context_options)
+        start_time = perf_counter()
+        try:
+            return super().execute(query, **context_options)
+        finally:
+            db_query_seconds.observe(perf_counter() - start_time, function_name)
+
+
+# База данных (режим WAL: чтение не блокирует запись при параллельном обновлении компонентов)
+db = LazySqliteDatabase(timeout=30, pragmas={'journal_mode': 'wal'})
 
 
 def dict_key_by_value(set_dict: Dict, set_value: Any) -> Optional[Any]:
@@ -66,10 +153,10 @@ class Update(ModelBase):
 
     Attributes:
     computer_component (pw.TextField): наименование компьютерного компонента
-    update_date (pw.DateField): дата следующего обновления
+    update_date (pw.DateTimeField): дата, время следующего обновления
     """
     computer_component = pw.TextField()
-    update_date = pw.DateField()
+    update_date = pw.DateTimeField()
 
 
 class History(ModelBase):
@@ -95,6 +182,158 @@ class History(ModelBase):
     result = JSONField()
 
 
+class RowHash(ModelBase):
+    """
+    Класс RowHash - описывает хеши содержимого записей компьютерных компонентов.
+    Используется для определения изменившихся записей при обновлении данных с API.
+    Родитель: ModelBase
+
+    Attributes:
+    computer_component (pw.TextField): наименование компьютерного компонента
+    record_id (pw.TextField): идентификатор компонента
+    row_hash (pw.TextField): хеш содержимого записи
+    run_id (pw.TextField): идентификатор последней загрузки, в которой получена запись
+    """
+    computer_component = pw.TextField()
+    record_id = pw.TextField()
+    row_hash = pw.TextField()
+    run_id = pw.TextField(null=True)
+
+    class Meta:
+        primary_key = pw.CompositeKey('computer_component', 'record_id')
+
+
+class Checkpoint(ModelBase):
+    """
+    Класс Checkpoint - описывает контрольные точки загрузки компьютерных компонентов с API.
+    Контрольная точка сохраняется после каждой сохраненной страницы данных и удаляется
+    после завершения загрузки. По контрольной точке прерванная загрузка продолжается.
+    Родитель: ModelBase
+
+    Attributes:
+    computer_component (pw.TextField): наименование компьютерного компонента (ключевое поле)
+    run_id (pw.TextField): идентификатор загрузки
+    param_offset (pw.IntegerField): смещение для запроса следующей страницы данных
+    page_size (pw.IntegerField): количество запрашиваемых позиций
+    updated_at (pw.DateTimeField): дата, время сохранения контрольной точки
+    """
+    computer_component = pw.TextField(primary_key=True)
+    run_id = pw.TextField()
+    param_offset = pw.IntegerField(default=0)
+    page_size = pw.IntegerField()
+    updated_at = pw.DateTimeField(default=datetime.now)
+
+
+class PriceChange(ModelBase):
+    """
+    Класс PriceChange - описывает журнал изменений стоимости компьютерных компонентов.
+    Родитель: ModelBase
+
+    Attributes:
+    computer_component (pw.TextField): наименование компьютерного компонента
+    record_id (pw.TextField): идентификатор компонента
+    price_old (pw.IntegerField): прежняя стоимость компонента
+    price_new (pw.IntegerField): новая стоимость компонента
+    changed_at (pw.DateTimeField): дата, время изменения стоимости
+    """
+    computer_component = pw.TextField()
+    record_id = pw.TextField()
+    price_old = pw.IntegerField()
+    price_new = pw.IntegerField()
+    changed_at = pw.DateTimeField(default=datetime.now)
+
+    class Meta:
+        indexes = ((('computer_component', 'record_id'), False),)
+
+
+class Caption(ModelBase):
+    """
+    Класс Caption - описывает подписи записей компьютерных компонентов для вывода в чат
+    (формируются при загрузке данных с API, без нумерации).
+    Родитель: ModelBase
+
+    Attributes:
+    computer_component (pw.TextField): наименование компьютерного компонента
+    record_id (pw.TextField): идентификатор компонента
+    version (pw.IntegerField): версия шаблона подписи
+    caption (pw.TextField): текст подписи (Markdown)
+    """
+    computer_component = pw.TextField()
+    record_id = pw.TextField()
+    version = pw.IntegerField()
+    caption = pw.TextField()
+
+    class Meta:
+        primary_key = pw.CompositeKey('computer_component', 'record_id')
+
+
+class Lease(ModelBase):
+    """
+    Класс Lease - описывает аренды (блокировки с ограниченным сроком действия) процессов.
+    Аренду одновременно удерживает только один процесс (держатель), держатель продлевает аренду
+    до истечения срока. Аренду с истекшим сроком может получить другой процесс.
+    Родитель: ModelBase
+
+    Attributes:
+    name (pw.TextField): наименование аренды (ключевое поле, например 'ingest')
+    holder (pw.TextField): идентификатор процесса-держателя аренды
+    expires_at (pw.DateTimeField): дата, время истечения срока аренды
+    updated_at (pw.DateTimeField): дата, время получения или продления аренды
+    """
+    name = pw.TextField(primary_key=True)
+    holder = pw.TextField()
+    expires_at = pw.DateTimeField()
+    updated_at = pw.DateTimeField(default=datetime.now)
+
+
+class Subscription(ModelBase):
+    """
+    Класс Subscription - описывает подписки пользователей на снижение стоимости компьютерных компонентов.
+    После загрузки данных с API пользователь получает уведомление о записях компонента,
+    стоимость которых снизилась и находится в диапазоне цен подписки.
+    Родитель: ModelBase
+
+    Attributes:
+    user_id (pw.IntegerField): ИД пользователя (чата)
+    computer_component (pw.TextField): наименование компьютерного компонента
+    price_from (pw.IntegerField): стоимость компонента от (в центах)
+    price_up_to (pw.IntegerField): стоимость компонента до (в центах)
+    created_at (pw.DateTimeField): дата, время подписки
+    """
+    user_id = pw.IntegerField()
+    computer_component = pw.TextField()
+    price_from = pw.IntegerField(default=0)
+    price_up_to = pw.IntegerField()
+    created_at = pw.DateTimeField(default=datetime.now)
+
+    class Meta:
+        indexes = ((('user_id', 'computer_component', 'price_from', 'price_up_to'), True),
+                   (('computer_component',), False))
+
+
+class Compatibility(ModelBase):
+    """
+    Класс Compatibility - описывает индекс совместимости компьютерных компонентов: нормализованные
+    атрибуты совместимости записей (тип разъема процессоров и материнских плат, тип оперативной памяти
+    материнских плат и модулей памяти). Формируется при загрузке данных с API.
+    Родитель: ModelBase
+
+    Attributes:
+    computer_component (pw.TextField): наименование компьютерного компонента
+    record_id (pw.TextField): идентификатор компонента
+    attribute (pw.TextField): атрибут совместимости (socket, memory)
+    value (pw.TextField): нормализованное значение атрибута (например 'LGA1151', 'DDR4')
+    """
+    computer_component = pw.TextField()
+    record_id = pw.TextField()
+    attribute = pw.TextField()
+    value = pw.TextField()
+
+    class Meta:
+        primary_key = pw.CompositeKey('computer_component', 'record_id', 'attribute')
+        indexes = ((('computer_component', 'attribute', 'value'), False),)
+
+
 class PowerSupply(ModelBaseComputerComponents):
     """
     Класс PowerSupply - моделирует параметры блока питания.
@@ -1,7 +1,11 @@
 from typing import Dict, List, TypeVar
+from operator import attrgetter
+from peewee import ModelSelect
 from .utils.CRUD import CRUDInterface
+from .utils.rows import ModelRow, get_field_map
 from .common.models import db, ModelBase, Case, CaseFan, CpuFan, Gpu, Keyboard, Motherboard
 from .common.models import Mouse, PowerSupply, Processor, Ram, Storage, Update, History
+from .common.models import RowHash, PriceChange, Checkpoint, Caption, Lease, Subscription, Compatibility
 
 T = TypeVar("T")
 
@@ -23,56 +27,104 @@ history_table: Dict = {'created_at': None, 'user_id': None, 'command': None, 'co
 # Словарь таблицы обновлений компьютерных компонентов в базе данных
 update: Dict = {'update': Update}
 
-db.connect()
-# Создание таблиц базы данных
-db.create_tables(history.values())
-db.create_tables(update.values())
-db.create_tables(computer_components.values())
+# Словарь таблицы хешей записей компьютерных компонентов в базе данных
+row_hash: Dict = {'row_hash': RowHash}
+
+# Словарь таблицы контрольных точек загрузки компьютерных компонентов в базе данных
+checkpoint: Dict = {'checkpoint': Checkpoint}
+
+# Словарь таблицы журнала изменений стоимости компьютерных компонентов в базе данных
+price_change: Dict = {'price_change': PriceChange}
+
+# Словарь таблицы подписей записей компьютерных компонентов в базе данных
+caption: Dict = {'caption': Caption}
+
+# Словарь таблицы аренд процессов в базе данных
+lease: Dict = {'lease': Lease}
+
+# Словарь таблицы подписок пользователей на снижение стоимости компьютерных компонентов в базе данных
+subscription: Dict = {'subscription': Subscription}
+
+# Словарь таблицы индекса совместимости компьютерных компонентов в базе данных
+compatibility: Dict = {'compatibility': Compatibility}
+
+# Регистрация таблиц базы данных (таблицы создаются при первом подключении к базе данных)
+db.register_tables(history.values())
+db.register_tables(update.values())
+db.register_tables(row_hash.values())
+db.register_tables(price_change.values())
+db.register_tables(checkpoint.values())
+db.register_tables(caption.values())
+db.register_tables(lease.values())
+db.register_tables(subscription.values())
+db.register_tables(compatibility.values())
+db.register_tables(computer_components.values())
 
 crud = CRUDInterface()
 
 
-def load_data_in_model(model: T, data: List[Dict]) -> List[T]:
+def load_data_in_model(model: T, data: List[Dict]) -> List[ModelRow]:
     """
-    Функция преобразует список словарей в список экземпляров моделей.
+    Функция преобразует список словарей в список легких записей модели (экземпляры моделей не создаются).
+    Атрибуты записей соответствуют полям модели, отсутствующие в словаре поля получают значения по умолчанию.
 
     :param: model - класс-модель представляемого объекта.
     :type: T
     :param: data - список словарей с данными об объекте.
     :type: List[Dict]
-    :return: models - список созданных экземпляров моделей с данными из словаря.
-    :rtype: List[T]
+    :return: - список легких записей модели с данными из словаря.
+    :rtype: List[ModelRow]
+    """
+    row_from_dict = get_field_map(model).row_from_dict
+    return [row_from_dict(i_data) for i_data in data]
+
+
+def load_query_in_rows(query: ModelSelect) -> List[ModelRow]:
+    """
+    Функция выполняет запрос и возвращает результаты в виде легких записей модели
+    (строки читаются кортежами, экземпляры моделей не создаются).
+
+    :param: query - запрос к таблице модели (объект ModelSelect).
+    :type: ModelSelect
+    :return: - список легких записей модели.
+    :rtype: List[ModelRow]
     """
-    models: List[T] = list()
-    for i_data in data:
-        model_instance = model()
-        for i_key, i_value in i_data.items():
-            if hasattr(model_instance, i_key):
-                setattr(model_instance, i_key, i_value)
-        models.append(model_instance)
-    return models
+    field_map = get_field_map(query.model)
+    row_class = field_map.row_class
+    return [row_class(*row) for row in query.select(*field_map.fields).tuples()]
 
 
 def load_model_in_json(data, *columns: str) -> List[Dict]:
     """
-    Функция преобразует результаты запроса (объект ModelSelect) или
-    список экземпляров моделей в список словарей с заданными полями.
+    Функция преобразует результаты запроса (объект ModelSelect), список экземпляров моделей
+    или легких записей в список словарей с заданными полями.
+    Невыполненный запрос читается кортежами только по заданным полям.
 
-    :param: data - результаты запроса (объект ModelSelect) или
-    список экземпляров моделей.
+    :param: data - результаты запроса (объект ModelSelect), список экземпляров моделей или легких записей.
     :type: ModelSelect
     :param: *columns - перечень полей, по которым данные преобразуются в список словарей.
     :type: str
-    :return: data_dict - список словарей с данными результатов запроса.
+    :return: - список словарей с данными результатов запроса.
     :rtype: List[Dict]
     """
-    data_dict: List[Dict] = list()
-    for i_element, element in enumerate(data):
-        data_dict.append(dict())
-        for column in columns:
-            if hasattr(element, column):
-                data_dict[i_element][column] = getattr(element, column)
-    return data_dict
+    if isinstance(data, ModelSelect) and data._cursor_wrapper is None:
+        field_map = get_field_map(data.model)
+        names = field_map.columns(columns)
+        if not names:
+            return [dict() for _ in data]
+        query = data.select(*[field_map.by_name[name] for name in names]).tuples()
+        return [dict(zip(names, row)) for row in query]
+
+    data = list(data)
+    if not data:
+        return list()
+    names = [column for column in columns if hasattr(data[0], column)]
+    if not names:
+        return [dict() for _ in data]
+    getter = attrgetter(*names)
+    if len(names) == 1:
+        return [{names[0]: getter(element)} for element in data]
+    return [dict(zip(names, getter(element))) for element in data]
 
 
 def load_columns(model: T, data: List[Dict]) -> List[ModelBase]:
@@ -83,14 +135,10 @@ def load_columns(model: T, data: List[Dict]) -> List[ModelBase]:
     :type: T
     :param: data - список словарей с данными об объекте.
     :type: List[Dict]
-    :return: model_columns - список атрибутов класса-модели (столбцов таблицы в базе данных).
+    :return: - список атрибутов класса-модели (столбцов таблицы в базе данных).
     :rtype: List[ModelBase]
     """
-    model_columns: List[ModelBase] = list()
-    for i_data in data:
-        for i_key in i_data:
-            if hasattr(model, i_key):
-                attr: ModelBase = getattr(model, i_key)
-                model_columns.append(attr)
-        break
-    return model_columns
+    if not data:
+        return list()
+    field_map = get_field_map(model)
+    return [field_map.by_name[name] for name in field_map.columns(tuple(data[0]))]
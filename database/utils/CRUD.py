@@ -1,11 +1,43 @@
-from typing import Dict, List, TypeVar, Optional, Any
-from peewee import ModelSelect, fn
+from typing import Dict, List, TypeVar, Optional, Any, Callable
+from functools import wraps
+from time import perf_counter
+from peewee import ModelSelect, BaseQuery, fn, chunked
 from ..common.models import ModelBase
 from ..common.models import db
+from metrics.core import db_query_seconds
 
 T = TypeVar("T")
 
+# Максимальное количество параметров в одном SQL запросе SQLite
+SQLITE_MAX_VARIABLES = 999
 
+
+def _timed(function_name: str) -> Callable:
+    """
+    Декоратор функций CRUD: время выполнения функции добавляется в гистограмму db_query_seconds.
+    Если функция возвращает невыполненный запрос, запросу назначается наименование функции
+    (сохраняется в копиях запроса), время выполнения запроса учитывается базой данных при выполнении.
+
+    :param: function_name - наименование функции CRUD (метка гистограммы).
+    :type: str
+    :return: - декоратор.
+    :rtype: Callable
+    """
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start_time = perf_counter()
+            response = func(*args, **kwargs)
+            if isinstance(response, BaseQuery):
+                response.crud_function = function_name
+            else:
+                db_query_seconds.observe(perf_counter() - start_time, function_name)
+            return response
+        return wrapper
+    return decorator
+
+
+@_timed('create')
 def _store_data(database: db, model: T, *data: List[Dict]) -> None:
     """
     Функция сохранения в базу данных.
@@ -21,6 +53,88 @@ def _store_data(database: db, model: T, *data: List[Dict]) -> None:
         model.insert_many(*data).execute()
 
 
+@_timed('upsert')
+def _upsert_data(database: db, model: T, data: List[Dict]) -> None:
+    """
+    Функция сохранения в базу данных с заменой существующих записей (по ключевому полю).
+    Данные сохраняются пакетами, размер пакета не превышает ограничение SQLite
+    на количество параметров в одном запросе.
+
+    :param: database - база данных.
+    :type: db
+    :param: model - модель объекта.
+    :type: T
+    :param: data - список словарей с данными объекта.
+    :type: List[Dict]
+    """
+    if not data:
+        return
+    batch_size: int = max(1, SQLITE_MAX_VARIABLES // len(data[0]))
+    with database.atomic():
+        for batch in chunked(data, batch_size):
+            model.insert_many(batch).on_conflict_replace().execute()
+
+
+@_timed('delete_by_values')
+def _delete_by_values(database: db, model: T, column: ModelBase, values: List[Any], *conditions) -> int:
+    """
+    Функция удаляет записи в заданной таблице, где значения по заданному столбцу
+    входят в заданный список значений. Удаление выполняется пакетами.
+
+    :param: database - база данных.
+    :type: db
+    :param: model - модель объекта (таблица базы данных).
+    :type: T
+    :param: column - столбец по которому выполняется поиск удаляемых записей.
+    :type: ModelBase
+    :param: values - список значений по заданному столбцу.
+    :type: List[Any]
+    :param: *conditions - дополнительные условия отбора удаляемых записей.
+    :type: Expression
+    :return: response - количество удаленных записей.
+    :rtype: int
+    """
+    response: int = 0
+    with database.atomic():
+        for batch in chunked(values, SQLITE_MAX_VARIABLES - len(conditions)):
+            query = model.delete().where(column.in_(batch), *conditions)
+            response += query.execute()
+
+    return response
+
+
+@_timed('update_by_values')
+def _update_by_values(database: db, model: T, data: Dict, column: ModelBase,
+                      values: List[Any], *conditions) -> int:
+    """
+    Функция обновляет заданные столбцы записей в заданной таблице, где значения по заданному столбцу
+    входят в заданный список значений. Обновление выполняется пакетами.
+
+    :param: database - база данных.
+    :type: db
+    :param: model - модель объекта (таблица базы данных).
+    :type: T
+    :param: data - словарь новых значений. Ключ - наименование столбца, значение - новое значение.
+    :type: Dict
+    :param: column - столбец по которому выполняется поиск обновляемых записей.
+    :type: ModelBase
+    :param: values - список значений по заданному столбцу.
+    :type: List[Any]
+    :param: *conditions - дополнительные условия отбора обновляемых записей.
+    :type: Expression
+    :return: response - количество обновленных записей.
+    :rtype: int
+    """
+    response: int = 0
+    with database.atomic():
+        for batch in chunked(values, SQLITE_MAX_VARIABLES - len(data) - len(conditions)):
+            query = model.update(**data).where(column.in_(batch), *conditions)
+            response += query.execute()
+
+    return response
+
+
+@_timed('retrieve')
 def _retrieve_all_data(database: db, model: T, *columns: ModelBase) -> ModelSelect:
     """
     Функция чтения данных из базы. Возвращаются все записи по заданным столбцам.
@@ -38,6 +152,7 @@ def _retrieve_all_data(database: db, model: T, *columns: ModelBase) -> ModelSele
     return response
 
 
+@_timed('count')
 def _counting_records(database: db, model: T) -> int:
     """
     Функция возвращает количество записей в заданной таблице.
@@ -55,6 +170,7 @@ def _counting_records(database: db, model: T) -> int:
     return response
 
 
+@_timed('min_value')
 def _min_value(database: db, model: T, column: ModelBase, zero_values: bool) -> Optional[Any]:
     """
     Функция возвращает минимальное значение в заданной таблице по заданному полю.
@@ -81,6 +197,7 @@ def _min_value(database: db, model: T, column: ModelBase, zero_values: bool) ->
     return response
 
 
+@_timed('max_value')
 def _max_value(database: db, model: T, column: ModelBase, zero_values: bool) -> Optional[Any]:
     """
     Функция возвращает максимальное значение в заданной таблице по заданному полю.
@@ -106,6 +223,7 @@ def _max_value(database: db, model: T, column: ModelBase, zero_values: bool) ->
     return response
 
 
+@_timed('records_in_range')
 def _records_in_range(database: db, model: T, column: ModelBase,
                       min_value: Any, max_value: Any) -> ModelSelect:
     """
@@ -131,6 +249,7 @@ def _records_in_range(database: db, model: T, column: ModelBase,
     return response
 
 
+@_timed('records_by_single_value')
 def _records_by_single_value(database: db, model: T, column: ModelBase,
                              value: Any, column_order_by: ModelBase,
                              sorting_direction: bool = False) -> ModelSelect:
@@ -163,6 +282,7 @@ def _records_by_single_value(database: db, model: T, column: ModelBase,
     return response
 
 
+@_timed('delete')
 def _delete_all_data(database: db, model: T) -> None:
     """
     Функция удаляет все записи в заданной таблице.
@@ -176,6 +296,7 @@ def _delete_all_data(database: db, model: T) -> None:
         model.delete().execute()
 
 
+@_timed('update')
 def _update_data(database: db, model: T, data: List[ModelBase], columns: List[ModelBase]) -> int:
     """
     Функция обновляет (сохраняет) несколько записей в базе данных.
@@ -199,6 +320,7 @@ def _update_data(database: db, model: T, data: List[ModelBase], columns: List[Mo
     return response
 
 
+@_timed('save')
 def _save_data(database: db, model: ModelBase) -> int:
     """
     Функция сохраняет одну запись в базу данных.
@@ -229,6 +351,10 @@ class CRUDInterface:
     def create():
         return _store_data
 
+    @staticmethod
+    def upsert():
+        return _upsert_data
+
     @staticmethod
     def retrieve():
         return _retrieve_all_data
@@ -241,6 +367,14 @@ class CRUDInterface:
     def delete():
         return _delete_all_data
 
+    @staticmethod
+    def delete_by_values():
+        return _delete_by_values
+
+    @staticmethod
+    def update_by_values():
+        return _update_by_values
+
     @staticmethod
     def update():
         return _update_data
@@ -0,0 +1,201 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from collections import deque
+from re import compile
+from threading import Lock
+from time import monotonic
+from metrics.core import Metric, registry, format_labels, format_value
+from settings import get_settings
+from log.logging import Logging
+from log.pipeline import payload
+
+# Количество последних значений времени выполнения, по которым вычисляются процентили (для каждого вида запроса)
+SAMPLE_SIZE = 1024
+# Максимальное количество видов запросов (остальные учитываются вместе как '(other)')
+MAX_SHAPES = 500
+# Время хранения плана выполнения запроса (в секундах)
+PLAN_TTL = 300.0
+# Процентили времени выполнения запросов
+QUANTILES = (0.5, 0.99)
+# Запросы, для которых формируется план выполнения (EXPLAIN QUERY PLAN)
+EXPLAINED_STATEMENTS = ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH', 'REPLACE')
+
+# Списки параметров и числовые значения в тексте запроса (вид запроса не зависит от их количества и значений)
+_PARAMETER_LIST = compile(r'\?(?:\s*,\s*\?)+')
+_NUMBER = compile(r'(?<![\w"])\d+(?:\.\d+)?(?![\w"])')
+_SPACES = compile(r'\s+')
+
+# Общие параметры
+site = get_settings()
+# Журнал медленных запросов
+logger = Logging('sql', file_name='sql.log').get_logger()
+
+
+def statement_shape(sql: str) -> str:
+    """
+    Функция возвращает вид запроса: текст запроса, в котором списки параметров
+    и числовые значения (например, LIMIT и OFFSET) заменены знаком '?'.
+
+    :param: sql - текст запроса.
+    :type: str
+    :return: - вид запроса.
+    :rtype: str
+    """
+    shape = _PARAMETER_LIST.sub('?, ...', sql)
+    shape = _NUMBER.sub('?', shape)
+    return _SPACES.sub(' ', shape).strip()
+
+
+def _quantile(values: List[float], quantile: float) -> float:
+    return values[min(len(values) - 1, int(quantile * len(values)))]
+
+
+class QueryStatistics(Metric):
+    """
+    Класс QueryStatistics - статистика выполнения SQL запросов по видам запросов:
+    количество, суммарное время и процентили времени выполнения (по последним SAMPLE_SIZE значениям).
+    Выводится в метриках как summary db_statement_seconds{statement, quantile}.
+    Родитель: Metric
+
+    """
+    type_name = 'summary'
+
+    def __init__(self) -> None:
+        super().__init__('db_statement_seconds', 'Время выполнения SQL запросов по видам запросов (в секундах)',
+                         ('statement',))
+        # Вид запроса: количество, суммарное время, последние значения времени выполнения
+        self._statements: Dict[str, List] = dict()
+        self._shapes: Dict[str, str] = dict()
+
+    def shape(self, sql: str) -> str:
+        """
+        Метод возвращает вид запроса (виды запросов кешируются по тексту запроса).
+
+        :param: sql - текст запроса.
+        :type: str
+        :return: - вид запроса.
+        :rtype: str
+        """
+        shape = self._shapes.get(sql)
+        if shape is None:
+            shape = statement_shape(sql)
+            if len(self._shapes) < MAX_SHAPES * 4:
+                self._shapes[sql] = shape
+        return shape
+
+    def observe(self, shape: str, duration: float) -> None:
+        """
+        Метод добавляет время выполнения запроса в статистику.
+
+        :param: shape - вид запроса.
+        :type: str
+        :param: duration - время выполнения запроса (в секундах).
+        :type: float
+        """
+        with self._lock:
+            item = self._statements.get(shape)
+            if item is None:
+                if len(self._statements) >= MAX_SHAPES:
+                    shape = '(other)'
+                    item = self._statements.get(shape)
+                if item is None:
+                    item = self._statements[shape] = [0, 0.0, deque(maxlen=SAMPLE_SIZE)]
+            item[0] += 1
+            item[1] += duration
+            item[2].append(duration)
+
+    def summary(self) -> List[Tuple[str, int, float, float, float]]:
+        """
+        Метод возвращает статистику по видам запросов, упорядоченную по суммарному времени выполнения.
+
+        :return: - вид запроса, количество, суммарное время, p50 и p99 (в секундах).
+        :rtype: List[Tuple[str, int, float, float, float]]
+        """
+        with self._lock:
+            items = [(shape, count, total, sorted(durations))
+                     for shape, (count, total, durations) in self._statements.items()]
+        return sorted(((shape, count, total, _quantile(durations, 0.5), _quantile(durations, 0.99))
+                       for shape, count, total, durations in items), key=lambda item: item[2], reverse=True)
+
+    def samples(self) -> List[str]:
+        lines = list()
+        for shape, count, total, p50, p99 in self.summary():
+            for quantile, value in zip(QUANTILES, (p50, p99)):
+                labels = format_labels(self.label_names, (shape,), f'quantile="{quantile}"')
+                lines.append(f'{self.name}{labels} {format_value(value)}')
+            lines.append(f'{self.name}_sum{format_labels(self.label_names, (shape,))} {format_value(total)}')
+            lines.append(f'{self.name}_count{format_labels(self.label_names, (shape,))} {count}')
+        return lines
+
+
+class SlowQueryLog:
+    """
+    Класс SlowQueryLog - журнал медленных SQL запросов: запросы, выполняемые дольше порога,
+    записываются в журнал с параметрами и планом выполнения (EXPLAIN QUERY PLAN).
+    План выполнения кешируется по виду запроса на PLAN_TTL секунд.
+
+    Args:
+    threshold (float): порог времени выполнения запроса (в секундах)
+    """
+    def __init__(self, threshold: float) -> None:
+        self.threshold = threshold
+        self._plans: Dict[str, Tuple[float, str]] = dict()
+        self._lock = Lock()
+
+    def _plan(self, connection: Any, shape: str, sql: str, params: Optional[Sequence]) -> str:
+        """
+        Метод возвращает план выполнения запроса (EXPLAIN QUERY PLAN).
+
+        :param: connection - подключение к базе данных, в котором выполнялся запрос.
+        :type: Any
+        :param: shape - вид запроса.
+        :type: str
+        :param: sql - текст запроса.
+        :type: str
+        :param: params - параметры запроса.
+        :type: Optional[Sequence]
+        :return: - план выполнения запроса.
+        :rtype: str
+        """
+        now = monotonic()
+        with self._lock:
+            cached = self._plans.get(shape)
+        if cached is not None and now - cached[0] < PLAN_TTL:
+            return cached[1]
+        if not sql.lstrip().upper().startswith(EXPLAINED_STATEMENTS):
+            return ''
+        try:
+            rows = connection.execute(f'EXPLAIN QUERY PLAN {sql}', params or ()).fetchall()
+        except Exception as exc:
+            return f'план выполнения не получен: {exc}'
+        plan = '\n'.join(f'{row[0]} {row[1]} {row[-1]}' for row in rows)
+        with self._lock:
+            if len(self._plans) >= MAX_SHAPES:
+                self._plans.clear()
+            self._plans[shape] = (now, plan)
+        return plan
+
+    def record(self, connection: Any, shape: str, sql: str, params: Optional[Sequence], duration: float) -> None:
+        """
+        Метод записывает медленный запрос в журнал (если время выполнения не меньше порога).
+
+        :param: connection - подключение к базе данных, в котором выполнялся запрос.
+        :type: Any
+        :param: shape - вид запроса.
+        :type: str
+        :param: sql - текст запроса.
+        :type: str
+        :param: params - параметры запроса.
+        :type: Optional[Sequence]
+        :param: duration - время выполнения запроса (в секундах).
+        :type: float
+        """
+        if duration < self.threshold:
+            return
+        logger.warning('Медленный запрос %.1f мс\n%s\nпараметры: %s\nплан выполнения:\n%s',
+                       duration * 1000, sql, payload(params), self._plan(connection, shape, sql, params))
+
+
+# Статистика выполнения SQL запросов по видам запросов
+query_statistics: QueryStatistics = registry.register(QueryStatistics())
+# Журнал медленных SQL запросов
+slow_query_log = SlowQueryLog(site.slow_query_threshold)
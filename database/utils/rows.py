@@ -0,0 +1,111 @@
+from typing import Any, Callable, Dict, List, Tuple, Type
+from threading import Lock
+from ..common.models import ModelBase
+
+
+class ModelRow:
+    """
+    Класс ModelRow - базовый класс легких записей (без экземпляра модели peewee).
+    Для каждой модели создается наследник с атрибутами (__slots__) по полям модели
+    и сгенерированным конструктором, значения атрибутов передаются в порядке полей модели.
+
+    """
+    __slots__ = ()
+    _fields: Tuple[str, ...] = ()
+
+    def __init__(self, *values: Any) -> None:
+        for name, value in zip(self._fields, values):
+            setattr(self, name, value)
+
+    def __repr__(self) -> str:
+        values = ', '.join(f'{name}={getattr(self, name)!r}' for name in self._fields)
+        return f'{type(self).__name__}({values})'
+
+
+def _row_init(names: Tuple[str, ...]) -> Callable:
+    """
+    Функция генерирует конструктор легкой записи с присваиванием атрибутов без цикла
+    (аналогично collections.namedtuple).
+
+    :param: names - наименования полей модели.
+    :type: Tuple[str, ...]
+    :return: - конструктор легкой записи.
+    :rtype: Callable
+    """
+    arguments = ', '.join(names)
+    assignments = '\n    '.join(f'self.{name} = {name}' for name in names) or 'pass'
+    namespace: Dict[str, Any] = dict()
+    exec(f'def __init__(self, {arguments}):\n    {assignments}', namespace)
+    return namespace['__init__']
+
+
+class FieldMap:
+    """
+    Класс FieldMap - предварительно подготовленное описание полей модели для преобразования данных.
+
+    Args:
+    model (Type[ModelBase]): класс-модель
+
+    Attributes:
+    model (Type[ModelBase]): класс-модель
+    names (Tuple[str, ...]): наименования полей модели (в порядке столбцов таблицы)
+    fields (Tuple[Field, ...]): поля (атрибуты) модели
+    defaults (Tuple[Any, ...]): значения полей по умолчанию
+    name_set (frozenset): множество наименований полей
+    by_name (Dict[str, Field]): поля модели по наименованию
+    row_class (Type[ModelRow]): класс легкой записи модели
+    """
+    def __init__(self, model: Type[ModelBase]) -> None:
+        self.model = model
+        self.fields = tuple(model._meta.sorted_fields)
+        self.names = tuple(field.name for field in self.fields)
+        self.defaults = tuple(None if callable(field.default) else field.default for field in self.fields)
+        self.name_set = frozenset(self.names)
+        self.by_name: Dict[str, Any] = dict(zip(self.names, self.fields))
+        self.row_class: Type[ModelRow] = type(f'{model.__name__}Row', (ModelRow,),
+                                              {'__slots__': self.names, '_fields': self.names,
+                                               '__init__': _row_init(self.names)})
+
+    def columns(self, names: Tuple[str, ...]) -> List[str]:
+        """
+        Метод возвращает наименования из заданного перечня, соответствующие полям модели.
+
+        :param: names - перечень наименований.
+        :type: Tuple[str, ...]
+        :return: - наименования полей модели.
+        :rtype: List[str]
+        """
+        return [name for name in names if name in self.name_set]
+
+    def row_from_dict(self, data: Dict) -> ModelRow:
+        """
+        Метод создает легкую запись по словарю. Отсутствующие в словаре поля получают значения по умолчанию,
+        ключи, не соответствующие полям модели, пропускаются.
+
+        :param: data - словарь с данными записи.
+        :type: Dict
+        :return: - легкая запись модели.
+        :rtype: ModelRow
+        """
+        return self.row_class(*map(data.get, self.names, self.defaults))
+
+
+# Описания полей моделей (создаются при первом обращении)
+_field_maps: Dict[Type[ModelBase], FieldMap] = dict()
+_field_maps_lock = Lock()
+
+
+def get_field_map(model: Type[ModelBase]) -> FieldMap:
+    """
+    Функция возвращает описание полей модели.
+
+    :param: model - класс-модель.
+    :type: Type[ModelBase]
+    :return: - описание полей модели.
+    :rtype: FieldMap
+    """
+    field_map = _field_maps.get(model)
+    if field_map is None:
+        with _field_maps_lock:
+            field_map = _field_maps.setdefault(model, FieldMap(model))
+    return field_map
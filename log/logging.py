@@ -1,16 +1,141 @@
+from typing import Dict, List, Tuple
 from os import path, mkdir
 from json import load
-from logging import getLogger
-from logging.config import dictConfig
-from settings import SiteSettings
+from copy import deepcopy
+from queue import Queue
+from threading import RLock
+from atexit import register
+from logging import getLogger, Logger, Handler, Formatter
+from logging.config import DictConfigurator
+from settings import get_settings
+from startup import startup_timer
+from .pipeline import BoundedQueueHandler, RoutingQueueListener
 
 # Общие параметры
-site = SiteSettings()
+site = get_settings()
 # Наименование папки с логом
 folder_log: str = site.folder_log
 # Наименование конфигурационного файла
 logging_config_file: str = site.logging_config_file
 
+# Прочитанные файлы конфигурации логирования (файл читается один раз)
+_dict_configs: Dict[str, Dict] = dict()
+# Настроенные объекты Logger (ключ - наименование, шаблон и log файл)
+_loggers: Dict[Tuple[str, str, str], Logger] = dict()
+# Созданные обработчики (ключ - наименование обработчика в конфигурации и log файл). Обработчик создается
+# один раз и используется всеми объектами Logger, которые выводят записи в тот же log файл (консоль)
+_handlers: Dict[Tuple[str, str], Handler] = dict()
+_loggers_lock = RLock()
+
+# Очередь записей лога: объекты Logger передают записи в очередь без ожидания,
+# сообщения формируются и выводятся в файлы и консоль фоновым потоком
+_log_queue: Queue = Queue(maxsize=site.log_queue_size)
+_queue_handler = BoundedQueueHandler(_log_queue)
+# Обработчики (консоль, log файл) по наименованию объекта Logger
+_routes: Dict[str, List[Handler]] = dict()
+_listener = RoutingQueueListener(_log_queue, _routes, site.log_max_message_length)
+
+
+def _stop_listener() -> None:
+    """
+    Функция останавливает фоновый поток записи лога (оставшиеся в очереди записи выводятся).
+    """
+    if _listener._thread is not None:
+        _listener.stop()
+
+
+register(_stop_listener)
+
+
+def _read_config(config_file: str) -> Dict:
+    """
+    Функция возвращает копию конфигурации логирования. Файл конфигурации читается один раз.
+
+    :param: config_file - наименование файла конфигурации.
+    :type: str
+    :return: - конфигурация логирования.
+    :rtype: Dict
+    """
+    dict_config = _dict_configs.get(config_file)
+    if dict_config is None:
+        with open(config_file, "r") as file:
+            dict_config = _dict_configs.setdefault(config_file, load(file))
+    return deepcopy(dict_config)
+
+
+def _configure_handlers(dict_config: Dict, handler_names: List[str], file_name: str) -> List[Handler]:
+    """
+    Функция возвращает обработчики объекта Logger. Недостающие обработчики создаются по конфигурации
+    логирования (обработчикам с log файлом назначается заданный log файл), ранее созданные обработчики
+    не изменяются.
+
+    :param: dict_config - конфигурация логирования.
+    :type: Dict
+    :param: handler_names - наименования обработчиков в конфигурации.
+    :type: List[str]
+    :param: file_name - путь к log файлу.
+    :type: str
+    :return: - обработчики.
+    :rtype: List[Handler]
+    """
+    configurator = DictConfigurator(dict_config)
+    formatters = configurator.config["formatters"]
+    handlers: List[Handler] = list()
+    for handler_name in handler_names:
+        handler_config = configurator.config["handlers"][handler_name]
+        key = (handler_name, file_name if "filename" in handler_config else "")
+        handler = _handlers.get(key)
+        if handler is None:
+            if "filename" in handler_config:
+                handler_config["filename"] = file_name
+            formatter = handler_config.get("formatter")
+            if formatter in formatters and not isinstance(formatters[formatter], Formatter):
+                formatters[formatter] = configurator.configure_formatter(formatters[formatter])
+            handler = _handlers[key] = configurator.configure_handler(handler_config)
+        handlers.append(handler)
+    return handlers
+
+
+def _configure_logger(name: str, template: str, file_name: str, config_file: str) -> Logger:
+    """
+    Функция настраивает объект Logger один раз (при первом обращении) по шаблону из конфигурации логирования.
+    Создаются только обработчики, которых еще нет (каждый log файл записывается отдельным обработчиком),
+    ранее настроенные объекты Logger и фоновый поток записи лога не перенастраиваются.
+    Обработчики переносятся в фоновый поток записи лога, объекту Logger назначается обработчик очереди.
+
+    :param: name - наименование объекта Logger.
+    :type: str
+    :param: template - наименование шаблона.
+    :type: str
+    :param: file_name - путь к log файлу.
+    :type: str
+    :param: config_file - наименование файла конфигурации.
+    :type: str
+    :return: - объект Logger.
+    :rtype: Logger
+    """
+    key = (name, template, file_name)
+    logger = _loggers.get(key)
+    if logger is not None:
+        return logger
+    with _loggers_lock:
+        if key in _loggers:
+            return _loggers[key]
+        with startup_timer.stage(f'logging: {name}'):
+            dict_config = _read_config(config_file)
+            logger_config = dict_config["loggers"][template]
+            handlers = _configure_handlers(dict_config, logger_config.get("handlers", list()), file_name)
+            logger = getLogger(name)
+            if "level" in logger_config:
+                logger.setLevel(logger_config["level"])
+            logger.propagate = logger_config.get("propagate", True)
+            _routes[name] = handlers
+            logger.handlers = [_queue_handler]
+            if _listener._thread is None:
+                _listener.start()
+        _loggers[key] = logger
+        return logger
+
 
 class Logging:
     """
@@ -79,19 +204,10 @@ class Logging:
 
     def get_logger(self):
         self.create_log_folder()
-        with open(self.config_file, "r") as file:
-            dict_config = load(file)
-            self.file_name = path.join(self.folder, self.file_name)
-            dict_config["handlers"]["rotating_file"]["filename"] = self.file_name
-            dict_config["loggers"][self.name] = dict_config["loggers"][self.template]
-        dictConfig(dict_config)
-        return getLogger(self.name)
+        self.file_name = path.join(self.folder, self.file_name)
+        return _configure_logger(self.name, self.template, self.file_name, self.config_file)
 
     def get_default_logger(self):
         self.create_log_folder()
-        with open(self.config_file, "r") as file:
-            dict_config = load(file)
-            self.file_name = path.join(self.folder, self.file_name)
-            dict_config["handlers"]["rotating_file"]["filename"] = self.file_name
-            dictConfig(dict_config)
-        return getLogger("default")
+        self.file_name = path.join(self.folder, self.file_name)
+        return _configure_logger("default", "default", self.file_name, self.config_file)
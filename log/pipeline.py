@@ -0,0 +1,195 @@
+from typing import Any, Dict, List, Optional
+from copy import copy
+from logging import Formatter, Handler, LogRecord, WARNING, makeLogRecord
+from logging.handlers import QueueHandler, QueueListener
+from queue import Queue, Full
+from reprlib import Repr
+from threading import Lock
+
+# Ограничения представления больших объектов в сообщениях лога
+_payload_repr = Repr()
+_payload_repr.maxlist = _payload_repr.maxtuple = _payload_repr.maxset = 10
+_payload_repr.maxdict = 20
+_payload_repr.maxstring = _payload_repr.maxother = 300
+_payload_repr.maxlevel = 3
+# Форматирование исключений записей лога (текст исключения сохраняется в записи до передачи в очередь)
+_exception_formatter = Formatter()
+
+
+class LogPayload:
+    """
+    Класс LogPayload - отложенное сокращенное представление объекта в сообщении лога.
+    Представление формируется только при записи сообщения, вложенные списки и словари
+    сокращаются (reprlib), объект целиком в строку не преобразуется.
+
+    Args:
+    value (Any): объект (например, список записей или параметры запроса)
+    """
+    __slots__ = ('value',)
+
+    def __init__(self, value: Any) -> None:
+        self.value = value
+
+    def __str__(self) -> str:
+        if isinstance(self.value, str):
+            return _payload_repr.repr_str(self.value, _payload_repr.maxlevel).strip("'")
+        return _payload_repr.repr(self.value)
+
+    __repr__ = __str__
+
+
+def payload(value: Any) -> LogPayload:
+    """
+    Функция возвращает объект для сокращенного вывода в лог (аргумент сообщения в стиле %s).
+
+    :param: value - объект.
+    :type: Any
+    :return: - отложенное сокращенное представление объекта.
+    :rtype: LogPayload
+    """
+    return LogPayload(value)
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    Класс BoundedQueueHandler - обработчик, передающий записи лога в ограниченную очередь
+    без ожидания. При переполнении очереди записи пропускаются, количество пропущенных записей
+    передается в лог итоговым сообщением, как только в очереди освобождается место.
+    В очередь передается копия записи с шаблоном и аргументами сообщения: сообщение формируется
+    фоновым потоком записи лога (RoutingQueueListener), в потоке вызова сохраняется только текст исключения.
+    Родитель: QueueHandler
+
+    Args:
+    queue (Queue): очередь записей лога
+
+    Attributes:
+    dropped (int): количество пропущенных записей с момента последнего итогового сообщения
+    """
+    def __init__(self, queue: Queue) -> None:
+        super().__init__(queue)
+        self.dropped = 0
+        self._dropped_lock = Lock()
+
+    def emit(self, record: LogRecord) -> None:
+        """
+        Метод передает запись в очередь. Если очередь заполнена, запись пропускается.
+
+        :param: record - запись лога.
+        :type: LogRecord
+        """
+        if self.queue.full():
+            self._drop()
+            return
+        try:
+            self.enqueue(self.prepare(record))
+        except Full:
+            self._drop()
+            return
+        except Exception:
+            self.handleError(record)
+            return
+        if self.dropped:
+            self._enqueue_summary(record)
+
+    def prepare(self, record: LogRecord) -> LogRecord:
+        """
+        Метод возвращает копию записи для передачи в очередь: шаблон и аргументы сообщения сохраняются
+        (сообщение не формируется), исключение заменяется его текстом (объект исключения и трассировка
+        не передаются в другой поток).
+
+        :param: record - запись лога.
+        :type: LogRecord
+        :return: - подготовленная запись лога.
+        :rtype: LogRecord
+        """
+        record = copy(record)
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = _exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: LogRecord) -> None:
+        self.queue.put_nowait(record)
+
+    def _drop(self) -> None:
+        with self._dropped_lock:
+            self.dropped += 1
+
+    def _enqueue_summary(self, record: LogRecord) -> None:
+        """
+        Метод передает в очередь итоговое сообщение о пропущенных записях.
+
+        :param: record - запись лога, после которой передается итоговое сообщение.
+        :type: LogRecord
+        """
+        with self._dropped_lock:
+            dropped, self.dropped = self.dropped, 0
+        summary = makeLogRecord({'name': record.name, 'levelno': WARNING, 'levelname': 'WARNING',
+                                 'msg': f'Очередь лога переполнена, пропущено записей: {dropped}',
+                                 'processName': record.processName, 'module': 'pipeline',
+                                 'funcName': '_enqueue_summary', 'lineno': 0})
+        try:
+            self.queue.put_nowait(summary)
+        except Full:
+            with self._dropped_lock:
+                self.dropped += dropped
+
+
+class RoutingQueueListener(QueueListener):
+    """
+    Класс RoutingQueueListener - фоновый поток записи лога: читает записи из очереди, формирует сообщение
+    (подстановка аргументов, сокращение до заданной длины) и передает запись обработчикам объекта Logger,
+    создавшего запись (консоль, log файл).
+    Родитель: QueueListener
+
+    Args:
+    queue (Queue): очередь записей лога
+    routes (Dict[str, List[Handler]]): обработчики по наименованию объекта Logger
+    max_message_length (int): максимальная длина сообщения (в символах)
+    """
+    def __init__(self, queue: Queue, routes: Dict[str, List[Handler]], max_message_length: int) -> None:
+        super().__init__(queue, respect_handler_level=True)
+        self.routes = routes
+        self.max_message_length = max_message_length
+
+    def prepare(self, record: LogRecord) -> LogRecord:
+        """
+        Метод формирует сообщение записи и сокращает его до максимальной длины.
+        Если аргументы не подставляются в шаблон, выводятся шаблон и сокращенное представление аргументов.
+
+        :param: record - запись лога.
+        :type: LogRecord
+        :return: - запись лога со сформированным сообщением.
+        :rtype: LogRecord
+        """
+        try:
+            message = record.getMessage()
+        except Exception:
+            message = f'{record.msg} (аргументы не подставлены: {payload(record.args)})'
+        if len(message) > self.max_message_length:
+            excess = len(message) - self.max_message_length
+            message = f'{message[:self.max_message_length]}... (сокращено на {excess} символов)'
+        record.msg = message
+        record.args = None
+        return record
+
+    def _handlers_for(self, name: str) -> Optional[List[Handler]]:
+        while name:
+            handlers = self.routes.get(name)
+            if handlers is not None:
+                return handlers
+            name = name.rpartition('.')[0]
+        return None
+
+    def handle(self, record: LogRecord) -> None:
+        """
+        Метод передает запись обработчикам объекта Logger, создавшего запись.
+
+        :param: record - запись лога.
+        :type: LogRecord
+        """
+        record = self.prepare(record)
+        for handler in self._handlers_for(record.name) or ():
+            if record.levelno >= handler.level:
+                handler.handle(record)
@@ -1,5 +1,22 @@
-from tg_API.core import TelegramBot
+from startup import startup_timer
+
+# Замер времени импорта модулей (отчет выводится в лог при STARTUP_REPORT=True)
+startup_timer.install()
+
+from argparse import ArgumentParser
+from tg_API.core import TelegramBot, RUN_MODES
+from settings import get_settings
+from log.logging import Logging
+
+# Режим запуска: bot - обработка запросов к боту, ingest - загрузка данных с API, all - все вместе
+parser = ArgumentParser(description='Телеграм бот, предоставляющий информацию о компьютерных компонентах')
+parser.add_argument('--mode', choices=RUN_MODES, default=get_settings().run_mode,
+                    help='режим запуска (по умолчанию RUN_MODE)')
+arguments = parser.parse_args()
 
 # Запуск Телеграм бота, предоставляющего информацию о компьютерных компонентах
 telegram_bot = TelegramBot()
-telegram_bot.run()
+startup_timer.uninstall()
+if get_settings().startup_report:
+    Logging('main').get_logger().info('Время запуска бота:\n%s', startup_timer.report())
+telegram_bot.run(arguments.mode)
@@ -0,0 +1,257 @@
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from bisect import bisect_left
+from functools import wraps
+from threading import Lock
+from time import perf_counter
+
+# Границы интервалов гистограмм времени выполнения по умолчанию (в секундах)
+DEFAULT_BUCKETS: Tuple[float, ...] = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    labels = [f'{name}="{escape_label(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        labels.append(extra)
+    return '{' + ','.join(labels) + '}' if labels else ''
+
+
+class Metric:
+    """
+    Класс Metric - базовый класс метрики с набором меток.
+    Значения метрики хранятся по значениям меток, методы класса потокобезопасны.
+
+    Args:
+    name (str): наименование метрики
+    documentation (str): описание метрики
+    label_names (Sequence[str]): наименования меток
+
+    Attributes:
+    name (str): наименование метрики
+    documentation (str): описание метрики
+    label_names (Tuple[str, ...]): наименования меток
+    """
+    type_name = 'untyped'
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = Lock()
+
+    def samples(self) -> List[str]:
+        """
+        Метод возвращает строки значений метрики в текстовом формате Prometheus.
+
+        :return: - строки значений метрики.
+        :rtype: List[str]
+        """
+        return list()
+
+    def render(self) -> str:
+        """
+        Метод возвращает описание и значения метрики в текстовом формате Prometheus.
+
+        :return: - текст метрики.
+        :rtype: str
+        """
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.type_name}']
+        lines.extend(self.samples())
+        return '\n'.join(lines)
+
+
+class Counter(Metric):
+    """
+    Класс Counter - счетчик (значение только увеличивается).
+    Родитель: Metric
+
+    """
+    type_name = 'counter'
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, label_names)
+        self._values: Dict[Tuple, float] = dict()
+
+    def inc(self, amount: float = 1, *label_values: str) -> None:
+        """
+        Метод увеличивает значение счетчика.
+
+        :param: amount - величина увеличения (по умолчанию 1).
+        :type: float
+        :param: *label_values - значения меток.
+        :type: str
+        """
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = dict(self._values)
+        return [f'{self.name}{format_labels(self.label_names, labels)} {format_value(value)}'
+                for labels, value in sorted(values.items())]
+
+
+class Gauge(Counter):
+    """
+    Класс Gauge - текущее значение (может увеличиваться и уменьшаться).
+    Родитель: Counter
+
+    """
+    type_name = 'gauge'
+
+    def set(self, value: float, *label_values: str) -> None:
+        """
+        Метод устанавливает значение.
+
+        :param: value - значение.
+        :type: float
+        :param: *label_values - значения меток.
+        :type: str
+        """
+        with self._lock:
+            self._values[label_values] = value
+
+
+class Histogram(Metric):
+    """
+    Класс Histogram - гистограмма значений (например, времени выполнения в секундах):
+    количество значений по интервалам, сумма и количество значений.
+    Родитель: Metric
+
+    Args:
+    name (str): наименование метрики
+    documentation (str): описание метрики
+    label_names (Sequence[str]): наименования меток
+    buckets (Sequence[float]): верхние границы интервалов (по умолчанию DEFAULT_BUCKETS)
+    """
+    type_name = 'histogram'
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        super().__init__(name, documentation, label_names)
+        self.buckets: Tuple[float, ...] = tuple(sorted(buckets))
+        # Значения по меткам: количество значений по интервалам (последний интервал - +Inf) и сумма значений
+        self._values: Dict[Tuple, List] = dict()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        """
+        Метод добавляет значение в гистограмму.
+
+        :param: value - значение.
+        :type: float
+        :param: *label_values - значения меток.
+        :type: str
+        """
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            item = self._values.get(label_values)
+            if item is None:
+                item = self._values[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            item[0][index] += 1
+            item[1] += value
+
+    def time(self, *label_values: str) -> Callable:
+        """
+        Метод возвращает декоратор, добавляющий в гистограмму время выполнения функции (в секундах).
+
+        :param: *label_values - значения меток.
+        :type: str
+        :return: - декоратор.
+        :rtype: Callable
+        """
+        def decorator(func: Callable) -> Callable:
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                start_time = perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.observe(perf_counter() - start_time, *label_values)
+            return wrapper
+        return decorator
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = {labels: (list(counts), total) for labels, (counts, total) in self._values.items()}
+        lines = list()
+        for labels, (counts, total) in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = f'le="{format_value(bound)}"'
+                lines.append(f'{self.name}_bucket{format_labels(self.label_names, labels, le)} {cumulative}')
+            lines.append(f'{self.name}_sum{format_labels(self.label_names, labels)} {format_value(total)}')
+            lines.append(f'{self.name}_count{format_labels(self.label_names, labels)} {cumulative}')
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Класс MetricsRegistry - реестр метрик приложения.
+
+    """
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Metric] = dict()
+        self._lock = Lock()
+
+    def register(self, metric: Metric) -> Metric:
+        """
+        Метод добавляет метрику в реестр (если метрика с таким наименованием уже есть,
+        возвращается метрика из реестра).
+
+        :param: metric - метрика.
+        :type: Metric
+        :return: - метрика из реестра.
+        :rtype: Metric
+        """
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def get(self, name: str) -> Optional[Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """
+        Метод возвращает все метрики в текстовом формате Prometheus.
+
+        :return: - текст метрик.
+        :rtype: str
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return ''.join(f'{metric.render()}\n' for metric in metrics)
+
+
+# Реестр метрик приложения
+registry = MetricsRegistry()
+
+# Время обработки обновлений Telegram по обработчикам (команды, callback_query, text_query, inline_query)
+handler_seconds: Histogram = registry.register(Histogram(
+    'bot_handler_seconds', 'Время обработки обновления Telegram (в секундах)', ('handler',)))
+# Время выполнения функций CRUD (для запросов SELECT - время выполнения запроса в базе данных)
+db_query_seconds: Histogram = registry.register(Histogram(
+    'db_query_seconds', 'Время выполнения функций CRUD (в секундах)', ('function',)))
+# Время загрузки изображений компонентов при выводе записей
+image_fetch_seconds: Histogram = registry.register(Histogram(
+    'image_fetch_seconds', 'Время загрузки изображения компонента (в секундах)', ('status_code',)))
+# Время выполнения HTTP запросов к сайту API (каждая попытка) по кодам статуса ответа
+api_request_seconds: Histogram = registry.register(Histogram(
+    'api_request_seconds', 'Время выполнения HTTP запроса к сайту API (в секундах)', ('status_code',)))
+# Количество записей, полученных с сайта API при загрузке компонентов
+ingest_rows_total: Counter = registry.register(Counter(
+    'ingest_rows_total', 'Количество записей, полученных с сайта API', ('computer_component',)))
+# Скорость загрузки последнего обновления компонента
+ingest_rows_per_second: Gauge = registry.register(Gauge(
+    'ingest_rows_per_second', 'Скорость загрузки записей последнего обновления (записей в секунду)',
+    ('computer_component',)))
@@ -0,0 +1,63 @@
+from typing import Optional, Tuple
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from threading import Thread
+from metrics.core import MetricsRegistry, registry
+
+# Тип содержимого ответа (текстовый формат Prometheus)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class MetricsServer:
+    """
+    Класс MetricsServer - локальный HTTP сервер метрик: GET /metrics возвращает метрики
+    в текстовом формате Prometheus. Сервер работает в отдельном потоке.
+
+    Args:
+    metrics_registry (MetricsRegistry): реестр метрик (по умолчанию registry - реестр метрик приложения)
+    host (str): адрес сервера (по умолчанию '127.0.0.1')
+    port (int): порт сервера (по умолчанию 0 - свободный порт)
+    """
+    def __init__(self, metrics_registry: MetricsRegistry = registry, host: str = '127.0.0.1', port: int = 0) -> None:
+        self.registry = metrics_registry
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[Thread] = None
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self._httpd.server_address[:2]
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = server.registry.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        return Handler
+
+    def start(self) -> 'MetricsServer':
+        """
+        Метод запускает сервер в отдельном потоке.
+
+        :return: - запущенный сервер.
+        :rtype: MetricsServer
+        """
+        self._thread = Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
@@ -0,0 +1,216 @@
+from typing import Any, Callable, List, Optional, Tuple
+from contextlib import contextmanager
+from contextvars import ContextVar
+from cProfile import Profile
+from datetime import datetime
+from functools import wraps
+from io import StringIO
+from os import path
+from pstats import Stats
+from threading import Lock
+from time import perf_counter
+from settings import get_settings
+from log.logging import Logging
+from metrics.core import handler_seconds
+
+# Общие параметры
+site = get_settings()
+# Журнал медленных обновлений и результатов профилирования
+logger = Logging('slow', file_name='slow.log').get_logger()
+
+
+class Trace:
+    """
+    Класс Trace - трассировка обработки одного обновления Telegram: этапы (spans) обработки
+    с временем начала (от начала обработки обновления), длительностью и уровнем вложенности.
+
+    Args:
+    handler (str): наименование обработчика
+    details (str): описание обновления (чат, текст сообщения или данные кнопки)
+
+    Attributes:
+    spans (List[Tuple[str, float, float, int]]): этапы обработки (наименование, начало, длительность, уровень)
+    """
+    __slots__ = ('handler', 'details', 'started_at', 'spans', 'depth')
+
+    def __init__(self, handler: str, details: str) -> None:
+        self.handler = handler
+        self.details = details
+        self.started_at = perf_counter()
+        self.spans: List[Tuple[str, float, float, int]] = list()
+        self.depth = 0
+
+    def render(self, duration: float) -> str:
+        """
+        Метод возвращает текст трассировки: этапы обработки в порядке начала,
+        время начала и длительность (в миллисекундах).
+
+        :param: duration - общее время обработки обновления (в секундах).
+        :type: float
+        :return: - текст трассировки.
+        :rtype: str
+        """
+        lines = [f'{self.handler} {duration * 1000:.1f} мс; {self.details}']
+        for name, start, span_duration, depth in sorted(self.spans, key=lambda span: span[1]):
+            lines.append(f'{start * 1000:>9.1f} | {span_duration * 1000:>9.1f} | {"  " * depth}{name}')
+        return '\n'.join(lines)
+
+
+# Трассировка обновления, обрабатываемого в текущем потоке
+_current_trace: ContextVar[Optional[Trace]] = ContextVar('current_trace', default=None)
+
+
+@contextmanager
+def span(name: str):
+    """
+    Функция (контекстный менеджер) добавляет этап обработки в трассировку текущего обновления.
+    Вне обработки обновления (например, при загрузке данных с API) этап не записывается.
+
+    :param: name - наименование этапа (например: 'db', 'render', 'image', 'bot_api: sendMessage').
+    :type: str
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    start_time = perf_counter()
+    trace.depth += 1
+    try:
+        yield
+    finally:
+        trace.depth -= 1
+        trace.spans.append((name, start_time - trace.started_at, perf_counter() - start_time, trace.depth))
+
+
+class UpdateProfiler:
+    """
+    Класс UpdateProfiler - профилирование (cProfile) заданного количества следующих обновлений.
+    Результаты профилирования всех обновлений объединяются, сохраняются в файл (pstats)
+    и выводятся в журнал медленных обновлений (функции с наибольшим общим временем).
+
+    Args:
+    folder (str): наименование папки для файлов профилирования
+    """
+    def __init__(self, folder: str) -> None:
+        self.folder = folder
+        self._lock = Lock()
+        self._remaining: int = 0
+        self._running: int = 0
+        self._stats: Optional[Stats] = None
+
+    def enable(self, number_updates: int) -> None:
+        """
+        Метод включает профилирование следующих обновлений.
+
+        :param: number_updates - количество профилируемых обновлений.
+        :type: int
+        """
+        with self._lock:
+            self._remaining = max(0, number_updates)
+        logger.warning('Профилирование включено для %s обновлений', number_updates)
+
+    def _acquire(self) -> bool:
+        if not self._remaining:
+            return False
+        with self._lock:
+            if self._remaining <= 0:
+                return False
+            self._remaining -= 1
+            self._running += 1
+            return True
+
+    def run(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Метод выполняет функцию обработки обновления, с профилированием, если оно включено.
+
+        :param: func - функция обработки обновления.
+        :type: Callable
+        :return: - результат функции.
+        :rtype: Any
+        """
+        if not self._acquire():
+            return func(*args, **kwargs)
+        profiler = Profile()
+        try:
+            return profiler.runcall(func, *args, **kwargs)
+        finally:
+            with self._lock:
+                self._running -= 1
+                if self._stats is None:
+                    self._stats = Stats(profiler)
+                else:
+                    self._stats.add(profiler)
+                stats = self._stats if not self._remaining and not self._running else None
+                if stats is not None:
+                    self._stats = None
+            if stats is not None:
+                self._dump(stats)
+
+    def _dump(self, stats: Stats) -> None:
+        """
+        Метод сохраняет результаты профилирования в файл и выводит их в журнал.
+
+        :param: stats - объединенные результаты профилирования.
+        :type: Stats
+        """
+        file_name = path.join(self.folder, f'profile-{datetime.now():%Y%m%d-%H%M%S}.prof')
+        stats.dump_stats(file_name)
+        stream = StringIO()
+        stats.stream = stream
+        stats.sort_stats('cumulative').print_stats(30)
+        logger.warning('Профилирование завершено, файл %s\n%s', file_name, stream.getvalue())
+
+
+# Профилирование обновлений (включается по сигналу SIGUSR1 или методом enable)
+update_profiler = UpdateProfiler(site.folder_log)
+
+
+def _update_details(update: Any) -> str:
+    """
+    Функция возвращает краткое описание обновления: чат и текст сообщения, данные кнопки или текст inline запроса.
+
+    :param: update - объект из telebot (Message, CallbackQuery, InlineQuery).
+    :type: Any
+    :return: - описание обновления.
+    :rtype: str
+    """
+    message = getattr(update, 'message', None) or update
+    chat = getattr(message, 'chat', None)
+    user = getattr(update, 'from_user', None)
+    text = getattr(update, 'data', None) or getattr(update, 'query', None) or getattr(update, 'text', None)
+    identity = f'chat {chat.id}' if chat is not None else f'user {getattr(user, "id", None)}'
+    return f'{identity}; {str(text)[:64]!r}'
+
+
+def traced(handler: str) -> Callable:
+    """
+    Декоратор обработчиков обновлений Telegram: обработка обновления трассируется,
+    время обработки добавляется в гистограмму bot_handler_seconds. Трассировка обновлений,
+    обработанных медленнее порога SLOW_UPDATE_THRESHOLD, записывается в журнал медленных обновлений.
+    Вызов обработчика из другого обработчика записывается этапом трассировки.
+
+    :param: handler - наименование обработчика (метка гистограммы).
+    :type: str
+    :return: - декоратор.
+    :rtype: Callable
+    """
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(update: Any, *args, **kwargs):
+            if _current_trace.get() is not None:
+                with span(handler):
+                    return func(update, *args, **kwargs)
+            trace = Trace(handler, '')
+            token = _current_trace.set(trace)
+            try:
+                return update_profiler.run(func, update, *args, **kwargs)
+            finally:
+                _current_trace.reset(token)
+                duration = perf_counter() - trace.started_at
+                handler_seconds.observe(duration, handler)
+                if duration >= site.slow_update_threshold:
+                    trace.details = _update_details(update)
+                    logger.warning('Медленное обновление: %s', trace.render(duration))
+        return wrapper
+    return decorator
+
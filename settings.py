@@ -1,7 +1,9 @@
-from typing import List
+from typing import List, Optional
 from os import getenv
+from threading import Lock
 from dotenv import load_dotenv
 from pydantic import BaseSettings, SecretStr, StrictStr
+from startup import startup_timer
 
 load_dotenv()
 
@@ -14,15 +16,45 @@ class SiteSettings(BaseSettings):
     Attributes:
     api_key (SecretStr): Ключ RapidAPI
     host_api (StrictStr): Хост API
+    api_scheme (StrictStr): Схема URL API (https, для локального сервера site_API/fake_server.py - http)
     token (SecretStr): Токен телеграм бота
     db_path (StrictStr): Путь к базе данных
     db_update_frequency (int): Частота обновления базы данных (в днях)
-    query_intervals (List[int]): Паузы между запросами к данным API (в секундах)
-    number_requested_items (List[int]): Количество запрашиваемых позиций
+    query_intervals (List[int]): Паузы перед повтором запроса к данным API после ошибки (в секундах)
+    number_requested_items (List[int]): Количество запрашиваемых позиций (максимальное и минимальное)
     max_number_requests (int): Максимальное количество запросов
     max_number_records (int): Максимальное количество записей, выводимых в чат (одновременно, шаг вывода)
     folder_log (StrictStr): Наименование папки с логом
     logging_config_file (StrictStr): Наименование конфигурационного файла
+    api_pool_size (int): Количество соединений в пуле HTTP сессии API
+    api_max_retries (int): Максимальное количество повторов запроса к API
+    api_backoff_factor (float): Базовая пауза между повторами запроса к API (в секундах)
+    api_requests_per_minute (int): Общий лимит запросов к API в минуту (начальное значение)
+    api_min_requests_per_minute (float): Минимальная частота запросов к API в минуту
+    api_max_requests_per_minute (float): Максимальная частота запросов к API в минуту
+    max_parallel_refreshes (int): Количество компонентов, обновляемых одновременно
+    api_cache_folder (StrictStr): Наименование папки с кешем ответов API
+    pagination_mode (StrictStr): Режим вывода следующих записей: "send" - записи отправляются новыми сообщениями
+    с изображениями, "edit" - страница редактируется в сообщении (только текст, без изображений)
+    inline_cache_ttl (int): Время хранения результатов inline запросов в кеше (в секундах)
+    inline_cache_size (int): Максимальное количество inline запросов в кеше
+    startup_report (bool): Вывод в лог отчета о времени запуска бота (время импорта модулей и инициализации)
+    log_queue_size (int): Максимальное количество записей в очереди лога (при переполнении записи пропускаются)
+    log_max_message_length (int): Максимальная длина сообщения лога (в символах, длинные сообщения сокращаются)
+    metrics_host (StrictStr): Адрес HTTP сервера метрик
+    metrics_port (int): Порт HTTP сервера метрик (0 - сервер метрик не запускается)
+    slow_update_threshold (float): Время обработки обновления, после которого трассировка обновления
+    записывается в журнал медленных обновлений (в секундах)
+    profile_signal (StrictStr): Сигнал, включающий профилирование следующих обновлений (например, SIGUSR1)
+    profile_updates (int): Количество обновлений, профилируемых по сигналу
+    slow_query_threshold (float): Время выполнения SQL запроса, после которого запрос записывается
+    в журнал медленных запросов с планом выполнения (в секундах)
+    run_mode (StrictStr): Режим запуска: bot - обработка запросов к боту, ingest - загрузка данных с API,
+    all - обработка запросов и загрузка данных в одном процессе
+    ingest_lease_ttl (int): Срок аренды загрузки данных (в секундах). Данные загружает только процесс,
+    удерживающий аренду, аренда продлевается каждую треть срока
+    notification_rate (float): Количество уведомлений о снижении стоимости, отправляемых в секунду
+    max_subscriptions (int): Максимальное количество подписок /watch одного пользователя
     """
     api_key: SecretStr = getenv("SITE_API", None)
     host_api: StrictStr = getenv("HOST_API", None)
@@ -35,3 +67,50 @@ class SiteSettings(BaseSettings):
     max_number_records: int = getenv("MAX_NUMBER_RECORDS", None)
     folder_log: StrictStr = getenv("FOLDER_LOG", None)
     logging_config_file: StrictStr = getenv("LOGGING_CONFIG_FILE", None)
+    api_pool_size: int = getenv("API_POOL_SIZE", 10)
+    api_max_retries: int = getenv("API_MAX_RETRIES", 3)
+    api_backoff_factor: float = getenv("API_BACKOFF_FACTOR", 0.5)
+    api_requests_per_minute: int = getenv("API_REQUESTS_PER_MINUTE", 10)
+    api_min_requests_per_minute: float = getenv("API_MIN_REQUESTS_PER_MINUTE", 1)
+    api_max_requests_per_minute: float = getenv("API_MAX_REQUESTS_PER_MINUTE", 60)
+    max_parallel_refreshes: int = getenv("MAX_PARALLEL_REFRESHES", 4)
+    api_cache_folder: StrictStr = getenv("API_CACHE_FOLDER", "cache")
+    api_scheme: StrictStr = getenv("API_SCHEME", "https")
+    pagination_mode: StrictStr = getenv("PAGINATION_MODE", "send")
+    inline_cache_ttl: int = getenv("INLINE_CACHE_TTL", 300)
+    inline_cache_size: int = getenv("INLINE_CACHE_SIZE", 256)
+    startup_report: bool = getenv("STARTUP_REPORT", False)
+    log_queue_size: int = getenv("LOG_QUEUE_SIZE", 10000)
+    log_max_message_length: int = getenv("LOG_MAX_MESSAGE_LENGTH", 4000)
+    metrics_host: StrictStr = getenv("METRICS_HOST", "127.0.0.1")
+    metrics_port: int = getenv("METRICS_PORT", 0)
+    slow_update_threshold: float = getenv("SLOW_UPDATE_THRESHOLD", 1.0)
+    profile_signal: StrictStr = getenv("PROFILE_SIGNAL", "SIGUSR1")
+    profile_updates: int = getenv("PROFILE_UPDATES", 20)
+    slow_query_threshold: float = getenv("SLOW_QUERY_THRESHOLD", 0.1)
+    run_mode: StrictStr = getenv("RUN_MODE", "all")
+    ingest_lease_ttl: int = getenv("INGEST_LEASE_TTL", 60)
+    notification_rate: float = getenv("NOTIFICATION_RATE", 25)
+    max_subscriptions: int = getenv("MAX_SUBSCRIPTIONS", 20)
+
+
+# Общие параметры (создаются один раз при первом обращении)
+_settings: Optional[SiteSettings] = None
+_settings_lock = Lock()
+
+
+def get_settings() -> SiteSettings:
+    """
+    Функция возвращает общие параметры. Параметры читаются из переменных окружения один раз,
+    при первом обращении, последующие обращения возвращают тот же объект.
+
+    :return: - общие параметры.
+    :rtype: SiteSettings
+    """
+    global _settings
+    if _settings is None:
+        with _settings_lock:
+            if _settings is None:
+                with startup_timer.stage('settings'):
+                    _settings = SiteSettings()
+    return _settings
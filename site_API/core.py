@@ -1,7 +1,9 @@
-from settings import SiteSettings
+from settings import get_settings
 from site_API.utils.site_api_handler import SiteApiInterface
+from site_API.utils.rate_limit import RequestBudget, RateController
+from site_API.utils.response_cache import ResponseCache
 
-site = SiteSettings()
+site = get_settings()
 
 # HTTP заголовок запроса
 headers = {
@@ -10,8 +12,17 @@ headers = {
 }
 
 # URL запроса
-url = 'https://' + site.host_api
+url = f'{site.api_scheme}://{site.host_api}'
 # Параметры запроса
 params = {"limit": "5", "offset": "0"}
 
-site_api = SiteApiInterface()
+# Общий для всех загрузок лимит запросов к API
+budget = RequestBudget(site.api_requests_per_minute)
+# Адаптивное управление частотой запросов по заголовкам квоты RapidAPI
+rate_controller = RateController(budget, site.api_min_requests_per_minute, site.api_max_requests_per_minute)
+
+site_api = SiteApiInterface(site.api_pool_size, site.api_max_retries, site.api_backoff_factor,
+                            budget, rate_controller)
+
+# Дисковый кеш ответов API (валидаторы, хеши содержимого и идентификаторы записей страниц)
+response_cache = ResponseCache(site.api_cache_folder)
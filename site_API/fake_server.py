@@ -0,0 +1,321 @@
+"""
+Локальный сервер, имитирующий API компьютерных компонентов (RapidAPI) для автономной проверки загрузки данных.
+
+Сервер отдает записанные (fixtures) или синтетические данные по всем компонентам с учетом параметров
+limit/offset, поддерживает ETag и заголовки квоты RapidAPI, позволяет задать задержку ответа,
+долю ошибок сервера, долю ответов 429 и размер записей.
+
+Запуск: python -m site_API.fake_server --port 8080 --items 1000
+Для загрузки данных с локального сервера в .env задать: API_SCHEME = "http", HOST_API = "127.0.0.1:8080"
+"""
+from typing import Dict, Iterator, List, Optional, Tuple, Type
+from argparse import ArgumentParser
+from hashlib import md5
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from json import dumps, load
+from os import path, makedirs
+from random import Random
+from re import sub
+from sqlite3 import connect
+from threading import Lock, Thread
+from time import sleep, monotonic
+from urllib.parse import urlparse, parse_qs
+from database.common.models import ModelBaseComputerComponents
+
+
+def endpoint_name(model) -> str:
+    """
+    Функция возвращает наименование endpoint компонента по имени класса-модели (CaseFan -> case_fan).
+
+    :param: model - класс-модель компьютерного компонента.
+    :type: ModelBaseComputerComponents
+    :return: - наименование endpoint.
+    :rtype: str
+    """
+    return sub(r'(?<!^)(?=[A-Z])', '_', model.__name__).lower()
+
+
+# Словарь моделей компьютерных компонентов по наименованию endpoint
+component_models: Dict = {endpoint_name(model): model for model in ModelBaseComputerComponents.__subclasses__()}
+
+
+def synthetic_records(name: str, model: Type[ModelBaseComputerComponents], number_items: int, random: Random,
+                      padding: int = 0) -> Iterator[Dict]:
+    """
+    Функция формирует синтетические записи компонента (генератор, записи формируются по одной).
+
+    :param: name - наименование endpoint компонента.
+    :type: str
+    :param: model - класс-модель компонента.
+    :type: Type[ModelBaseComputerComponents]
+    :param: number_items - количество записей.
+    :type: int
+    :param: random - генератор случайных чисел.
+    :type: Random
+    :param: padding - количество дополнительных символов в наименовании записи (по умолчанию 0).
+    :type: int
+    :return: - записи компонента (стоимость в долларах, как в ответе API).
+    :rtype: Iterator[Dict]
+    """
+    fields = [field for field in model._meta.sorted_field_names if field not in ('id', 'price')]
+    for i_item in range(number_items):
+        record: Dict = {'id': f'{name[:3].upper()}{i_item:08d}',
+                        'price': round(random.uniform(5, 2000), 2)}
+        for field in fields:
+            record[field] = f'{field} {random.randint(1, 50)}'
+        record['title'] = ''.join((f'{name} {i_item} ', 'x' * padding))
+        record['link'] = f'https://example.com/dp/{record["id"]}'
+        record['img'] = f'https://example.com/images/{record["id"]}.jpg'
+        yield record
+
+
+def synthetic_catalog(number_items: int, seed: int = 0, padding: int = 0) -> Dict[str, List[Dict]]:
+    """
+    Функция формирует синтетические данные по всем компонентам.
+
+    :param: number_items - количество записей по каждому компоненту.
+    :type: int
+    :param: seed - начальное значение генератора случайных чисел (по умолчанию 0).
+    :type: int
+    :param: padding - количество дополнительных символов в наименовании записи (по умолчанию 0).
+    :type: int
+    :return: catalog - словарь данных. Ключ - наименование endpoint, значение - список записей.
+    :rtype: Dict[str, List[Dict]]
+    """
+    random = Random(seed)
+    catalog: Dict[str, List[Dict]] = dict()
+    for name, model in component_models.items():
+        catalog[name] = list(synthetic_records(name, model, number_items, random, padding))
+    return catalog
+
+
+def load_fixtures(folder: str) -> Dict[str, List[Dict]]:
+    """
+    Функция загружает записанные данные компонентов из папки (файлы <endpoint>.json).
+
+    :param: folder - папка с файлами данных.
+    :type: str
+    :return: catalog - словарь данных. Ключ - наименование endpoint, значение - список записей.
+    :rtype: Dict[str, List[Dict]]
+    """
+    catalog: Dict[str, List[Dict]] = dict()
+    for name in component_models:
+        file_name = path.join(folder, f'{name}.json')
+        if path.exists(file_name):
+            with open(file_name, 'r', encoding='utf8') as file:
+                catalog[name] = load(file)
+    return catalog
+
+
+def record_fixtures(db_path: str, folder: str) -> None:
+    """
+    Функция записывает данные компонентов из базы данных в папку (файлы <endpoint>.json)
+    в формате ответа API (стоимость в долларах).
+
+    :param: db_path - путь к базе данных.
+    :type: str
+    :param: folder - папка для файлов данных.
+    :type: str
+    """
+    makedirs(folder, exist_ok=True)
+    connection = connect(db_path)
+    connection.row_factory = lambda cursor, row: {column[0]: value
+                                                  for column, value in zip(cursor.description, row)}
+    try:
+        for name, model in component_models.items():
+            records = connection.execute(f'SELECT * FROM "{model._meta.table_name}"').fetchall()
+            for record in records:
+                record['price'] = record['price'] / 100
+            with open(path.join(folder, f'{name}.json'), 'w', encoding='utf8') as file:
+                file.write(dumps(records, ensure_ascii=False))
+    finally:
+        connection.close()
+
+
+class FakeApiServer:
+    """
+    Класс FakeApiServer - локальный HTTP сервер, имитирующий API компьютерных компонентов.
+
+    Args:
+    catalog (Dict[str, List[Dict]]): данные компонентов. Ключ - наименование endpoint, значение - список записей
+    host (str): адрес сервера (по умолчанию '127.0.0.1')
+    port (int): порт сервера (по умолчанию 0 - свободный порт)
+    latency (float): задержка ответа (в секундах, по умолчанию 0)
+    error_rate (float): доля ответов с кодом 500 (по умолчанию 0)
+    throttle_rate (float): доля ответов с кодом 429 (по умолчанию 0)
+    quota (int): количество запросов в окне квоты, 0 - без ограничений (по умолчанию 0)
+    quota_window (float): длительность окна квоты (в секундах, по умолчанию 60)
+    etag (bool): передавать ETag и отвечать 304 на условные запросы (по умолчанию True)
+    seed (int): начальное значение генератора случайных чисел (по умолчанию 0)
+    """
+    def __init__(self, catalog: Dict[str, List[Dict]], host: str = '127.0.0.1', port: int = 0,
+                 latency: float = 0.0, error_rate: float = 0.0, throttle_rate: float = 0.0,
+                 quota: int = 0, quota_window: float = 60.0, etag: bool = True, seed: int = 0) -> None:
+        self.catalog = catalog
+        self.latency = latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.quota = quota
+        self.quota_window = quota_window
+        self.etag = etag
+        self.status_codes: Dict[int, int] = dict()
+        self._random = Random(seed)
+        self._lock = Lock()
+        self._window_start: float = monotonic()
+        self._window_requests: int = 0
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[Thread] = None
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self._httpd.server_address[:2]
+
+    @property
+    def host_api(self) -> str:
+        """Значение для параметра HOST_API (адрес:порт)."""
+        return '{0}:{1}'.format(*self.address)
+
+    def _quota_state(self) -> Tuple[Optional[int], float]:
+        """
+        Метод учитывает запрос в окне квоты.
+
+        :return: - оставшееся количество запросов (None - квота не задана) и время до сброса квоты.
+        :rtype: Tuple[Optional[int], float]
+        """
+        with self._lock:
+            now = monotonic()
+            if now - self._window_start >= self.quota_window:
+                self._window_start = now
+                self._window_requests = 0
+            reset = self.quota_window - (now - self._window_start)
+            if not self.quota:
+                return None, reset
+            self._window_requests += 1
+            return self.quota - self._window_requests, reset
+
+    def _draw(self) -> float:
+        with self._lock:
+            return self._random.random()
+
+    def _count(self, status_code: int) -> None:
+        with self._lock:
+            self.status_codes[status_code] = self.status_codes.get(status_code, 0) + 1
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _send(self, status_code: int, body: bytes = b'', response_headers: Optional[Dict] = None) -> None:
+                server._count(status_code)
+                self.send_response(status_code)
+                for header, value in (response_headers or dict()).items():
+                    self.send_header(header, value)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self) -> None:
+                if server.latency:
+                    sleep(server.latency)
+                request = urlparse(self.path)
+                name = request.path.strip('/')
+                if name not in server.catalog:
+                    self._send(404, b'{"message": "Endpoint not found"}')
+                    return
+
+                remaining, reset = server._quota_state()
+                quota_headers: Dict = dict()
+                if remaining is not None:
+                    quota_headers = {'X-RateLimit-Requests-Limit': str(server.quota),
+                                     'X-RateLimit-Requests-Remaining': str(max(0, remaining)),
+                                     'X-RateLimit-Requests-Reset': str(int(reset) + 1)}
+                    if remaining < 0:
+                        quota_headers['Retry-After'] = str(int(reset) + 1)
+                        self._send(429, b'{"message": "Too many requests"}', quota_headers)
+                        return
+                if server.throttle_rate and server._draw() < server.throttle_rate:
+                    self._send(429, b'{"message": "Too many requests"}', dict(quota_headers, **{'Retry-After': '1'}))
+                    return
+                if server.error_rate and server._draw() < server.error_rate:
+                    self._send(500, b'{"message": "Internal server error"}', quota_headers)
+                    return
+
+                query = parse_qs(request.query)
+                try:
+                    limit = int(query.get('limit', ['5'])[0])
+                    offset = int(query.get('offset', ['0'])[0])
+                except ValueError:
+                    self._send(400, b'{"message": "Invalid limit or offset"}', quota_headers)
+                    return
+                body = dumps(server.catalog[name][offset:offset + limit], ensure_ascii=False).encode('utf-8')
+                response_headers = dict(quota_headers)
+                if server.etag:
+                    tag = '"{0}"'.format(md5(body).hexdigest())
+                    response_headers['ETag'] = tag
+                    if self.headers.get('If-None-Match') == tag:
+                        self._send(304, b'', response_headers)
+                        return
+                self._send(200, body, response_headers)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        return Handler
+
+    def start(self) -> 'FakeApiServer':
+        """
+        Метод запускает сервер в отдельном потоке.
+
+        :return: - запущенный сервер.
+        :rtype: FakeApiServer
+        """
+        self._thread = Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        self._httpd.serve_forever()
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+def main() -> None:
+    parser = ArgumentParser(description='Локальный сервер, имитирующий API компьютерных компонентов')
+    parser.add_argument('--host', default='127.0.0.1', help='адрес сервера')
+    parser.add_argument('--port', type=int, default=8080, help='порт сервера')
+    parser.add_argument('--fixtures', help='папка с записанными данными (<endpoint>.json)')
+    parser.add_argument('--record', metavar='DB_PATH', help='записать данные из базы данных в папку --fixtures')
+    parser.add_argument('--items', type=int, default=1000, help='количество синтетических записей по компоненту')
+    parser.add_argument('--padding', type=int, default=0, help='дополнительные символы в наименовании записи')
+    parser.add_argument('--latency', type=float, default=0.0, help='задержка ответа (в секундах)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='доля ответов 500')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='доля ответов 429')
+    parser.add_argument('--quota', type=int, default=0, help='количество запросов в окне квоты (0 - без квоты)')
+    parser.add_argument('--quota-window', type=float, default=60.0, help='длительность окна квоты (в секундах)')
+    parser.add_argument('--no-etag', action='store_true', help='не передавать ETag')
+    parser.add_argument('--seed', type=int, default=0, help='начальное значение генератора случайных чисел')
+    args = parser.parse_args()
+
+    if args.record:
+        if not args.fixtures:
+            parser.error('--record требует --fixtures')
+        record_fixtures(args.record, args.fixtures)
+    catalog = load_fixtures(args.fixtures) if args.fixtures else synthetic_catalog(args.items, args.seed,
+                                                                                   args.padding)
+    server = FakeApiServer(catalog, args.host, args.port, args.latency, args.error_rate, args.throttle_rate,
+                           args.quota, args.quota_window, not args.no_etag, args.seed)
+    print(f'Сервер запущен: http://{server.host_api} ({", ".join(sorted(catalog))})')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
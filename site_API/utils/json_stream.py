@@ -0,0 +1,62 @@
+from typing import Any, Iterable, Iterator, Optional
+from codecs import getincrementaldecoder
+from itertools import chain
+from json import JSONDecoder, JSONDecodeError
+from re import compile
+
+# Пробельные символы между элементами JSON
+WHITESPACE = compile(r'[ \t\n\r]*')
+
+
+def iter_json_array(chunks: Iterable[bytes], encoding: str = 'utf-8') -> Iterator[Any]:
+    """
+    Функция последовательно декодирует элементы JSON массива из потока байт.
+    В памяти хранится только необработанный остаток потока (не более одного элемента и одного блока данных).
+
+    :param: chunks - последовательность блоков данных (например, Response.iter_content).
+    :type: Iterable[bytes]
+    :param: encoding - кодировка данных (по умолчанию 'utf-8').
+    :type: str
+    :return: - элементы JSON массива.
+    :rtype: Iterator[Any]
+    """
+    decoder = JSONDecoder()
+    text_decoder = getincrementaldecoder(encoding)()
+    buffer: str = ''
+    position: int = 0
+    is_started: bool = False
+
+    chunk: Optional[bytes]
+    for chunk in chain(chunks, [None]):
+        is_final: bool = chunk is None
+        buffer = ''.join((buffer[position:], text_decoder.decode(chunk or b'', final=is_final)))
+        position = 0
+        while True:
+            position = WHITESPACE.match(buffer, position).end()
+            if position >= len(buffer):
+                break
+            symbol = buffer[position]
+            if not is_started:
+                if symbol != '[':
+                    raise ValueError(f'Ожидается JSON массив, получено: {buffer[position:position + 20]}')
+                is_started = True
+                position += 1
+            elif symbol == ',':
+                position += 1
+            elif symbol == ']':
+                return
+            else:
+                try:
+                    element, end = decoder.raw_decode(buffer, position)
+                except JSONDecodeError:
+                    if is_final:
+                        raise
+                    # Элемент получен не полностью - ожидается следующий блок данных
+                    break
+                if end >= len(buffer) and not is_final and not isinstance(element, (dict, list)):
+                    # Число или литерал в конце блока могут продолжиться в следующем блоке
+                    break
+                position = end
+                yield element
+
+    raise ValueError('Незавершенный JSON массив')
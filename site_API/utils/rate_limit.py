@@ -0,0 +1,196 @@
+from typing import Mapping, Optional
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from threading import Lock
+from time import monotonic, sleep
+
+# Заголовки ответа RapidAPI с информацией о квоте запросов
+HEADER_REMAINING = 'X-RateLimit-Requests-Remaining'
+HEADER_RESET = 'X-RateLimit-Requests-Reset'
+HEADER_RETRY_AFTER = 'Retry-After'
+
+# Код статуса ответа при превышении лимита запросов
+TOO_MANY_REQUESTS = 429
+
+
+class RequestBudget:
+    """
+    Класс RequestBudget - общий для всех потоков лимит запросов к сайту API (token bucket).
+    Каждый запрос расходует один токен, токены восстанавливаются с заданной скоростью.
+
+    Args:
+    requests_per_minute (int): количество запросов в минуту
+    burst (int): максимальное количество запросов, выполняемых без паузы (по умолчанию 1)
+    """
+    def __init__(self, requests_per_minute: int, burst: int = 1) -> None:
+        self._lock = Lock()
+        self._rate: float = requests_per_minute / 60
+        self._capacity: float = float(burst)
+        self._tokens: float = float(burst)
+        self._updated_at: float = monotonic()
+        self._paused_until: float = 0.0
+
+    @property
+    def requests_per_minute(self) -> float:
+        return self._rate * 60
+
+    @requests_per_minute.setter
+    def requests_per_minute(self, requests_per_minute: float) -> None:
+        with self._lock:
+            self._refill()
+            self._rate = requests_per_minute / 60
+
+    def _refill(self) -> None:
+        now = monotonic()
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated_at) * self._rate)
+        self._updated_at = now
+
+    def pause(self, seconds: float) -> None:
+        """
+        Метод приостанавливает выдачу токенов всем потокам на заданное время.
+
+        :param: seconds - время паузы (в секундах).
+        :type: float
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, monotonic() + seconds)
+
+    def acquire(self) -> float:
+        """
+        Метод ожидает доступный токен и расходует его.
+
+        :return: waited - время ожидания (в секундах).
+        :rtype: float
+        """
+        waited: float = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                delay = self._paused_until - monotonic()
+                if delay <= 0:
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return waited
+                    delay = (1 - self._tokens) / self._rate
+            sleep(delay)
+            waited += delay
+
+
+def _parse_seconds(value: Optional[str]) -> Optional[float]:
+    """
+    Функция преобразует значение заголовка (количество секунд или HTTP-дата) в количество секунд.
+
+    :param: value - значение заголовка.
+    :type: Optional[str]
+    :return: - количество секунд или None, если значение не задано или не распознано.
+    :rtype: Optional[float]
+    """
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        moment = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (moment - datetime.now(timezone.utc)).total_seconds())
+
+
+class RateController:
+    """
+    Класс RateController - адаптивное управление частотой запросов к сайту API.
+    Частота запросов общего лимита (RequestBudget) определяется по заголовкам квоты RapidAPI
+    (оставшееся количество запросов и время до сброса квоты). Если заголовки отсутствуют,
+    частота увеличивается на постоянную величину после каждого успешного ответа
+    и уменьшается в заданное количество раз при ошибках сервера (AIMD).
+    Ответ 429 приостанавливает запросы на время из заголовка Retry-After.
+
+    Args:
+    budget (RequestBudget): общий лимит запросов к сайту API
+    min_requests_per_minute (float): минимальная частота запросов в минуту
+    max_requests_per_minute (float): максимальная частота запросов в минуту
+    increase (float): увеличение частоты запросов после успешного ответа (по умолчанию 1)
+    decrease_factor (float): коэффициент уменьшения частоты запросов при ошибке (по умолчанию 0.5)
+    default_retry_after (float): пауза при ответе 429 без заголовка Retry-After
+    (в секундах, по умолчанию 60)
+    """
+    def __init__(self, budget: RequestBudget, min_requests_per_minute: float, max_requests_per_minute: float,
+                 increase: float = 1.0, decrease_factor: float = 0.5, default_retry_after: float = 60.0) -> None:
+        self._lock = Lock()
+        self._budget = budget
+        self._min_rate = min_requests_per_minute
+        self._max_rate = max_requests_per_minute
+        self._increase = increase
+        self._decrease_factor = decrease_factor
+        self._default_retry_after = default_retry_after
+
+    @property
+    def budget(self) -> RequestBudget:
+        return self._budget
+
+    def _set_rate(self, requests_per_minute: float) -> None:
+        self._budget.requests_per_minute = min(self._max_rate, max(self._min_rate, requests_per_minute))
+
+    def observe(self, status_code: int, headers: Mapping[str, str]) -> None:
+        """
+        Метод корректирует частоту запросов по коду статуса и заголовкам ответа.
+
+        :param: status_code - код статуса ответа.
+        :type: int
+        :param: headers - заголовки ответа.
+        :type: Mapping[str, str]
+        """
+        with self._lock:
+            rate = self._budget.requests_per_minute
+            if status_code == TOO_MANY_REQUESTS:
+                retry_after = _parse_seconds(headers.get(HEADER_RETRY_AFTER))
+                self._budget.pause(self._default_retry_after if retry_after is None else retry_after)
+                self._set_rate(rate * self._decrease_factor)
+                return
+
+            remaining = _parse_seconds(headers.get(HEADER_REMAINING))
+            reset = _parse_seconds(headers.get(HEADER_RESET))
+            if remaining is not None and reset is not None:
+                if remaining < 1:
+                    self._budget.pause(reset)
+                else:
+                    self._set_rate(remaining / max(reset, 1.0) * 60)
+            elif status_code >= 500:
+                self._set_rate(rate * self._decrease_factor)
+            else:
+                self._set_rate(rate + self._increase)
+
+
+class PageSizeController:
+    """
+    Класс PageSizeController - адаптивное управление количеством запрашиваемых позиций (AIMD).
+    После успешного запроса количество позиций увеличивается на постоянную величину,
+    после ошибки - уменьшается вдвое.
+
+    Args:
+    maximum (int): максимальное количество запрашиваемых позиций
+    minimum (int): минимальное количество запрашиваемых позиций (по умолчанию 1)
+    increase (int): увеличение количества позиций после успешного запроса (по умолчанию 10)
+    limit (Optional[int]): начальное количество позиций (по умолчанию None - максимальное)
+    """
+    def __init__(self, maximum: int, minimum: int = 1, increase: int = 10, limit: Optional[int] = None) -> None:
+        self._maximum = maximum
+        self._minimum = minimum
+        self._increase = increase
+        self._limit = maximum if limit is None else min(maximum, max(minimum, limit))
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    @property
+    def is_minimum(self) -> bool:
+        return self._limit <= self._minimum
+
+    def success(self) -> None:
+        self._limit = min(self._maximum, self._limit + self._increase)
+
+    def failure(self) -> None:
+        self._limit = max(self._minimum, self._limit // 2)
@@ -0,0 +1,115 @@
+from typing import Dict, Iterable, List, Optional, Tuple, IO
+from hashlib import blake2b
+from json import load, dump
+from os import path, makedirs, replace
+from tempfile import SpooledTemporaryFile
+
+# Код статуса ответа "данные не изменились" на условный запрос
+NOT_MODIFIED = 304
+
+# Максимальный размер тела ответа, хранимого в памяти при буферизации (в байтах)
+SPOOL_MAX_SIZE = 1048576
+
+
+class ResponseCache:
+    """
+    Класс ResponseCache - дисковый кеш ответов API на запросы страниц данных.
+    Для каждой страницы (компонент, количество позиций, смещение) хранятся валидаторы ответа
+    (ETag, Last-Modified), хеш содержимого и идентификаторы полученных записей.
+    Содержимое ответа не хранится.
+
+    Args:
+    folder (str): папка для хранения кеша
+    """
+    def __init__(self, folder: str) -> None:
+        self._folder = folder
+
+    @property
+    def folder(self) -> str:
+        return self._folder
+
+    def _file_name(self, computer_component: str, limit: int, offset: int) -> str:
+        return path.join(self._folder, f'{computer_component}_{limit}_{offset}.json')
+
+    def get(self, computer_component: str, limit: int, offset: int) -> Optional[Dict]:
+        """
+        Метод возвращает сохраненные данные о странице.
+
+        :param: computer_component - наименование компьютерного компонента.
+        :type: str
+        :param: limit - количество запрашиваемых позиций.
+        :type: int
+        :param: offset - смещение.
+        :type: int
+        :return: - словарь с ключами etag, last_modified, content_hash, ids
+        или None, если данные о странице не сохранены.
+        :rtype: Optional[Dict]
+        """
+        try:
+            with open(self._file_name(computer_component, limit, offset), 'r', encoding='utf8') as file:
+                return load(file)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, computer_component: str, limit: int, offset: int, etag: Optional[str],
+            last_modified: Optional[str], content_hash: str, ids: List[str]) -> None:
+        """
+        Метод сохраняет данные о странице.
+
+        :param: computer_component - наименование компьютерного компонента.
+        :type: str
+        :param: limit - количество запрашиваемых позиций.
+        :type: int
+        :param: offset - смещение.
+        :type: int
+        :param: etag - значение заголовка ETag ответа.
+        :type: Optional[str]
+        :param: last_modified - значение заголовка Last-Modified ответа.
+        :type: Optional[str]
+        :param: content_hash - хеш содержимого ответа.
+        :type: str
+        :param: ids - идентификаторы записей страницы.
+        :type: List[str]
+        """
+        makedirs(self._folder, exist_ok=True)
+        file_name = self._file_name(computer_component, limit, offset)
+        with open(f'{file_name}.tmp', 'w', encoding='utf8') as file:
+            dump({'etag': etag, 'last_modified': last_modified, 'content_hash': content_hash, 'ids': ids}, file)
+        replace(f'{file_name}.tmp', file_name)
+
+    @staticmethod
+    def validators(entry: Optional[Dict]) -> Dict[str, str]:
+        """
+        Метод возвращает заголовки условного запроса по сохраненным данным о странице.
+
+        :param: entry - сохраненные данные о странице.
+        :type: Optional[Dict]
+        :return: - заголовки If-None-Match, If-Modified-Since (если сервер передавал валидаторы).
+        :rtype: Dict[str, str]
+        """
+        conditional_headers: Dict[str, str] = dict()
+        if entry:
+            if entry.get('etag'):
+                conditional_headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                conditional_headers['If-Modified-Since'] = entry['last_modified']
+        return conditional_headers
+
+
+def spool_content(chunks: Iterable[bytes]) -> Tuple[IO[bytes], str]:
+    """
+    Функция буферизует поток байт (в памяти, при превышении SPOOL_MAX_SIZE - во временном файле)
+    и вычисляет хеш содержимого.
+
+    :param: chunks - последовательность блоков данных (например, Response.iter_content).
+    :type: Iterable[bytes]
+    :return: - буфер с содержимым (позиция в начале) и хеш содержимого.
+    :rtype: Tuple[IO[bytes], str]
+    """
+    content_hash = blake2b(digest_size=16)
+    spool = SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    for chunk in chunks:
+        content_hash.update(chunk)
+        spool.write(chunk)
+    spool.seek(0)
+    return spool, content_hash.hexdigest()
@@ -1,11 +1,104 @@
-from requests import request, Response
-from typing import Dict, Union, Callable
+from typing import Dict, Union, Callable, Optional
+from functools import partial
+from random import uniform
+from threading import Lock
+from time import perf_counter, sleep
+from requests import request, Session, Response, ConnectionError, ConnectTimeout
+from requests.adapters import HTTPAdapter
+from site_API.utils.rate_limit import RequestBudget, RateController, TOO_MANY_REQUESTS
+from metrics.core import api_request_seconds
+
+# Коды статуса ответа, при которых запрос повторяется
+RETRY_STATUS_CODES = (TOO_MANY_REQUESTS, 500, 502, 503, 504)
+
+
+class RequestStatistics:
+    """
+    Класс RequestStatistics - накапливает статистику HTTP запросов к сайту API.
+    Методы класса потокобезопасны.
+
+    Attributes:
+    requests (int): количество выполненных запросов (с учетом повторов)
+    retries (int): количество повторных запросов
+    errors (int): количество запросов, завершившихся ошибкой соединения
+    latency (float): суммарное время выполнения запросов (в секундах)
+    bytes_received (int): количество полученных байт
+    status_codes (Dict[int, int]): количество ответов по кодам статуса
+    """
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self.requests: int = 0
+        self.retries: int = 0
+        self.errors: int = 0
+        self.latency: float = 0.0
+        self.bytes_received: int = 0
+        self.status_codes: Dict[int, int] = dict()
+
+    def add_response(self, latency: float, status_code: int, bytes_received: int, is_retry: bool) -> None:
+        with self._lock:
+            self.requests += 1
+            self.retries += is_retry
+            self.latency += latency
+            self.bytes_received += bytes_received
+            self.status_codes[status_code] = self.status_codes.get(status_code, 0) + 1
+
+    def add_error(self, latency: float, is_retry: bool) -> None:
+        with self._lock:
+            self.requests += 1
+            self.retries += is_retry
+            self.errors += 1
+            self.latency += latency
+
+    def as_dict(self) -> Dict:
+        with self._lock:
+            return {'requests': self.requests, 'retries': self.retries, 'errors': self.errors,
+                    'latency': self.latency, 'bytes_received': self.bytes_received,
+                    'status_codes': dict(self.status_codes)}
+
+
+def _create_session(pool_size: int) -> Session:
+    """
+    Функция создает HTTP сессию с пулом постоянных (keep-alive) соединений.
+
+    :param: pool_size - максимальное количество соединений в пуле.
+    :type: int
+    :return: session - HTTP сессия.
+    :rtype: Session
+    """
+    session = Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def _backoff_delay(attempt: int, backoff_factor: float) -> float:
+    """
+    Функция возвращает паузу перед повторным запросом:
+    экспоненциальная задержка со случайным разбросом (full jitter).
+
+    :param: attempt - номер повторной попытки (начиная с 0).
+    :type: int
+    :param: backoff_factor - базовая задержка (в секундах).
+    :type: float
+    :return: - пауза перед повторным запросом (в секундах).
+    :rtype: float
+    """
+    return uniform(0, backoff_factor * (2 ** attempt))
 
 
 def _make_response(method: str, url: str, headers: Dict, params: Dict,
-                   timeout: int, success: int = 200) -> Union[Response, int]:
+                   timeout: int, success: int = 200, session: Optional[Session] = None,
+                   max_retries: int = 0, backoff_factor: float = 0.5,
+                   statistics: Optional[RequestStatistics] = None,
+                   budget: Optional[RequestBudget] = None,
+                   rate_controller: Optional[RateController] = None,
+                   stream: bool = False) -> Union[Response, int]:
     """
     Функция отправляющая HTTP запросы с помощью библиотеки request.
+    При ошибках соединения и кодах статуса 5xx запрос повторяется
+    с экспоненциально растущей паузой со случайным разбросом.
+    При коде статуса 429 запрос повторяется после паузы, заданной сервером (если задан rate_controller).
 
     :param: method - тип HTTP запроса (GET, POST и др.).
     :type: str
@@ -19,21 +112,68 @@ def _make_response(method: str, url: str, headers: Dict, params: Dict,
     :type: int
     :param: success - код статуса запроса (по умолчанию 200).
     :type: int
+    :param: session - HTTP сессия (по умолчанию None - создается новое соединение).
+    :type: Optional[Session]
+    :param: max_retries - максимальное количество повторов запроса (по умолчанию 0).
+    :type: int
+    :param: backoff_factor - базовая пауза между повторами (в секундах, по умолчанию 0.5).
+    :type: float
+    :param: statistics - объект для накопления статистики запросов (по умолчанию None).
+    :type: Optional[RequestStatistics]
+    :param: budget - общий лимит запросов к сайту API (по умолчанию None - без ограничений).
+    :type: Optional[RequestBudget]
+    :param: rate_controller - адаптивное управление частотой запросов по заголовкам ответа
+    (по умолчанию None).
+    :type: Optional[RateController]
+    :param: stream - тело ответа загружается по мере чтения (по умолчанию False).
+    :type: bool
     :return: response, status_code - в случае успешного запроса (status_code = 200),
     возвращается результат запроса, в противном случае возвращается код ответа.
     :rtype: Union[Response, int]
     """
-    response = request(method, url, headers=headers, params=params, timeout=timeout)
-    status_code = response.status_code
-
-    if status_code == success:
-        return response
+    send = session.request if session is not None else request
+    attempt: int = 0
+    while True:
+        if budget is not None:
+            budget.acquire()
+        start_time = perf_counter()
+        try:
+            response = send(method, url, headers=headers, params=params, timeout=timeout, stream=stream)
+        except (ConnectionError, ConnectTimeout):
+            latency = perf_counter() - start_time
+            api_request_seconds.observe(latency, 'error')
+            if statistics is not None:
+                statistics.add_error(latency, attempt > 0)
+            if attempt >= max_retries:
+                raise
+        else:
+            status_code = response.status_code
+            latency = perf_counter() - start_time
+            api_request_seconds.observe(latency, str(status_code))
+            if statistics is not None:
+                if stream:
+                    bytes_received = int(response.headers.get('Content-Length', 0))
+                else:
+                    bytes_received = len(response.content)
+                statistics.add_response(latency, status_code, bytes_received, attempt > 0)
+            if rate_controller is not None:
+                rate_controller.observe(status_code, response.headers)
+            if status_code == success:
+                return response
+            response.close()
+            if status_code not in RETRY_STATUS_CODES or attempt >= max_retries:
+                return status_code
+            if status_code == TOO_MANY_REQUESTS and rate_controller is not None and budget is not None:
+                # Пауза задана сервером и выдерживается при получении токена общего лимита
+                attempt += 1
+                continue
 
-    return status_code
+        sleep(_backoff_delay(attempt, backoff_factor))
+        attempt += 1
 
 
 def _get_endpoint(method: str, url: str, headers: Dict, params: Dict, computer_component: str,
-                  timeout: int, func: Callable = _make_response) -> Response:
+                  timeout: int, func: Callable = _make_response, stream: bool = False) -> Response:
     """
     Функция получения endpoint с сайта API.
 
@@ -51,11 +191,13 @@ def _get_endpoint(method: str, url: str, headers: Dict, params: Dict, computer_c
     :type: int
     :param: func - вызываемая функция, отправляющая HTTP запросы.
     :type: Callable
+    :param: stream - тело ответа загружается по мере чтения (по умолчанию False).
+    :type: bool
     :return: response - результат выполнения запроса
     :rtype: Response
     """
     url = '{0}/{1}'.format(url, computer_component)
-    response = func(method, url, headers=headers, params=params, timeout=timeout)
+    response = func(method, url, headers=headers, params=params, timeout=timeout, stream=stream)
 
     return response
 
@@ -63,11 +205,40 @@ def _get_endpoint(method: str, url: str, headers: Dict, params: Dict, computer_c
 class SiteApiInterface:
     """
     Класс SiteApiInterface - предоставляет методы для получения данных с сайта API.
+    Запросы выполняются через общую HTTP сессию с пулом постоянных соединений.
 
+    Args:
+    pool_size (int): максимальное количество соединений в пуле (по умолчанию 10)
+    max_retries (int): максимальное количество повторов запроса (по умолчанию 3)
+    backoff_factor (float): базовая пауза между повторами запроса (в секундах, по умолчанию 0.5)
+    budget (Optional[RequestBudget]): общий лимит запросов к сайту API (по умолчанию None - без ограничений)
+    rate_controller (Optional[RateController]): адаптивное управление частотой запросов (по умолчанию None)
     """
-    @staticmethod
-    def get_endpoint():
-        return _get_endpoint
+    def __init__(self, pool_size: int = 10, max_retries: int = 3, backoff_factor: float = 0.5,
+                 budget: Optional[RequestBudget] = None,
+                 rate_controller: Optional[RateController] = None) -> None:
+        self._session = _create_session(pool_size)
+        self._statistics = RequestStatistics()
+        self._budget = budget
+        self._rate_controller = rate_controller
+        self._make_response = partial(_make_response, session=self._session, max_retries=max_retries,
+                                      backoff_factor=backoff_factor, statistics=self._statistics,
+                                      budget=self._budget, rate_controller=self._rate_controller)
+
+    @property
+    def statistics(self) -> RequestStatistics:
+        return self._statistics
+
+    @property
+    def budget(self) -> Optional[RequestBudget]:
+        return self._budget
+
+    @property
+    def rate_controller(self) -> Optional[RateController]:
+        return self._rate_controller
+
+    def get_endpoint(self) -> Callable:
+        return partial(_get_endpoint, func=self._make_response)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,112 @@
+from typing import Dict, List, Optional, Tuple
+from contextlib import contextmanager
+from importlib.util import resolve_name
+from threading import Lock, local
+from time import perf_counter
+import builtins
+import sys
+
+
+class StartupTimer:
+    """
+    Класс StartupTimer - замер времени запуска приложения: время импорта модулей
+    (собственное и общее с вложенными импортами, аналогично python -X importtime)
+    и время этапов инициализации (параметры, логирование, база данных).
+
+    Attributes:
+    imports (List[Tuple[str, int, float, float]]): импортированные модули в порядке завершения импорта
+    (наименование, уровень вложенности, собственное время и общее время в секундах)
+    stages (Dict[str, float]): время этапов инициализации (в секундах)
+    """
+    def __init__(self) -> None:
+        self.imports: List[Tuple[str, int, float, float]] = list()
+        self.stages: Dict[str, float] = dict()
+        self._lock = Lock()
+        self._local = local()
+        self._original_import = None
+        self._started_at: Optional[float] = None
+
+    def install(self) -> None:
+        """
+        Метод включает замер времени импорта модулей (подменяет builtins.__import__).
+        Учитываются только модули, которые импортируются впервые.
+        """
+        if self._original_import is not None:
+            return
+        self._started_at = perf_counter()
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._timed_import
+
+    def uninstall(self) -> None:
+        """
+        Метод выключает замер времени импорта модулей.
+        """
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        """
+        Метод импортирует модуль с замером времени, если модуль еще не импортирован.
+        Время вложенных импортов вычитается из собственного времени модуля.
+        """
+        original_import = self._original_import
+        try:
+            full_name = resolve_name('.' * level + name, (globals or dict()).get('__package__')) if level else name
+        except (ImportError, ValueError):
+            full_name = name
+        if full_name in sys.modules or original_import is None:
+            return (original_import or builtins.__import__)(name, globals, locals, fromlist, level)
+
+        stack: List[float] = self._local.__dict__.setdefault('stack', list())
+        stack.append(0.0)
+        started_at = perf_counter()
+        try:
+            return original_import(name, globals, locals, fromlist, level)
+        finally:
+            cumulative = perf_counter() - started_at
+            nested = stack.pop()
+            if stack:
+                stack[-1] += cumulative
+            with self._lock:
+                self.imports.append((full_name, len(stack), cumulative - nested, cumulative))
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Метод (контекстный менеджер) замеряет время этапа инициализации.
+
+        :param: name - наименование этапа.
+        :type: str
+        """
+        started_at = perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.stages[name] = self.stages.get(name, 0.0) + perf_counter() - started_at
+
+    def report(self) -> str:
+        """
+        Метод формирует отчет о времени запуска: время импорта модулей (в микросекундах)
+        в формате python -X importtime и время этапов инициализации.
+
+        :return: - текст отчета.
+        :rtype: str
+        """
+        with self._lock:
+            imports = list(self.imports)
+            stages = dict(self.stages)
+        lines = ['import time: self [us] | cumulative | imported package']
+        for name, depth, self_time, cumulative in imports:
+            lines.append(f'import time: {int(self_time * 1e6):>9} | {int(cumulative * 1e6):>10} | '
+                         f'{"  " * depth}{name}')
+        for name, duration in stages.items():
+            lines.append(f'stage time: {int(duration * 1e6):>10} | {name}')
+        if self._started_at is not None:
+            lines.append(f'startup time: {int((perf_counter() - self._started_at) * 1e6)} us')
+        return '\n'.join(lines)
+
+
+# Замер времени запуска приложения
+startup_timer = StartupTimer()
@@ -0,0 +1,23 @@
+from os import environ
+from shutil import rmtree
+from tempfile import mkdtemp
+
+# Временная папка тестов: база данных, лог и кеш ответов API
+_folder = mkdtemp(prefix='cc-tests-')
+
+
+def pytest_configure(config) -> None:
+    """
+    Функция задает параметры тестов до чтения общих параметров (get_settings): временная база данных,
+    папка лога и кеша ответов API, короткие паузы между запросами к API и лимит запросов без ожидания.
+    """
+    environ.update({'DB_PATH': f'{_folder}/cc.db', 'FOLDER_LOG': f'{_folder}/log',
+                    'API_CACHE_FOLDER': f'{_folder}/cache', 'API_SCHEME': 'http',
+                    'QUERY_INTERVALS': '[0]', 'NUMBER_REQUESTED_ITEMS': '[5, 1]', 'MAX_NUMBER_REQUESTS': '100',
+                    'API_BACKOFF_FACTOR': '0.01', 'API_REQUESTS_PER_MINUTE': '6000',
+                    'API_MIN_REQUESTS_PER_MINUTE': '6000', 'API_MAX_REQUESTS_PER_MINUTE': '6000',
+                    'SLOW_QUERY_THRESHOLD': '60'})
+
+
+def pytest_unconfigure(config) -> None:
+    rmtree(_folder, ignore_errors=True)
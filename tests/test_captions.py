@@ -0,0 +1,27 @@
+import pytest
+from tg_API.common.captions import render_caption, escape_markdown
+
+# Эталонные подписи: наименование, ссылка, стоимость (в центах) и ожидаемый текст подписи
+GOLDEN_CAPTIONS = [
+    ('Intel Core i5-6400 LGA 1151', 'https://amazon.com/dp/B07PF18XJF?tag=pc-20', 5799,
+     '[Intel Core i5-6400 LGA 1151](https://amazon.com/dp/B07PF18XJF?tag=pc-20); 57.99$'),
+    ('Kit [2 x 8 GB] DDR4', 'https://amazon.com/dp/B0143UM4TC', 10000,
+     '[Kit (2 x 8 GB) DDR4](https://amazon.com/dp/B0143UM4TC); 100.0$'),
+    ('Case (Black)', 'https://example.com/case_(black)', 4550,
+     '[Case (Black)](https://example.com/case_(black%29); 45.5$'),
+    ('ASUS PRIME_B450M *Gaming* `ATX`', 'https://amazon.com/dp/B07F_M8XJW', 8999,
+     '[ASUS PRIME_B450M *Gaming* `ATX`](https://amazon.com/dp/B07F_M8XJW); 89.99$'),
+    ('ASUS PRIME_B450M *Gaming* `ATX` [v2]', None, 8999,
+     'ASUS PRIME\\_B450M \\*Gaming\\* \\`ATX\\` \\[v2]; 89.99$'),
+    ('Noname_GPU', '', 'n/a_price',
+     'Noname\\_GPU; n/a\\_price'),
+]
+
+
+@pytest.mark.parametrize('title, link, price, expected', GOLDEN_CAPTIONS)
+def test_render_caption_golden(title, link, price, expected):
+    assert render_caption(title, link, price) == expected
+
+
+def test_escape_markdown():
+    assert escape_markdown('a_b*c`d[e]\\f') == 'a\\_b\\*c\\`d\\[e]\\\\f'
@@ -0,0 +1,164 @@
+from copy import deepcopy
+from os import path
+from shutil import rmtree
+from time import perf_counter
+import pytest
+import catalog
+from database.core import computer_components, row_hash, caption, price_change, checkpoint, compatibility
+from site_API.core import response_cache
+from site_API.fake_server import FakeApiServer, load_fixtures
+from tg_API.utils import db as db_utils
+
+# Записанные ответы API (python -m site_API.fake_server --record <DB_PATH> --fixtures tests/fixtures/api)
+FIXTURES = load_fixtures(path.join(path.dirname(__file__), 'fixtures', 'api'))
+# Компонент, загружаемый в тестах (12 записей, страницы по 5 записей)
+KEY = 'processor'
+
+
+def clear_database():
+    tables = [computer_components[KEY], row_hash['row_hash'], caption['caption'], price_change['price_change'],
+              checkpoint['checkpoint'], compatibility['compatibility']]
+    for model in tables:
+        model.delete().execute()
+    rmtree(response_cache.folder, ignore_errors=True)
+
+
+@pytest.fixture(autouse=True)
+def clean_database():
+    clear_database()
+    yield
+
+
+@pytest.fixture
+def api(monkeypatch):
+    servers = list()
+
+    def start(catalog=None, **kwargs) -> FakeApiServer:
+        server = FakeApiServer(deepcopy(FIXTURES) if catalog is None else catalog, **kwargs).start()
+        servers.append(server)
+        monkeypatch.setattr(db_utils, 'url', f'http://{server.host_api}')
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
+
+
+def stored_records():
+    model = computer_components[KEY]
+    return {record['id']: record for record in model.select().dicts()}
+
+
+def component_rows(model):
+    return model.select().where(model.computer_component == KEY).count()
+
+
+def test_initial_load(api):
+    server = api()
+    assert db_utils._load_data(KEY) is True
+    records = stored_records()
+    assert set(records) == {record['id'] for record in FIXTURES[KEY]}
+    assert all(records[record['id']]['price'] == int(record['price'] * 100) for record in FIXTURES[KEY])
+    assert component_rows(row_hash['row_hash']) == len(FIXTURES[KEY])
+    assert component_rows(caption['caption']) == len(FIXTURES[KEY])
+    assert component_rows(compatibility['compatibility']) == len(FIXTURES[KEY])
+    assert component_rows(checkpoint['checkpoint']) == 0
+    assert server.status_codes == {200: 3}
+
+
+def test_reload_stores_changes_and_deletes_missing(api):
+    server = api()
+    assert db_utils._load_data(KEY) is True
+    catalog = deepcopy(FIXTURES)
+    cheaper, renamed, removed = catalog[KEY][0], catalog[KEY][6], catalog[KEY].pop()
+    cheaper['price'] = round(cheaper['price'] - 10, 2)
+    renamed['title'] = f'{renamed["title"]} (new)'
+    server.catalog = catalog
+
+    assert db_utils._load_data(KEY) is True
+    records = stored_records()
+    assert removed['id'] not in records
+    assert records[cheaper['id']]['price'] == int(cheaper['price'] * 100)
+    assert records[renamed['id']]['title'] == renamed['title']
+    model_caption = caption['caption']
+    assert '(new)' in model_caption.get(model_caption.record_id == renamed['id']).caption
+    assert component_rows(row_hash['row_hash']) == len(catalog[KEY])
+    assert component_rows(model_caption) == len(catalog[KEY])
+    changes = list(price_change['price_change'].select().dicts())
+    assert [(change['record_id'], change['price_new']) for change in changes] == \
+           [(cheaper['id'], int(cheaper['price'] * 100))]
+    assert changes[0]['price_old'] > changes[0]['price_new']
+
+
+def test_unchanged_pages_reused_by_etag(api):
+    server = api()
+    assert db_utils._load_data(KEY) is True
+    model_hash = row_hash['row_hash']
+    first_run = {element.run_id for element in model_hash.select()}
+
+    assert db_utils._load_data(KEY) is True
+    assert server.status_codes == {200: 3, 304: 3}
+    assert len(stored_records()) == len(FIXTURES[KEY])
+    assert price_change['price_change'].select().count() == 0
+    # Записи неизменившихся страниц отмечены как полученные в новой загрузке
+    second_run = {element.run_id for element in model_hash.select()}
+    assert len(second_run) == 1 and second_run != first_run
+
+
+def test_too_many_requests_waits_retry_after(api):
+    server = api(throttle_rate=0.3, seed=1)
+    start_time = perf_counter()
+    assert db_utils._load_data(KEY) is True
+    assert server.status_codes.get(429, 0) >= 1
+    # Ответ 429 содержит Retry-After: 1 - следующий запрос отправляется не ранее чем через секунду
+    assert perf_counter() - start_time >= 1
+    assert len(stored_records()) == len(FIXTURES[KEY])
+
+
+def test_server_errors_retried(api):
+    server = api(error_rate=0.3, seed=2)
+    assert db_utils._load_data(KEY) is True
+    assert server.status_codes.get(500, 0) >= 1
+    assert len(stored_records()) == len(FIXTURES[KEY])
+    assert component_rows(checkpoint['checkpoint']) == 0
+
+
+def test_reload_after_catalog_import_stores_nothing(api, monkeypatch, tmp_path):
+    api()
+    assert db_utils._load_data(KEY) is True
+    file_name = str(tmp_path / 'catalog.ndjson')
+    catalog.export_catalog(file_name)
+    # Загрузка каталога в базу данных нового экземпляра бота
+    clear_database()
+    assert catalog.import_catalog(file_name)[KEY] == len(FIXTURES[KEY])
+    assert component_rows(row_hash['row_hash']) == len(FIXTURES[KEY])
+    assert component_rows(caption['caption']) == len(FIXTURES[KEY])
+    assert component_rows(compatibility['compatibility']) == len(FIXTURES[KEY])
+
+    numbers_changed = list()
+    store_changes = db_utils._store_changes
+
+    def counting_store_changes(*args):
+        numbers_changed.append(store_changes(*args))
+        return numbers_changed[-1]
+
+    monkeypatch.setattr(db_utils, '_store_changes', counting_store_changes)
+    assert db_utils._load_data(KEY) is True
+    assert numbers_changed and sum(numbers_changed) == 0
+
+
+def test_catalog_import_clear_deletes_record_indexes(api, tmp_path):
+    api()
+    assert db_utils._load_data(KEY) is True
+    file_name = str(tmp_path / 'catalog.ndjson')
+    catalog.export_catalog(file_name)
+    removed = computer_components[KEY].select().order_by(computer_components[KEY].id.desc()).get().id
+    with open(file_name, encoding='utf8') as file:
+        lines = [line for line in file if removed not in line]
+    with open(file_name, 'w', encoding='utf8') as file:
+        file.writelines(lines)
+
+    assert catalog.import_catalog(file_name, clear=True)[KEY] == len(FIXTURES[KEY]) - 1
+    for model in (row_hash['row_hash'], caption['caption'], compatibility['compatibility']):
+        assert component_rows(model) == len(FIXTURES[KEY]) - 1
+        assert not model.select().where(model.record_id == removed).exists()
@@ -0,0 +1,51 @@
+from typing import Any
+
+# Версия шаблона подписи записи. При изменении функции render_caption версия увеличивается,
+# подписи предыдущих версий формируются заново при выводе в чат.
+CAPTION_TEMPLATE_VERSION = 2
+# Символы разметки Markdown (parse_mode='Markdown'), которые экранируются в тексте вне ссылок
+MARKDOWN_SPECIAL_CHARACTERS = '\\_*`['
+
+
+def escape_markdown(text: str) -> str:
+    """
+    Функция экранирует символы разметки Markdown (parse_mode='Markdown') в тексте вне ссылок:
+    перед символами _ * ` [ и обратной косой чертой добавляется обратная косая черта.
+
+    :param: text - текст.
+    :type: str
+    :return: - текст с экранированными символами разметки.
+    :rtype: str
+    """
+    return ''.join(f'\\{character}' if character in MARKDOWN_SPECIAL_CHARACTERS else character
+                   for character in text)
+
+
+def render_caption(title: Any, link: Any, price: Any) -> str:
+    """
+    Функция формирует подпись записи компьютерного компонента для вывода в чат (Markdown, без нумерации):
+    наименование со ссылкой на компонент в интернет-магазине и стоимость в долларах.
+    Текст ссылки в Markdown выводится без разбора разметки (символы _ * ` выводятся как есть, экранирование
+    внутри ссылки не поддерживается), поэтому квадратные скобки в наименовании заменяются круглыми,
+    закрывающая скобка в ссылке кодируется. Если ссылки нет, наименование и стоимость выводятся
+    с экранированными символами разметки.
+
+    :param: title - наименование компонента.
+    :type: Any
+    :param: link - ссылка на компонент в интернет-магазине.
+    :type: Any
+    :param: price - стоимость компонента (в центах).
+    :type: Any
+    :return: - текст подписи.
+    :rtype: str
+    """
+    price_text: str = str(price)
+    try:
+        price_text = f'{int(price_text) / 100}$'
+    except ValueError:
+        price_text = escape_markdown(price_text)
+    if not link:
+        return f'{escape_markdown(str(title))}; {price_text}'
+    title_text: str = str(title).replace('[', '(').replace(']', ')')
+    link_text: str = str(link).replace(')', '%29')
+    return f'[{title_text}]({link_text}); {price_text}'
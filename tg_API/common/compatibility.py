@@ -0,0 +1,131 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from functools import lru_cache
+from re import compile, IGNORECASE
+
+# Атрибуты совместимости: тип разъема процессора и тип оперативной памяти
+SOCKET = 'socket'
+MEMORY = 'memory'
+# Атрибуты совместимости компонентов (нормализуются при загрузке данных с API и сохраняются в индекс)
+COMPATIBILITY_ATTRIBUTES: Dict[str, Tuple[str, ...]] = {'processor': (SOCKET,), 'motherboard': (SOCKET, MEMORY),
+                                                        'ram': (MEMORY,)}
+# Совместимые компоненты. Ключ - компонент, значение - совместимые компоненты и общий атрибут совместимости
+COMPATIBLE_COMPONENTS: Dict[str, Tuple[Tuple[str, str], ...]] = {
+    'processor': (('motherboard', SOCKET),),
+    'motherboard': (('processor', SOCKET), ('ram', MEMORY)),
+    'ram': (('motherboard', MEMORY),)}
+# Признак данных кнопки совместимых компонентов (callback_data: compat:<компонент>:<id записи>)
+COMPATIBLE_PREFIX = 'compat'
+# Надпись на кнопке совместимых компонентов
+COMPATIBLE_BUTTON = 'Совместимые'
+# Максимальный размер данных кнопки (ограничение Telegram для callback_data, в байтах)
+MAX_CALLBACK_DATA = 64
+# Тип оперативной памяти в тексте (например 'DDR4', 'ddr 3')
+MEMORY_TYPE = compile(r'DDR\s*(\d)', IGNORECASE)
+
+
+@lru_cache(maxsize=4096)
+def normalize_socket(value: Any) -> str:
+    """
+    Функция приводит тип разъема процессора (материнской платы) к единому виду:
+    верхний регистр, без пробелов, дефисов и слова SOCKET (например 'LGA 1151' и 'Socket LGA-1151' - 'LGA1151').
+
+    :param: value - тип разъема.
+    :type: Any
+    :return: - тип разъема в едином виде (пустая строка, если разъем не задан).
+    :rtype: str
+    """
+    text = str(value or '').upper().replace('SOCKET', '')
+    return ''.join(character for character in text if character.isalnum())
+
+
+def normalize_memory_type(*values: Any) -> str:
+    """
+    Функция возвращает тип оперативной памяти в едином виде (например 'DDR4') по первому значению,
+    в котором тип найден.
+
+    :param: *values - текстовые значения (тип памяти, наименование компонента).
+    :type: Any
+    :return: - тип оперативной памяти (пустая строка, если тип не найден).
+    :rtype: str
+    """
+    for value in values:
+        found = MEMORY_TYPE.search(str(value or ''))
+        if found:
+            return f'DDR{found.group(1)}'
+    return ''
+
+
+def compatibility_values(key: str, record: Dict) -> Dict[str, str]:
+    """
+    Функция возвращает нормализованные атрибуты совместимости записи компонента.
+    Тип памяти материнской платы определяется по наименованию и чипсету (отдельного поля нет),
+    тип памяти модуля оперативной памяти - по полю type или по наименованию.
+
+    :param: key - компьютерный компонент.
+    :type: str
+    :param: record - запись компонента (словарь полей).
+    :type: Dict
+    :return: - словарь атрибутов. Ключ - атрибут (SOCKET, MEMORY), значение - нормализованное значение
+    (атрибуты без значения не включаются).
+    :rtype: Dict[str, str]
+    """
+    values: Dict[str, str] = dict()
+    if key in ('processor', 'motherboard'):
+        values[SOCKET] = normalize_socket(record.get('socketType'))
+    if key == 'motherboard':
+        values[MEMORY] = normalize_memory_type(record.get('title'), record.get('chipset'))
+    elif key == 'ram':
+        values[MEMORY] = normalize_memory_type(record.get('type'), record.get('title'))
+    return {attribute: value for attribute, value in values.items() if value}
+
+
+def compatibility_rows(key: str, records: Iterable[Dict]) -> List[Dict]:
+    """
+    Функция возвращает строки индекса совместимости (таблица Compatibility) для записей компонента.
+
+    :param: key - компьютерный компонент.
+    :type: str
+    :param: records - записи компонента (словари полей).
+    :type: Iterable[Dict]
+    :return: - строки индекса: словари с ключами computer_component, record_id, attribute, value
+    (пустой список, если совместимость для компонента не определяется).
+    :rtype: List[Dict]
+    """
+    if key not in COMPATIBILITY_ATTRIBUTES:
+        return list()
+    return [{'computer_component': key, 'record_id': record['id'], 'attribute': attribute, 'value': value}
+            for record in records for attribute, value in compatibility_values(key, record).items()]
+
+
+def encode_compatible_data(key: str, record_id: str) -> Optional[str]:
+    """
+    Функция возвращает данные кнопки совместимых компонентов для записи.
+
+    :param: key - компьютерный компонент.
+    :type: str
+    :param: record_id - идентификатор записи.
+    :type: str
+    :return: - данные кнопки или None, если для компонента совместимость не определяется
+    или данные не помещаются в MAX_CALLBACK_DATA байт.
+    :rtype: Optional[str]
+    """
+    if key not in COMPATIBLE_COMPONENTS or not record_id:
+        return None
+    data = f'{COMPATIBLE_PREFIX}:{key}:{record_id}'
+    return data if len(data.encode('utf-8')) <= MAX_CALLBACK_DATA else None
+
+
+def decode_compatible_data(data: str) -> Optional[Tuple[str, str]]:
+    """
+    Функция возвращает компонент и идентификатор записи из данных кнопки совместимых компонентов.
+
+    :param: data - данные кнопки (callback_data).
+    :type: str
+    :return: - компьютерный компонент и идентификатор записи или None, если данные не являются
+    данными кнопки совместимых компонентов.
+    :rtype: Optional[Tuple[str, str]]
+    """
+    parts = data.split(':', 2)
+    if len(parts) != 3 or parts[0] != COMPATIBLE_PREFIX or parts[1] not in COMPATIBLE_COMPONENTS or not parts[2]:
+        return None
+    return parts[1], parts[2]
@@ -0,0 +1,176 @@
+from typing import Dict, List, Optional, Tuple
+from collections import OrderedDict
+from re import compile
+from threading import Lock
+from time import monotonic
+from telebot import TeleBot
+from telebot.types import InlineQuery, InlineQueryResultArticle, InputTextMessageContent
+from settings import get_settings
+from tg_API.utils.db import ComputerComponentDatabase
+from tg_API.common.printing_records import page_captions
+from database.core import load_query_in_rows
+from log.logging import Logging
+from metrics.tracing import span
+
+# Общие параметры
+site = get_settings()
+# Количество результатов в одном ответе на inline запрос (не более 50 по ограничению Telegram)
+INLINE_PAGE_SIZE = 20
+# Максимальный размер смещения следующей страницы (ограничение Telegram для next_offset, в байтах)
+MAX_NEXT_OFFSET = 64
+# Диапазон цен в тексте inline запроса (в долларах), например: 300-400
+PRICE_RANGE = compile(r'(\d+)\s*-\s*(\d+)')
+# Подготовка к записи ошибок в лог файл
+logger = Logging('main').get_logger()
+
+
+class QueryCache:
+    """
+    Класс QueryCache - кеш результатов запросов к базе данных для ответов на inline запросы.
+    Хранит не более заданного количества запросов (вытесняются давно не использованные),
+    результаты устаревают через заданное время. Для inline запросов кешируются страницы
+    (не более INLINE_PAGE_SIZE + 1 записей), поэтому объем кеша ограничен независимо от размера каталога.
+
+    Args:
+    max_size (int): максимальное количество запросов в кеше
+    ttl (float): время хранения результатов запроса (в секундах)
+    """
+    def __init__(self, max_size: int, ttl: float) -> None:
+        self._max_size = max_size
+        self._ttl = ttl
+        self._lock = Lock()
+        self._items: OrderedDict = OrderedDict()
+
+    def get(self, key: Tuple) -> Optional[List]:
+        """
+        Метод возвращает результаты запроса из кеша.
+
+        :param: key - ключ запроса.
+        :type: Tuple
+        :return: - результаты запроса или None, если запрос отсутствует в кеше или результаты устарели.
+        :rtype: Optional[List]
+        """
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            created_at, records = item
+            if monotonic() - created_at > self._ttl:
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return records
+
+    def put(self, key: Tuple, records: List) -> None:
+        """
+        Метод сохраняет результаты запроса в кеше.
+
+        :param: key - ключ запроса.
+        :type: Tuple
+        :param: records - результаты запроса.
+        :type: List
+        """
+        with self._lock:
+            self._items[key] = (monotonic(), records)
+            self._items.move_to_end(key)
+            while len(self._items) > self._max_size:
+                self._items.popitem(last=False)
+
+
+# Кеш результатов inline запросов
+query_cache = QueryCache(site.inline_cache_size, site.inline_cache_ttl)
+
+
+def parse_inline_query(text: str, names_computer_components: Dict[str, str]) -> Optional[Tuple[str, int, int]]:
+    """
+    Функция разбирает текст inline запроса: компьютерный компонент (наименование endpoint
+    или наименование для отображения, допускается начало наименования или слова наименования)
+    и диапазон цен в долларах.
+
+    :param: text - текст inline запроса (например: 'gpu 300-400').
+    :type: str
+    :param: names_computer_components - словарь наименований компьютерных компонентов для отображения.
+    :type: Dict[str, str]
+    :return: - компьютерный компонент, цена от и цена до (в центах)
+    или None, если компонент не найден. Если диапазон цен не задан, возвращается диапазон всех цен.
+    :rtype: Optional[Tuple[str, int, int]]
+    """
+    price_from, price_up_to = 0, 2 ** 63 - 1
+    price_range = PRICE_RANGE.search(text)
+    if price_range:
+        price_from, price_up_to = sorted((int(price_range.group(1)) * 100, int(price_range.group(2)) * 100))
+        text = ''.join((text[:price_range.start()], text[price_range.end():]))
+    text = ' '.join(text.split()).lower()
+    if not text:
+        return None
+    for key, name in names_computer_components.items():
+        if text == key or name.lower().startswith(text):
+            return key, price_from, price_up_to
+    for key, name in names_computer_components.items():
+        if key.startswith(text) or any(word.startswith(text) for word in name.lower().split()):
+            return key, price_from, price_up_to
+    return None
+
+
+def parse_inline_offset(offset: str) -> Optional[Tuple[int, str]]:
+    """
+    Функция возвращает ключ страницы inline запроса из смещения (next_offset предыдущего ответа).
+
+    :param: offset - смещение: '<цена>:<id>' последней записи предыдущей страницы (пустая строка - первая страница).
+    :type: str
+    :return: - цена и идентификатор последней записи предыдущей страницы или None для первой страницы
+    (и для неверного смещения).
+    :rtype: Optional[Tuple[int, str]]
+    """
+    price, _, record_id = offset.partition(':')
+    if not price.isdigit() or not record_id:
+        return None
+    return int(price), record_id
+
+
+def answer_inline_query(bot: TeleBot, inline_query: InlineQuery, names_computer_components: Dict[str, str]) -> None:
+    """
+    Функция отвечает на inline запрос страницей записей каталога в заданном диапазоне цен.
+    Страница читается из базы данных по ключу (next_offset - цена и id последней записи страницы,
+    запрашивается INLINE_PAGE_SIZE + 1 записей, чтобы определить наличие следующей страницы),
+    страницы кешируются (query_cache) по запросу и смещению.
+    Подписи записей читаются из базы данных, изображения не загружаются (передаются ссылки на изображения).
+
+    :param: bot - телеграм бот.
+    :type: TeleBot
+    :param: inline_query - объект из telebot, содержащий информацию об inline запросе.
+    :type: InlineQuery
+    :param: names_computer_components - словарь наименований компьютерных компонентов для отображения.
+    :type: Dict[str, str]
+    """
+    with span('parse'):
+        parsed = parse_inline_query(inline_query.query, names_computer_components)
+    if parsed is None:
+        bot.answer_inline_query(inline_query.id, list(), cache_time=site.inline_cache_ttl)
+        return
+
+    after = parse_inline_offset(inline_query.offset)
+    cache_key = (*parsed, after)
+    records = query_cache.get(cache_key)
+    if records is None:
+        db_records_page = ComputerComponentDatabase.records_page_by_price()
+        records = load_query_in_rows(db_records_page(*parsed, INLINE_PAGE_SIZE + 1, after=after))
+        query_cache.put(cache_key, records)
+
+    page = records[:INLINE_PAGE_SIZE]
+    captions = page_captions(parsed[0], page, 1, INLINE_PAGE_SIZE, is_numbering=False)
+    results: List[InlineQueryResultArticle] = list()
+    for element, caption in zip(page, captions):
+        results.append(InlineQueryResultArticle(
+            id=str(element.id), title=str(element.title)[:256],
+            input_message_content=InputTextMessageContent(caption['text'], parse_mode='Markdown'),
+            url=str(element.link), description=f'{element.price / 100}$',
+            thumbnail_url=caption['img'] or None))
+
+    next_offset: str = ''
+    if len(records) > INLINE_PAGE_SIZE:
+        next_offset = f'{page[-1].price}:{page[-1].id}'
+        # Смещение длиннее ограничения Telegram - следующая страница не предлагается
+        if len(next_offset.encode('utf-8')) > MAX_NEXT_OFFSET:
+            next_offset = ''
+    bot.answer_inline_query(inline_query.id, results, cache_time=site.inline_cache_ttl, next_offset=next_offset)
@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import List, Dict, Optional
 from telebot import TeleBot
 from telebot.types import Message, InlineKeyboardMarkup, InlineKeyboardButton, \
     KeyboardButton, ReplyKeyboardMarkup, ReplyKeyboardRemove
@@ -28,7 +28,8 @@ def build_menu(buttons: List, number_columns: int, header_buttons=None,
     return menu
 
 
-def generate_markup(menu, number_columns: int, type_menu: str, is_numbering: bool, start_index: int):
+def generate_markup(menu, number_columns: int, type_menu: str, is_numbering: bool, start_index: int,
+                    footer_menu: Optional[Dict] = None):
     """
     Функция формирует меню из кнопок вида InlineKeyboardMarkup или ReplyKeyboardMarkup.
 
@@ -51,6 +52,10 @@ def generate_markup(menu, number_columns: int, type_menu: str, is_numbering: boo
     :type: bool
     :param: start_index - начальный индекс нумерации кнопок.
     :type: int
+    :param: footer_menu - словарь для формирования нижнего ряда кнопок меню вида InlineKeyboardMarkup
+    (например, кнопок перехода между страницами). Ключ - для идентификации кнопки при нажатии,
+    значение - для надписи на кнопке. Значение по умолчанию None.
+    :type: Optional[Dict]
     :return: markup - сгенерированное меню кнопок.
     :rtype: ReplyKeyboardMarkup, InlineKeyboardMarkup
     """
@@ -65,6 +70,9 @@ def generate_markup(menu, number_columns: int, type_menu: str, is_numbering: boo
             else:
                 button_list.append(InlineKeyboardButton(f'{menu[element]}', callback_data=element))
         markup = InlineKeyboardMarkup(build_menu(button_list, number_columns))
+        if footer_menu:
+            markup.row(*[InlineKeyboardButton(f'{footer_menu[element]}', callback_data=element)
+                         for element in footer_menu])
     elif type_menu == 'Reply':
         for element in menu:
             button_list.append(KeyboardButton(element))
@@ -88,7 +96,8 @@ def generate_markup(menu, number_columns: int, type_menu: str, is_numbering: boo
 
 def send_message_with_markup(bot: TeleBot, message: Message, text: str,
                              menu, number_columns: int = 2, type_menu: str = 'Inline',
-                             is_numbering: bool = True, start_index: int = 1) -> None:
+                             is_numbering: bool = True, start_index: int = 1,
+                             footer_menu: Optional[Dict] = None) -> None:
     """
     Функция отправляет сообщение в чат и выводит кнопки.
 
@@ -115,15 +124,20 @@ def send_message_with_markup(bot: TeleBot, message: Message, text: str,
     :type: bool
     :param: start_index - начальный индекс нумерации кнопок. Значение по умолчанию 1.
     :type: int
+    :param: footer_menu - словарь для формирования нижнего ряда кнопок меню вида InlineKeyboardMarkup.
+    Значение по умолчанию None.
+    :type: Optional[Dict]
     """
     bot.send_message(message.chat.id, text,
-                     reply_markup=generate_markup(menu, number_columns, type_menu, is_numbering, start_index),
+                     reply_markup=generate_markup(menu, number_columns, type_menu, is_numbering, start_index,
+                                                  footer_menu),
                      parse_mode='Markdown')
 
 
 def edit_message_with_markup(bot: TeleBot, message: Message, text: str,
                              menu, number_columns: int = 2, type_menu: str = 'Inline',
-                             is_numbering: bool = True, start_index: int = 1) -> None:
+                             is_numbering: bool = True, start_index: int = 1,
+                             footer_menu: Optional[Dict] = None) -> None:
     """
     Функция редактирует сообщение в чате и выводит кнопки.
 
@@ -150,9 +164,13 @@ def edit_message_with_markup(bot: TeleBot, message: Message, text: str,
     :type: bool
     :param: start_index - начальный индекс нумерации кнопок. Значение по умолчанию 1.
     :type: int
+    :param: footer_menu - словарь для формирования нижнего ряда кнопок меню вида InlineKeyboardMarkup.
+    Значение по умолчанию None.
+    :type: Optional[Dict]
     """
     bot.edit_message_text(text, message.chat.id, message.message_id,
-                          reply_markup=generate_markup(menu, number_columns, type_menu, is_numbering, start_index),
+                          reply_markup=generate_markup(menu, number_columns, type_menu, is_numbering, start_index,
+                                                       footer_menu),
                           parse_mode='Markdown')
 
 
@@ -170,9 +188,9 @@ def send_message(bot: TeleBot, message: Message, text: str) -> None:
     bot.send_message(message.chat.id, text, parse_mode='Markdown')
 
 
-def send_photo(bot: TeleBot, message: Message, photo, caption: str) -> None:
+def send_photo(bot: TeleBot, message: Message, photo, caption: str, menu: Optional[Dict] = None) -> None:
     """
-    Функция отправляет картинку с надписью в чат.
+    Функция отправляет картинку с надписью в чат (с кнопками под картинкой, если задано меню).
 
     :param: bot - телеграм бот.
     :type: TeleBot
@@ -182,5 +200,9 @@ def send_photo(bot: TeleBot, message: Message, photo, caption: str) -> None:
     :type:
     :param: caption - текст для надписи.
     :type: str
+    :param: menu - словарь для формирования кнопок вида InlineKeyboardMarkup (в одну колонку, без нумерации).
+    Ключ - для идентификации кнопки при нажатии, значение - для надписи на кнопке. Значение по умолчанию None.
+    :type: Optional[Dict]
     """
-    bot.send_photo(message.chat.id, photo, caption, parse_mode='Markdown')
+    bot.send_photo(message.chat.id, photo, caption, parse_mode='Markdown',
+                   reply_markup=generate_markup(menu, 1, 'Inline', False, 1) if menu else None)
@@ -0,0 +1,102 @@
+from typing import NamedTuple, Optional
+from database.core import computer_components
+
+# Версия формата данных кнопки перехода между страницами (при изменении формата увеличивается)
+CURSOR_VERSION = '1'
+# Признак данных кнопки перехода между страницами (первый символ callback_data)
+CURSOR_PREFIX = 'p'
+# Максимальный размер данных кнопки (ограничение Telegram для callback_data, в байтах)
+MAX_CALLBACK_DATA = 64
+# Коды команд
+COMMAND_CODES = {'low': 'l', 'high': 'h', 'custom': 'c'}
+# Коды компьютерных компонентов (по порядку в словаре компонентов, новые компоненты добавляются в конец)
+COMPONENT_CODES = {key: f'{index:x}' for index, key in enumerate(computer_components)}
+# Направления перехода: следующая и предыдущая страницы
+NEXT = 'n'
+PREVIOUS = 'p'
+
+_COMMANDS = {code: command for command, code in COMMAND_CODES.items()}
+_COMPONENTS = {code: key for key, code in COMPONENT_CODES.items()}
+_DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+
+
+def _to_base36(value: int) -> str:
+    if value < 0:
+        return f'-{_to_base36(-value)}'
+    digits = ''
+    while True:
+        value, remainder = divmod(value, 36)
+        digits = _DIGITS[remainder] + digits
+        if not value:
+            return digits
+
+
+class PageCursor(NamedTuple):
+    """
+    Класс PageCursor - состояние перехода к странице записей, передаваемое в данных кнопки (callback_data).
+    Следующая страница читается после записи (price, record_id), предыдущая - до нее (постраничный вывод
+    по ключу). Если ключ не поместился в данные кнопки, record_id пустой и страница читается по номеру записи.
+
+    Attributes:
+    command (str): команда (low, high, custom)
+    computer_component (str): компьютерный компонент
+    price_from (int): левая граница диапазона цен (в центах)
+    price_up_to (int): правая граница диапазона цен (в центах)
+    direction (str): направление перехода (NEXT, PREVIOUS)
+    start_index (int): номер первой записи страницы перехода
+    price (int): стоимость записи-ключа (последней записи текущей страницы для NEXT, первой - для PREVIOUS)
+    record_id (str): идентификатор записи-ключа
+    """
+    command: str
+    computer_component: str
+    price_from: int
+    price_up_to: int
+    direction: str
+    start_index: int
+    price: int
+    record_id: str
+
+    def encode(self) -> str:
+        """
+        Метод возвращает данные кнопки (не более MAX_CALLBACK_DATA байт).
+        Формат: p<версия><команда><компонент><направление>:<цена от>:<цена до>:<номер>:<цена ключа>:<id ключа>
+        (числа - в системе счисления с основанием 36).
+
+        :return: - данные кнопки.
+        :rtype: str
+        """
+        data = ':'.join((f'{CURSOR_PREFIX}{CURSOR_VERSION}{COMMAND_CODES[self.command]}'
+                         f'{COMPONENT_CODES[self.computer_component]}{self.direction}',
+                         _to_base36(self.price_from), _to_base36(self.price_up_to), _to_base36(self.start_index),
+                         _to_base36(self.price), self.record_id))
+        if len(data.encode('utf-8')) > MAX_CALLBACK_DATA:
+            return self._replace(price=0, record_id='').encode()
+        return data
+
+
+def decode_page_cursor(data: str) -> Optional[PageCursor]:
+    """
+    Функция возвращает состояние перехода к странице записей из данных кнопки.
+
+    :param: data - данные кнопки (callback_data).
+    :type: str
+    :return: - состояние перехода или None, если данные не являются данными кнопки перехода текущей версии.
+    :rtype: Optional[PageCursor]
+    """
+    if not data.startswith(CURSOR_PREFIX + CURSOR_VERSION):
+        return None
+    parts = data.split(':', 5)
+    if len(parts) != 6 or len(parts[0]) != 5:
+        return None
+    header = parts[0]
+    command = _COMMANDS.get(header[2])
+    computer_component = _COMPONENTS.get(header[3])
+    direction = header[4]
+    if command is None or computer_component is None or direction not in (NEXT, PREVIOUS):
+        return None
+    try:
+        price_from, price_up_to, start_index, price = (int(part, 36) for part in parts[1:5])
+    except ValueError:
+        return None
+    return PageCursor(command, computer_component, price_from, price_up_to, direction, max(1, start_index),
+                      price, parts[5])
@@ -0,0 +1,227 @@
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+from functools import lru_cache
+from math import prod
+from re import compile
+from tg_API.common.compatibility import normalize_socket
+
+# Категории сборки и веса оценок компонентов в общей оценке сборки
+BUILD_WEIGHTS: Dict[str, float] = {'processor': 3, 'motherboard': 1, 'ram': 2, 'gpu': 4,
+                                   'power_supply': 0.5, 'case': 0.25, 'storage': 1}
+# Поля оценки компонентов (оценка - произведение чисел в значениях полей, например '2 x 8 GB' - 16)
+SCORE_FIELDS: Dict[str, Tuple[str, ...]] = {'processor': ('speed',), 'motherboard': ('memorySlots',),
+                                            'ram': ('quantity',), 'gpu': ('memory', 'clockSpeed'),
+                                            'power_supply': ('power',), 'case': (), 'storage': ('cacheMemory',)}
+# Категории, совместимые по разъему (выбираются парой с одинаковым разъемом)
+SOCKET_CATEGORIES = ('processor', 'motherboard')
+# Количество интервалов стоимости в пределах бюджета: в каждом интервале стоимости Парето-фронта
+# остается один вариант (с максимальной оценкой), размер фронта не превышает количества интервалов
+PRICE_BUCKETS = 2000
+# Число в текстовом значении поля
+NUMBER = compile(r'\d+(?:[.,]\d+)?')
+
+
+class Candidate(NamedTuple):
+    """
+    Класс Candidate - запись компонента, участвующая в подборе сборки.
+
+    Attributes:
+    record_id (str): идентификатор записи
+    price (int): стоимость (в центах)
+    score (float): оценка (произведение оценок полей SCORE_FIELDS, см. value_score)
+    socket (str): тип разъема в едином виде (для процессоров и материнских плат, см. normalize_socket)
+    """
+    record_id: str
+    price: int
+    score: float
+    socket: str
+
+
+class BuildOption(NamedTuple):
+    """
+    Класс BuildOption - вариант части сборки: набор записей компонентов, общая стоимость и оценка.
+
+    Attributes:
+    price (int): стоимость (в центах)
+    score (float): оценка
+    records (Tuple[str, ...]): идентификаторы записей компонентов (по порядку добавления категорий)
+    """
+    price: int
+    score: float
+    records: Tuple[str, ...]
+
+
+@lru_cache(maxsize=4096)
+def value_score(value: Any) -> float:
+    """
+    Функция возвращает оценку текстового значения поля: произведение чисел в значении
+    (значения полей повторяются, результаты кешируются).
+
+    :param: value - значение поля (например '3.8 GHz' или '2 x 8 GB').
+    :type: Any
+    :return: - оценка (0, если числа в значении не найдены).
+    :rtype: float
+    """
+    numbers = NUMBER.findall(str(value or ''))
+    return prod(float(number.replace(',', '.')) for number in numbers) if numbers else 0.0
+
+
+def candidate_columns(key: str) -> Tuple[str, ...]:
+    """
+    Функция возвращает поля записей компонента, которые читаются для подбора сборки.
+
+    :param: key - компьютерный компонент.
+    :type: str
+    :return: - поля: идентификатор, стоимость, поля оценки и тип разъема (для процессоров и материнских плат).
+    :rtype: Tuple[str, ...]
+    """
+    return ('id', 'price', *SCORE_FIELDS[key], *(('socketType',) if key in SOCKET_CATEGORIES else ()))
+
+
+def load_candidates(key: str, rows: Iterable[Tuple]) -> List[Candidate]:
+    """
+    Функция преобразует строки записей компонента (поля candidate_columns) в записи для подбора сборки.
+    Оценка записи - произведение оценок полей, поля без чисел не учитываются.
+
+    :param: key - компьютерный компонент.
+    :type: str
+    :param: rows - строки записей (кортежи).
+    :type: Iterable[Tuple]
+    :return: - записи для подбора сборки.
+    :rtype: List[Candidate]
+    """
+    number_fields = len(SCORE_FIELDS[key])
+    is_socket = key in SOCKET_CATEGORIES
+    candidates: List[Candidate] = list()
+    for row in rows:
+        scores = [score for score in map(value_score, row[2:2 + number_fields]) if score]
+        score = prod(scores) if scores else 0.0
+        candidates.append(Candidate(row[0], row[1], score, normalize_socket(row[-1]) if is_socket else ''))
+    return candidates
+
+
+def pareto_front(options: Iterable[Any], price_step: int = 1) -> List[Any]:
+    """
+    Функция возвращает Парето-фронт вариантов: варианты, для которых нет более дешевого варианта
+    с не меньшей оценкой (по возрастанию стоимости и оценки). Стоимость сравнивается с точностью
+    до price_step: в каждом интервале стоимости остается вариант с максимальной оценкой.
+
+    :param: options - варианты (BuildOption или Candidate: объекты с полями price и score).
+    :type: Iterable[Any]
+    :param: price_step - интервал стоимости (в центах, по умолчанию 1 - точное сравнение).
+    :type: int
+    :return: - Парето-фронт.
+    :rtype: List[Any]
+    """
+    front: List[Any] = list()
+    best_score = float('-inf')
+    for option in sorted(options, key=lambda element: (-(-element.price // price_step), -element.score)):
+        if option.score > best_score:
+            front.append(option)
+            best_score = option.score
+    return front
+
+
+def combine(front: List[BuildOption], other: List[BuildOption], budget: int,
+            price_step: int = 1) -> List[BuildOption]:
+    """
+    Функция объединяет два Парето-фронта (шаг динамического программирования по категориям):
+    перебираются пары вариантов в пределах бюджета, результат сокращается до Парето-фронта.
+
+    :param: front - Парето-фронт первой части сборки (по возрастанию стоимости).
+    :type: List[BuildOption]
+    :param: other - Парето-фронт второй части сборки (по возрастанию стоимости).
+    :type: List[BuildOption]
+    :param: budget - бюджет объединенной части сборки (в центах).
+    :type: int
+    :param: price_step - интервал стоимости Парето-фронта (в центах).
+    :type: int
+    :return: - Парето-фронт объединенной части сборки.
+    :rtype: List[BuildOption]
+    """
+    options: List[BuildOption] = list()
+    for option in front:
+        for other_option in other:
+            price = option.price + other_option.price
+            if price > budget:
+                break
+            options.append(BuildOption(price, option.score + other_option.score,
+                                       option.records + other_option.records))
+    return pareto_front(options, price_step)
+
+
+def category_front(key: str, candidates: Iterable[Candidate], max_score: float,
+                   price_step: int = 1) -> List[BuildOption]:
+    """
+    Функция возвращает Парето-фронт вариантов категории сборки. Оценки записей фронта нормируются
+    по максимальной оценке категории и умножаются на вес категории (нормирование не меняет фронт).
+
+    :param: key - компьютерный компонент.
+    :type: str
+    :param: candidates - записи компонента.
+    :type: Iterable[Candidate]
+    :param: max_score - максимальная оценка записи категории.
+    :type: float
+    :param: price_step - интервал стоимости Парето-фронта (в центах).
+    :type: int
+    :return: - Парето-фронт (варианты по одной записи).
+    :rtype: List[BuildOption]
+    """
+    weight = BUILD_WEIGHTS[key] / max_score if max_score > 0 else 0.0
+    return [BuildOption(element.price, element.score * weight, (element.record_id,))
+            for element in pareto_front(candidates, price_step)]
+
+
+def best_build(candidates: Dict[str, List[Candidate]], budget: int) -> Optional[Tuple[BuildOption, List[str]]]:
+    """
+    Функция подбирает сборку с максимальной оценкой в пределах бюджета: по одной записи каждой категории,
+    разъемы процессора и материнской платы совпадают.
+    Записи каждой категории сокращаются до Парето-фронта (записи, для которых есть более дешевая запись
+    с не меньшей оценкой, исключаются), процессоры и материнские платы объединяются в пары по разъему.
+    Затем Парето-фронты категорий объединяются последовательно (динамическое программирование
+    по категориям, задача о рюкзаке с выбором по одному элементу из группы), с учетом минимальной
+    стоимости категорий, которые еще не добавлены.
+
+    :param: candidates - записи по категориям. Ключ - компьютерный компонент, значение - записи с ценой больше 0.
+    :type: Dict[str, List[Candidate]]
+    :param: budget - бюджет (в центах).
+    :type: int
+    :return: - сборка (идентификаторы записей по порядку категорий) и категории сборки или None,
+    если сборку в пределах бюджета подобрать нельзя.
+    :rtype: Optional[Tuple[BuildOption, List[str]]]
+    """
+    price_step = max(1, budget // PRICE_BUCKETS)
+    categories = [key for key in BUILD_WEIGHTS if key not in SOCKET_CATEGORIES and candidates.get(key)]
+    fronts: List[List[BuildOption]] = list()
+    for key in categories:
+        max_score = max(element.score for element in candidates[key])
+        fronts.append(category_front(key, candidates[key], max_score, price_step))
+
+    # Пары процессор - материнская плата с одинаковым разъемом
+    fronts_by_socket: Dict[str, List[List[BuildOption]]] = dict()
+    for key in SOCKET_CATEGORIES:
+        max_score = max((element.score for element in candidates.get(key, ())), default=0.0)
+        by_socket: Dict[str, List[Candidate]] = dict()
+        for element in candidates.get(key, ()):
+            if element.socket:
+                by_socket.setdefault(element.socket, list()).append(element)
+        for socket, socket_candidates in by_socket.items():
+            fronts_by_socket.setdefault(socket, list()).append(
+                category_front(key, socket_candidates, max_score, price_step))
+    platform: List[BuildOption] = list()
+    for socket_fronts in fronts_by_socket.values():
+        if len(socket_fronts) == len(SOCKET_CATEGORIES):
+            platform.extend(combine(socket_fronts[0], socket_fronts[1], budget, price_step))
+    if not platform:
+        return None
+    fronts.insert(0, pareto_front(platform, price_step))
+
+    # Минимальная стоимость категорий, которые добавляются после текущей
+    rest_prices: List[int] = [0] * len(fronts)
+    for index in range(len(fronts) - 2, -1, -1):
+        rest_prices[index] = rest_prices[index + 1] + fronts[index + 1][0].price
+    front: List[BuildOption] = [BuildOption(0, 0.0, ())]
+    for index, other in enumerate(fronts):
+        front = combine(front, other, budget - rest_prices[index], price_step)
+        if not front:
+            return None
+    return front[-1], [*SOCKET_CATEGORIES, *categories]
@@ -1,89 +1,214 @@
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 from copy import deepcopy
 from datetime import datetime
+from time import perf_counter
 from requests import get
 from telebot import TeleBot
 from telebot.types import Message
-from tg_API.common.markup_and_output import send_message, send_photo, send_message_with_markup
+from telebot.apihelper import ApiTelegramException
+from settings import get_settings
+from tg_API.common.markup_and_output import send_message, send_photo, send_message_with_markup, \
+    edit_message_with_markup
 from tg_API.utils.db import ComputerComponentDatabase
+from tg_API.common.captions import render_caption
+from tg_API.common.page_cursor import PageCursor, NEXT, PREVIOUS
+from tg_API.common.compatibility import COMPATIBLE_BUTTON, encode_compatible_data
 from database.core import load_model_in_json, history_table, computer_components, load_data_in_model
+from database.core import load_query_in_rows
 from log.logging import Logging
-
+from log.pipeline import payload
+from metrics.core import image_fetch_seconds
+from metrics.tracing import span
+
+# Общие параметры
+site = get_settings()
+# Режим вывода следующих записей ("edit" - редактирование сообщения, "send" - новые сообщения)
+pagination_mode: str = site.pagination_mode
+# Кнопки перехода между страницами записей (режим "edit")
+PREVIOUS_BUTTON = '« Назад'
+NEXT_BUTTON = 'Далее »'
+# Количество колонок кнопок совместимых компонентов страницы записей (режим "edit")
+COMPATIBLE_COLUMNS = 3
 # Подготовка к записи ошибок в лог файл
 logger = Logging('main').get_logger()
 
 
-def convert_records_to_string(records, start_index: int,
-                              max_index: int, *columns: str, is_numbering: bool = True,
-                              link: str = 'link', img: str = 'img', price: str = 'price') -> List[Dict[str, str]]:
+@span('render')
+def page_captions(key: str, records: List, start_index: int, max_index: int,
+                  is_numbering: bool = True, first_index: int = 1) -> List[Dict[str, str]]:
     """
-    Функция преобразует результаты запроса к базе данных в список словарей с текстовыми значениями,
-    для последующего вывода в чат.
+    Функция возвращает подписи записей заданной страницы для вывода в чат.
+    Подписи записей каталога читаются из базы данных (формируются при загрузке данных с API).
+    Подписи записей без сохраненной подписи текущей версии шаблона (например, записей истории запросов)
+    формируются при выводе, подписи записей каталога при этом сохраняются в базу данных.
 
-    :param: records - записи по результатам запроса к базе данных
-    :type: ModelSelect
-    :param: start_index - начальный индекс элемента с которого начинается преобразование в строку.
+    :param: key - наименование компьютерного компонента.
+    :type: str
+    :param: records - записи по результатам запроса к базе данных (легкие записи модели).
+    :type: List
+    :param: start_index - начальный номер записи страницы.
     :type: int
-    :param: max_index - максимальное количество преобразуемых элементов (шаг).
+    :param: max_index - максимальное количество записей страницы (шаг).
     :type: int
-    :param: *columns - перечень полей, по которым данные преобразуются с строку.
-    :type: str
     :param: is_numbering - нумерация записей (по умолчанию True).
-    Если True, то преобразуемые записи нумеруются, если False - не нумеруются.
+    Если True, то записи нумеруются, если False - не нумеруются.
     :type: bool
-    :param: link - ссылка на компонент в интернет-магазине.
+    :param: first_index - номер первой записи списка records (по умолчанию 1 - список содержит все записи).
+    :type: int
+    :return: result - список словарей с ключами text (текст подписи) и img (ссылка на изображение).
+    :rtype: List[Dict[str, str]]
+    """
+    page = records[start_index - first_index:start_index - first_index + max_index]
+    db_read_captions = ComputerComponentDatabase.read_captions()
+    captions: Dict[str, str] = db_read_captions(key, [element.id for element in page if element.id])
+    missing_captions: Dict[str, str] = dict()
+
+    result: List[Dict[str, str]] = list()
+    for i_element, element in enumerate(page, start_index):
+        text: Optional[str] = captions.get(element.id) if element.id else None
+        if text is None:
+            text = render_caption(element.title, element.link, element.price)
+            if element.id:
+                missing_captions[element.id] = text
+        numbering: str = f'{i_element}. ' if is_numbering else ''
+        result.append({'text': ''.join((numbering, text, '\n')), 'img': str(element.img)})
+
+    if missing_captions:
+        db_save_captions = ComputerComponentDatabase.save_captions()
+        db_save_captions(key, missing_captions)
+    return result
+
+
+def navigation_menu(previous_key: str, next_key: str, start_index: int, max_index: int,
+                    records_count: int) -> Dict[str, str]:
+    """
+    Функция формирует кнопки перехода между страницами записей.
+
+    :param: previous_key - ключ кнопки перехода к предыдущей странице (None - кнопка не выводится).
     :type: str
-    :param: img - ссылка на изображение компонента.
+    :param: next_key - ключ кнопки перехода к следующей странице (None - кнопка не выводится).
     :type: str
-    :param: price - цена компонента.
+    :param: start_index - начальный номер записи текущей страницы.
+    :type: int
+    :param: max_index - количество записей страницы (шаг).
+    :type: int
+    :param: records_count - общее количество записей.
+    :type: int
+    :return: menu - словарь кнопок. Ключ - для идентификации кнопки при нажатии, значение - надпись на кнопке.
+    :rtype: Dict[str, str]
+    """
+    menu: Dict[str, str] = dict()
+    if start_index > 1 and previous_key:
+        menu[previous_key] = PREVIOUS_BUTTON
+    if start_index + max_index <= records_count and next_key:
+        menu[next_key] = NEXT_BUTTON
+    return menu
+
+
+def compatible_menu(key: str, page: List) -> Dict[str, str]:
+    """
+    Функция формирует кнопки совместимых компонентов для записей страницы
+    (для процессоров, материнских плат и оперативной памяти, см. COMPATIBLE_COMPONENTS).
+
+    :param: key - компьютерный компонент.
     :type: str
-    :return: result - данные запроса преобразованные в список строк.
-    :rtype: List[Dict[str, str]]
+    :param: page - записи страницы (легкие записи модели).
+    :type: List
+    :return: menu - словарь кнопок. Ключ - данные кнопки, значение - надпись на кнопке.
+    :rtype: Dict[str, str]
     """
-    result: List[Dict[str, str]] = []
-    end_index: int = start_index + max_index - 1
-    for i_element, element in enumerate(records, 1):
-        if start_index <= i_element <= end_index:
-            numbering: str = ''
-            record: str = ''
-            previous_record: str = ''
-            img_link: str = ''
-            if is_numbering:
-                numbering = f'{i_element}. '
-            for column in columns:
-                if hasattr(element, column):
-                    current_record: str = str(getattr(element, column))
-                    if column == link:
-                        record = record.replace(f'{previous_record}; ', f'[{previous_record}]')
-                        record = ''.join((record, f'({current_record}); '))
-                    elif column == price:
-                        try:
-                            current_record = f'{int(current_record) / 100}$'
-                        except ValueError:
-                            pass
-                        record = ''.join((record, f'{current_record}; '))
-                    elif column == img:
-                        img_link = current_record
-                    else:
-                        current_record = current_record.replace('[', '(')
-                        current_record = current_record.replace(']', ')')
-                        record = ''.join((record, f'{current_record}; '))
-                    previous_record = current_record
-            if record.endswith('; '):
-                record = record[:len(record) - 2]
-            record = ''.join((numbering, record, '\n'))
-            result.append({'text': record, 'img': img_link})
-        elif i_element > end_index:
-            break
+    menu: Dict[str, str] = dict()
+    for element in page:
+        data = encode_compatible_data(key, element.id)
+        if data is not None:
+            menu[data] = COMPATIBLE_BUTTON
+    return menu
 
-    return result
 
+def page_cursors(key: str, command: str, min_price: int, max_price: int, page: List, start_index: int,
+                 max_index: int, records_count: int) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Функция возвращает данные кнопок перехода к предыдущей и следующей страницам записей каталога
+    (состояние перехода передается в данных кнопки, см. PageCursor).
 
-def output_records(bot: TeleBot, message: Message, parameters: Dict, name: str, command: str,
+    :param: key - компьютерный компонент.
+    :type: str
+    :param: command - команда.
+    :type: str
+    :param: min_price - левая граница диапазона цен.
+    :type: int
+    :param: max_price - правая граница диапазона цен.
+    :type: int
+    :param: page - записи текущей страницы (легкие записи модели).
+    :type: List
+    :param: start_index - номер первой записи текущей страницы.
+    :type: int
+    :param: max_index - количество записей страницы (шаг).
+    :type: int
+    :param: records_count - общее количество записей.
+    :type: int
+    :return: - данные кнопок предыдущей и следующей страниц (None - страницы нет).
+    :rtype: Tuple[Optional[str], Optional[str]]
+    """
+    previous_data: Optional[str] = None
+    next_data: Optional[str] = None
+    if page and start_index > 1:
+        previous_data = PageCursor(command, key, min_price, max_price, PREVIOUS, max(1, start_index - max_index),
+                                   page[0].price, page[0].id).encode()
+    if page and start_index + len(page) <= records_count:
+        next_data = PageCursor(command, key, min_price, max_price, NEXT, start_index + len(page),
+                               page[-1].price, page[-1].id).encode()
+    return previous_data, next_data
+
+
+def output_page(bot: TeleBot, message: Message, text: str, menu: Dict, footer_menu: Dict,
+                is_edit: bool, number_columns: int = 1, is_numbering: bool = False, start_index: int = 1) -> None:
+    """
+    Функция выводит страницу записей одним сообщением с кнопками перехода между страницами (режим "edit").
+    Первая страница отправляется новым сообщением, следующие страницы редактируют это сообщение.
+
+    :param: bot - телеграм бот.
+    :type: TeleBot
+    :param: message - объект из telebot, содержащий информацию о сообщении (при редактировании - сообщение
+    со страницей записей).
+    :type: Message
+    :param: text - текст страницы.
+    :type: str
+    :param: menu - словарь для формирования кнопок меню страницы.
+    :type: Dict
+    :param: footer_menu - словарь для формирования кнопок перехода между страницами.
+    :type: Dict
+    :param: is_edit - True: сообщение редактируется, False - отправляется новое сообщение.
+    :type: bool
+    :param: number_columns - количество колонок в меню (по умолчанию 1).
+    :type: int
+    :param: is_numbering - нумерация кнопок меню (по умолчанию False).
+    :type: bool
+    :param: start_index - начальный индекс нумерации кнопок (по умолчанию 1).
+    :type: int
+    """
+    if is_edit:
+        try:
+            edit_message_with_markup(bot, message, text, menu, number_columns=number_columns,
+                                     is_numbering=is_numbering, start_index=start_index, footer_menu=footer_menu)
+        except ApiTelegramException as exc:
+            logger.warning('Сообщение не отредактировано: %s', exc)
+    elif menu or footer_menu:
+        send_message_with_markup(bot, message, text, menu, number_columns=number_columns,
+                                 is_numbering=is_numbering, start_index=start_index, footer_menu=footer_menu)
+    else:
+        send_message(bot, message, text)
+
+
+def output_records(bot: TeleBot, message: Message, parameters: Dict, key: str, name: str, command: str,
                    min_price: int, max_price: int, start_index: int, max_index: int,
-                   records_by_price) -> bool:
+                   records_by_price, is_edit: bool = False, cursor_paging: bool = False,
+                   records_count: Optional[int] = None, first_index: int = 1) -> bool:
     """
     Функция выводит в чат результаты запроса к БД.
+    В режиме "send" (PAGINATION_MODE, по умолчанию) записи отправляются отдельными сообщениями
+    с изображениями, в режиме "edit" - страница записей выводится одним текстовым сообщением (без изображений)
+    с кнопками перехода между страницами.
 
     :param: bot - телеграм бот.
     :type: TeleBot
@@ -91,6 +216,8 @@ def output_records(bot: TeleBot, message: Message, parameters: Dict, name: str,
     :type: Message
     :param: parameters - словарь с параметрами запроса.
     :type: Dict
+    :param: key - выбранный компьютерный компонент.
+    :type: str
     :param: name - наименование компонента для отображения в чате.
     :type: str
     :param: command - выбранная команда.
@@ -103,8 +230,18 @@ def output_records(bot: TeleBot, message: Message, parameters: Dict, name: str,
     :type: int
     :param: max_index - максимальное количество одновременно выводимых элементов.
     :type: int
-    :param: records_by_price - записи по результатам запроса к базе данных
-    :type: ModelSelect
+    :param: records_by_price - записи по результатам запроса к базе данных (легкие записи модели)
+    :type: List[ModelRow]
+    :param: is_edit - True: страница выводится редактированием сообщения message (режим "edit").
+    Значение по умолчанию False.
+    :type: bool
+    :param: cursor_paging - True: состояние перехода между страницами передается в данных кнопок (записи каталога,
+    следующая страница выводится любым процессом бота). False - кнопки next_output, previous_output (по умолчанию).
+    :type: bool
+    :param: records_count - общее количество записей (по умолчанию None - количество записей records_by_price).
+    :type: Optional[int]
+    :param: first_index - номер первой записи в records_by_price (по умолчанию 1 - переданы все записи).
+    :type: int
     :return: True - успешный вывод записей в чат.
     False - получены не все данные (обрабатываемые исключения).
     :rtype: bool
@@ -118,27 +255,52 @@ def output_records(bot: TeleBot, message: Message, parameters: Dict, name: str,
         elif command == 'custom':
             text = f"{name}: цена от {min_price / 100}$ до {max_price / 100}$\n"
 
-        records_count: int = len(records_by_price)
-        if records_count > 0:
+        if records_count is None:
+            records_count = len(records_by_price)
+        if records_count > 0 and pagination_mode == 'edit' and first_index == 1:
+            start_index = min(start_index, (records_count - 1) // max_index * max_index + 1)
+        page = records_by_price[start_index - first_index:start_index - first_index + max_index]
+        previous_data, next_data = page_cursors(key, command, min_price, max_price, page, start_index, max_index,
+                                                records_count) if cursor_paging else ('previous_output',
+                                                                                      'next_output')
+        if records_count > 0 and pagination_mode == 'edit':
+            records = page_captions(key, page, start_index, max_index, first_index=start_index)
+            end_index: int = start_index + len(records) - 1
+            page_text = ''.join((text, *[i_records['text'] for i_records in records],
+                                 f'Записи с {start_index} по {end_index} (всего {records_count})'))
+            navigation = navigation_menu(previous_data, next_data, start_index, max_index, records_count)
+            menu = compatible_menu(key, page)
+            output_page(bot, message, page_text, menu, navigation, is_edit,
+                        number_columns=COMPATIBLE_COLUMNS, is_numbering=len(menu) == len(page),
+                        start_index=start_index)
+            parameters['start_index'] = start_index + max_index
+            return True
+        elif records_count > 0:
             send_message(bot, message, text)
-            records = convert_records_to_string(records_by_price,
-                                                start_index, max_index,
-                                                'title', 'link', 'price', 'img')
-            for i_records in records:
-                photo = get(i_records['img'])
+            records = page_captions(key, page, start_index, max_index, first_index=start_index)
+            for element, i_records in zip(page, records):
+                menu = compatible_menu(key, [element])
+                start_time = perf_counter()
+                with span('image'):
+                    photo = get(i_records['img'])
+                image_fetch_seconds.observe(perf_counter() - start_time, str(photo.status_code))
                 if photo.status_code == 200:
-                    send_photo(bot, message, photo.content, i_records['text'])
+                    send_photo(bot, message, photo.content, i_records['text'], menu)
                 else:
-                    logger.warning(f'Изображение не загружено, код {photo.status_code}\n{i_records}')
-                    send_message(bot, message, i_records['text'])
+                    logger.warning('Изображение не загружено, код %s\n%s', photo.status_code, payload(i_records))
+                    if menu:
+                        send_message_with_markup(bot, message, i_records['text'], menu, number_columns=1,
+                                                 is_numbering=False)
+                    else:
+                        send_message(bot, message, i_records['text'])
 
             start_index = start_index + max_index
             end_index: int = start_index + max_index - 1
 
-            if start_index <= records_count:
+            if start_index <= records_count and next_data:
                 if end_index > records_count:
                     end_index = records_count
-                menu_next_output = {'next_output': f'с {start_index} по {end_index} (всего {records_count})'}
+                menu_next_output = {next_data: f'с {start_index} по {end_index} (всего {records_count})'}
                 send_message_with_markup(bot, message, 'Следующие записи:', menu_next_output,
                                          number_columns=1, is_numbering=False)
                 parameters['start_index'] = start_index
@@ -150,14 +312,14 @@ def output_records(bot: TeleBot, message: Message, parameters: Dict, name: str,
         else:
             result = ''.join((text, 'Записи не найдены'))
             send_message(bot, message, result)
-            logger.warning(f'Записи не найдены: {name}; {command}; {min_price}; {max_price}; {start_index}; '
-                           f'{max_index}\n{parameters}\n{records_by_price}')
+            logger.warning('Записи не найдены: %s; %s; %s; %s; %s; %s\n%s\n%s', name, command, min_price,
+                           max_price, start_index, max_index, payload(parameters), payload(records_by_price))
             return False
 
     else:
         send_message(bot, message, f'{name}\nЦены не заданы')
-        logger.warning(f'Цены не заданы: {name}; {command}; {min_price}; {max_price}; {start_index}; '
-                       f'{max_index}\n{parameters}\n{records_by_price}')
+        logger.warning('Цены не заданы: %s; %s; %s; %s; %s; %s\n%s\n%s', name, command, min_price,
+                       max_price, start_index, max_index, payload(parameters), payload(records_by_price))
     return False
 
 
@@ -195,14 +357,59 @@ def request_and_output_records_by_price(bot: TeleBot, message: Message, paramete
     records_by_price = None
     if isinstance(min_price, int) and isinstance(max_price, int):
         db_records_by_price = ComputerComponentDatabase.records_in_range_by_price()
-        records_by_price = db_records_by_price(key, min_price, max_price)
+        records_by_price = load_query_in_rows(db_records_by_price(key, min_price, max_price))
 
         if not save_request_history(message.chat.id, key, command, min_price, max_price, records_by_price):
-            logger.warning(f'Ошибка при сохранении истории {message.chat.id}; {key}; {command}; {min_price}; '
-                           f'{max_price}\n{records_by_price}')
+            logger.warning('Ошибка при сохранении истории %s; %s; %s; %s; %s\n%s', message.chat.id, key, command,
+                           min_price, max_price, payload(records_by_price))
 
-    return output_records(bot, message, parameters, name, command, min_price, max_price,
-                          start_index, max_index, records_by_price)
+    return output_records(bot, message, parameters, key, name, command, min_price, max_price,
+                          start_index, max_index, records_by_price, cursor_paging=True)
+
+
+def output_records_by_cursor(bot: TeleBot, message: Message, cursor: PageCursor, name: str, max_index: int,
+                             is_edit: bool = False) -> bool:
+    """
+    Функция выводит страницу записей по данным нажатой кнопки перехода (без параметров запроса в памяти процесса).
+    Страница читается по ключу (после или перед записью-ключом), если ключа нет или по ключу записи
+    не найдены (каталог обновлен) - по номеру первой записи страницы.
+
+    :param: bot - телеграм бот.
+    :type: TeleBot
+    :param: message - объект из telebot, содержащий информацию о сообщении.
+    :type: Message
+    :param: cursor - состояние перехода к странице записей.
+    :type: PageCursor
+    :param: name - наименование компонента для отображения в чате.
+    :type: str
+    :param: max_index - максимальное количество одновременно выводимых элементов.
+    :type: int
+    :param: is_edit - True: страница выводится редактированием сообщения message (режим "edit").
+    Значение по умолчанию False.
+    :type: bool
+    :return: True - успешный вывод записей в чат.
+    :rtype: bool
+    """
+    key = cursor.computer_component
+    records_count = ComputerComponentDatabase.count_in_range_by_price()(key, cursor.price_from, cursor.price_up_to)
+    db_records_page = ComputerComponentDatabase.records_page_by_price()
+    start_index = cursor.start_index
+    page: List = list()
+    if cursor.record_id and cursor.direction == NEXT:
+        page = load_query_in_rows(db_records_page(key, cursor.price_from, cursor.price_up_to, max_index,
+                                                  after=(cursor.price, cursor.record_id)))
+    elif cursor.record_id:
+        page = load_query_in_rows(db_records_page(key, cursor.price_from, cursor.price_up_to, max_index,
+                                                  before=(cursor.price, cursor.record_id)))[::-1]
+        if len(page) < max_index:
+            start_index = 1
+    if not page:
+        start_index = max(1, min(start_index, (records_count - 1) // max_index * max_index + 1))
+        page = load_query_in_rows(db_records_page(key, cursor.price_from, cursor.price_up_to, max_index,
+                                                  offset=start_index - 1))
+    return output_records(bot, message, dict(), key, name, cursor.command, cursor.price_from, cursor.price_up_to,
+                          start_index, max_index, page, is_edit=is_edit, cursor_paging=True,
+                          records_count=max(records_count, start_index + len(page) - 1), first_index=start_index)
 
 
 def save_request_history(user_id: int, key: str, command: str, min_price: int, max_price: int,
@@ -250,7 +457,7 @@ def save_request_history(user_id: int, key: str, command: str, min_price: int, m
 
 
 def output_records_history(bot: TeleBot, message: Message, menu: Dict, parameters: Dict,
-                           max_index: int, history_info: List[Dict]) -> None:
+                           max_index: int, history_info: List[Dict], is_edit: bool = False) -> None:
     """
     Функция выводит в чат прочитанные из БД записи истории запросов пользователя.
 
@@ -266,21 +473,26 @@ def output_records_history(bot: TeleBot, message: Message, menu: Dict, parameter
     :type: int
     :param: history_info - список словарей с информацией по истории запросов.
     :type: List[Dict]
+    :param: is_edit - True: страница выводится редактированием сообщения message (режим "edit").
+    Значение по умолчанию False.
+    :type: bool
     """
     key = parameters['key_button']
     records = [element for element in history_info[key]['result'].values()]
     data_model = load_data_in_model(computer_components[history_info[key]['computer_component']], records)
-    output_records(bot, message, parameters,
+    output_records(bot, message, parameters, history_info[key]['computer_component'],
                    menu[history_info[key]['computer_component']],
                    history_info[key]['command'], history_info[key]['price_from'],
                    history_info[key]['price_up_to'], parameters['start_index'],
-                   max_index, data_model)
+                   max_index, data_model, is_edit)
 
 
 def read_and_output_history(bot: TeleBot, message: Message, menu_buttons: Dict, parameters: Dict,
-                            max_index: int, history_info: List[Dict]) -> None:
+                            max_index: int, history_info: List[Dict], is_edit: bool = False) -> None:
     """
     Функция читает из БД историю запросов пользователя и выводит в чат.
+    В режиме "edit" (PAGINATION_MODE) страница истории выводится одним сообщением
+    с кнопками перехода между страницами.
 
     :param: bot - телеграм бот.
     :type: TeleBot
@@ -294,19 +506,19 @@ def read_and_output_history(bot: TeleBot, message: Message, menu_buttons: Dict,
     :type: int
     :param: history_info - список словарей с информацией по истории запросов.
     :type: List[Dict]
+    :param: is_edit - True: страница выводится редактированием сообщения message (режим "edit").
+    Значение по умолчанию False.
+    :type: bool
     """
     db_records_by_user_id = ComputerComponentDatabase.records_by_user_id()
-    retrieved = db_records_by_user_id(message.chat.id)
+    history_list = load_model_in_json(db_records_by_user_id(message.chat.id), 'created_at', 'user_id', 'command',
+                                      'computer_component', 'price_from', 'price_up_to', 'result')
     history_info.clear()
-    records_count: int = len(retrieved)
+    history_info.extend(history_list)
+    records_count: int = len(history_info)
     if records_count > 0:
-        history_list = load_model_in_json(retrieved, 'created_at', 'user_id', 'command',
-                                          'computer_component', 'price_from',
-                                          'price_up_to', 'result')
-        for element in history_list:
-            history_info.append(element)
         menu: Dict = dict()
-        start_index: int = parameters['start_index_button']
+        start_index: int = min(parameters['start_index_button'], (records_count - 1) // max_index * max_index + 1)
         end_index: int = start_index + max_index - 1
         for i_element, element in enumerate(history_info):
             if start_index <= i_element + 1 <= end_index:
@@ -322,6 +534,14 @@ def read_and_output_history(bot: TeleBot, message: Message, menu_buttons: Dict,
             elif i_element + 1 > end_index:
                 break
 
+        if pagination_mode == 'edit':
+            output_page(bot, message, 'История запросов:', menu,
+                        navigation_menu('previous_records_history', 'next_records_history', start_index, max_index,
+                                        records_count),
+                        is_edit, is_numbering=True, start_index=start_index)
+            parameters['start_index_button'] = start_index + max_index
+            return
+
         send_message_with_markup(bot, message, 'История запросов:', menu, number_columns=1,
                                  is_numbering=True, start_index=start_index)
 
@@ -391,8 +611,9 @@ def price_range_read(bot: TeleBot, message: Message, parameters: Dict,
     if parameters['command'] and parameters['computer_component'] and \
             parameters['min_price'] and parameters['max_price']:
         if parameters['command'] == 'custom':
-            price_range = price_range.replace(' ', '')
-            prices = price_range.split('-')
+            with span('parse'):
+                price_range = price_range.replace(' ', '')
+                prices = price_range.split('-')
             text = 'Ошибка ввода диапазона цен. Попробуйте еще раз.'
             if len(prices) == 2:
                 try:
@@ -409,7 +630,7 @@ def price_range_read(bot: TeleBot, message: Message, parameters: Dict,
                         raise ValueError
                 except ValueError:
                     send_message(bot, message, text)
-                    logger.warning(f'Ошибка ввода диапазона цен: {price_range}; {name}\n{parameters}')
+                    logger.warning('Ошибка ввода диапазона цен: %s; %s\n%s', price_range, name, payload(parameters))
             else:
                 send_message(bot, message, text)
-                logger.warning(f'Ошибка ввода диапазона цен: {price_range}; {name}\n{parameters}')
+                logger.warning('Ошибка ввода диапазона цен: %s; %s\n%s', price_range, name, payload(parameters))
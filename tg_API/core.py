@@ -1,10 +1,14 @@
-from typing import List, Dict, Optional, Any
-from time import sleep
-from datetime import datetime, date, timedelta
-from threading import Thread
-from settings import SiteSettings
-from telebot import TeleBot
-from telebot.types import Message, CallbackQuery
+from typing import List, Dict, Optional, Any, Tuple
+from collections import OrderedDict
+from copy import deepcopy
+from datetime import datetime, timedelta
+from threading import Thread, Lock
+from signal import signal, Signals
+from settings import get_settings
+from telebot import TeleBot, apihelper
+from telebot.types import Message, CallbackQuery, InlineQuery
+from tg_API.utils.build import build
+from tg_API.utils.compatible import compatible
 from tg_API.utils.custom import custom
 from tg_API.utils.db import ComputerComponentDatabase
 from tg_API.utils.help import help_on_commands
@@ -13,11 +17,22 @@ from tg_API.utils.history import history
 from tg_API.utils.low import low
 from tg_API.utils.start import start
 from tg_API.utils.stop import stop
+from tg_API.utils.watch import watch, unwatch, notify_price_drops
+from tg_API.utils.notifier import NotificationSender
+from tg_API.utils.scheduler import RefreshScheduler
+from tg_API.utils.lease import LeaseKeeper
 from tg_API.common.markup_and_output import send_message_with_markup, send_message
-from tg_API.common.printing_records import price_range_read, output_records, output_records_history
-from database.core import computer_components, update, crud
+from tg_API.common.printing_records import price_range_read, output_records, output_records_history, \
+    output_records_by_cursor
+from tg_API.common.page_cursor import decode_page_cursor
+from tg_API.common.compatibility import COMPATIBLE_PREFIX
+from tg_API.common.inline_query import answer_inline_query
+from database.core import computer_components, update, crud, load_query_in_rows
 from database.common.models import db
 from log.logging import Logging
+from log.pipeline import payload
+from metrics.tracing import traced, span, update_profiler
+from metrics.server import MetricsServer
 
 # Сообщение о боте
 ABOUT_BOT = "Я бот @ComputerComponentsBot\n" \
@@ -34,22 +49,33 @@ BOT_COMMAND = "/start - показать меню\n" \
               "/high - вывод компонентов с максимальной стоимостью\n" \
               "/custom - вывод компонентов со стоимостью из заданного диапазона\n" \
               "/history - вывод истории запросов\n" \
-              "/stop - закрыть меню"
+              "/build <бюджет> - подбор сборки компьютера в пределах бюджета\n" \
+              "/watch <компонент> <цена до> - уведомлять о снижении стоимости (/unwatch - удалить подписки)\n" \
+              "/stop - закрыть меню\n" \
+              "@ComputerComponentsBot <компонент> <цена от>-<цена до> - поиск в любом чате (inline)"
 
-# Словарь с параметрами запроса: заданной команды, выбранного компьютерного компонента, диапазоном цен
+# Исходные параметры запроса: заданной команды, выбранного компьютерного компонента, диапазоном цен
 # начального индекса вывода найденных записей, начального индекса вывода записей истории, ключ нажатой кнопки
-request_parameters: Dict = {'command': None, 'computer_component': None,
-                            'min_price': None, 'max_price': None,
-                            'price_from': None, 'price_up_to': None, 'start_index': 1,
-                            'start_index_button': 1, 'key_button': None}
+DEFAULT_REQUEST_PARAMETERS: Dict = {'command': None, 'computer_component': None,
+                                    'min_price': None, 'max_price': None,
+                                    'price_from': None, 'price_up_to': None, 'start_index': 1,
+                                    'start_index_button': 1, 'key_button': None}
+# Максимальное количество чатов, параметры запроса которых хранятся в памяти процесса
+# (при превышении удаляются параметры чатов, к которым дольше всего не было обращений)
+MAX_CHATS = 10000
+# Параметры запроса и история запросов по идентификатору чата (состояние команды хранится в памяти процесса)
+_chats_state: OrderedDict = OrderedDict()
+_chats_lock = Lock()
 
 # Словарь команд
-commands: Dict = {'custom': custom, 'help': help_on_commands, 'high': high,
-                  'history': history, 'low': low, 'start': start, 'stop': stop}
+commands: Dict = {'build': build, 'custom': custom, 'help': help_on_commands, 'high': high,
+                  'history': history, 'low': low, 'start': start, 'stop': stop,
+                  'unwatch': unwatch, 'watch': watch}
 
 # Словарь функций
-function_commands: Dict = {'custom': None, 'help': None, 'high': None,
-                           'history': None, 'low': None, 'start': None, 'stop': None}
+function_commands: Dict = {'build': None, 'custom': None, 'help': None, 'high': None,
+                           'history': None, 'low': None, 'start': None, 'stop': None,
+                           'unwatch': None, 'watch': None}
 
 # Словарь наименований команд для отображения
 names_commands: Dict = {'low': 'Мин. цене', 'high': 'Макс. цене', 'custom': 'Диапазону цен'}
@@ -60,7 +86,7 @@ menu_commands = ['Команды', 'Компоненты', 'История', 'С
 # Словарь наименований компьютерных компонентов для отображения
 names_computer_components: Dict[str, str] = {key: str(model()) for key, model in computer_components.items()}
 
-# Список словарей с информацией по истории запросов
+# Список словарей с информацией по истории запросов (хранится для каждого чата, chat_history_info)
 # Ключи словаря:
 # created_at - дата запроса
 # user_id - id пользователя
@@ -69,21 +95,63 @@ names_computer_components: Dict[str, str] = {key: str(model()) for key, model in
 # price_from - цена от
 # price_up_to - цена до
 # result - результат запроса
-history_info: List[Dict] = list()
 
 # Общие параметры
-site = SiteSettings()
+site = get_settings()
+# Наименование аренды загрузки данных с API
+INGEST_LEASE = 'ingest'
+# Аренда загрузки данных с API (данные загружает только процесс, удерживающий аренду)
+ingest_lease = LeaseKeeper(INGEST_LEASE, site.ingest_lease_ttl, ComputerComponentDatabase.acquire_lease(),
+                           ComputerComponentDatabase.release_lease())
+# Режимы запуска: обработка запросов к боту, загрузка данных с API, обработка запросов и загрузка данных
+RUN_MODES = ('bot', 'ingest', 'all')
 # Телеграм бот
 bot = TeleBot(site.token.get_secret_value())
+# Отправка уведомлений о снижении стоимости (с ограничением частоты отправки)
+notification_sender = NotificationSender(bot, site.notification_rate)
 # Частота обновления базы данных (в днях)
 db_update_frequency: int = site.db_update_frequency
 # Количество одновременно выводимых в чат записей (шаг вывода)
 max_number_records: int = site.max_number_records
+# Режим вывода следующих записей ("edit" - редактирование сообщения, "send" - новые сообщения)
+pagination_mode: str = site.pagination_mode
 # Подготовка к записи ошибок в лог файл
 logger = Logging('main').get_logger()
 
 
+def send_bot_api_request(method: str, url: str, **kwargs):
+    """
+    Функция отправки запросов к Telegram Bot API (telebot.apihelper.CUSTOM_REQUEST_SENDER):
+    запрос выполняется HTTP сессией telebot, время запроса добавляется в трассировку обновления.
+
+    :param: method - тип HTTP запроса.
+    :type: str
+    :param: url - URL запроса (последняя часть - метод Bot API).
+    :type: str
+    :return: - ответ на запрос.
+    :rtype: Response
+    """
+    with span(f'bot_api: {url.rsplit("/", 1)[-1]}'):
+        return apihelper._get_req_session().request(method, url, **kwargs)
+
+
+apihelper.CUSTOM_REQUEST_SENDER = send_bot_api_request
+
+
+@bot.message_handler(commands=['build'])
+@traced('build')
+def output_build(message: Message) -> None:
+    """
+    Функция по команде /build подбирает сборку компьютера в пределах заданного бюджета.
+
+    :param: message - объект из telebot, содержащий информацию о сообщении.
+    :type: Message
+    """
+    build(bot, message, names_computer_components)
+
+
 @bot.message_handler(commands=['custom'])
+@traced('custom')
 def output_custom_values(message: Message) -> None:
     """
     Функция по команде /custom выводит показатели пользовательского диапазона (с изображением товара).
@@ -91,6 +159,7 @@ def output_custom_values(message: Message) -> None:
     :param: message - объект из telebot, содержащий информацию о сообщении.
     :type: Message
     """
+    request_parameters = chat_request_parameters(message.chat.id)
     request_parameters['command'] = 'custom'
     reset_request_parameters(request_parameters, 'computer_component', 'min_price', 'max_price',
                              'price_from', 'price_up_to', 'start_index', 'start_index_button', 'key_button',
@@ -99,6 +168,7 @@ def output_custom_values(message: Message) -> None:
 
 
 @bot.message_handler(commands=['help'])
+@traced('help')
 def help_on_bot_commands(message: Message) -> None:
     """
     Функция по команде /help выводит подсказку по командам бота.
@@ -110,6 +180,7 @@ def help_on_bot_commands(message: Message) -> None:
 
 
 @bot.message_handler(commands=['high'])
+@traced('high')
 def output_high_values(message: Message) -> None:
     """
     Функция по команде /high выводит максимальные показатели (с изображением товара).
@@ -117,6 +188,7 @@ def output_high_values(message: Message) -> None:
     :param: message - объект из telebot, содержащий информацию о сообщении.
     :type: Message
     """
+    request_parameters = chat_request_parameters(message.chat.id)
     request_parameters['command'] = 'high'
     reset_request_parameters(request_parameters, 'computer_component', 'min_price', 'max_price',
                              'price_from', 'price_up_to', 'start_index', 'start_index_button', 'key_button',
@@ -125,6 +197,7 @@ def output_high_values(message: Message) -> None:
 
 
 @bot.message_handler(commands=['history'])
+@traced('history')
 def output_history(message: Message) -> None:
     """
     Функция по команде /history выводит историю запросов пользователя.
@@ -132,6 +205,8 @@ def output_history(message: Message) -> None:
     :param: message - объект из telebot, содержащий информацию о сообщении.
     :type: Message
     """
+    request_parameters = chat_request_parameters(message.chat.id)
+    history_info = chat_history_info(message.chat.id)
     request_parameters['command'] = 'history'
     reset_request_parameters(request_parameters, 'computer_component', 'min_price', 'max_price',
                              'price_from', 'price_up_to', 'start_index', 'start_index_button', 'key_button',
@@ -140,6 +215,7 @@ def output_history(message: Message) -> None:
 
 
 @bot.message_handler(commands=['low'])
+@traced('low')
 def output_low_values(message: Message) -> None:
     """
     Функция по команде /low выводит минимальные показатели (с изображением товара).
@@ -147,6 +223,7 @@ def output_low_values(message: Message) -> None:
     :param: message - объект из telebot, содержащий информацию о сообщении.
     :type: Message
     """
+    request_parameters = chat_request_parameters(message.chat.id)
     request_parameters['command'] = 'low'
     reset_request_parameters(request_parameters, 'computer_component', 'min_price', 'max_price',
                              'price_from', 'price_up_to', 'start_index', 'start_index_button', 'key_button',
@@ -155,6 +232,7 @@ def output_low_values(message: Message) -> None:
 
 
 @bot.message_handler(commands=['start'])
+@traced('start')
 def output_start_message(message: Message) -> None:
     """
     Функция по команде /start выводит приглашение и меню с командами боту.
@@ -162,6 +240,7 @@ def output_start_message(message: Message) -> None:
     :param: message - объект из telebot, содержащий информацию о сообщении.
     :type: Message
     """
+    request_parameters = chat_request_parameters(message.chat.id)
     reset_request_parameters(request_parameters, 'command', 'computer_component',
                              'min_price', 'max_price',
                              'price_from', 'price_up_to', 'start_index', 'start_index_button', 'key_button',
@@ -170,6 +249,7 @@ def output_start_message(message: Message) -> None:
 
 
 @bot.message_handler(commands=['stop'])
+@traced('stop')
 def output_stop_message(message: Message) -> None:
     """
     Функция по команде /stop завершает работу с ботом и закрывает меню с командами.
@@ -177,6 +257,7 @@ def output_stop_message(message: Message) -> None:
     :param: message - объект из telebot, содержащий информацию о сообщении.
     :type: Message
     """
+    request_parameters = chat_request_parameters(message.chat.id)
     reset_request_parameters(request_parameters, 'command', 'computer_component',
                              'min_price', 'max_price',
                              'price_from', 'price_up_to', 'start_index', 'start_index_button', 'key_button',
@@ -184,7 +265,33 @@ def output_stop_message(message: Message) -> None:
     stop(bot, message, menu_commands, 'Пока. До новых запросов.')
 
 
+@bot.message_handler(commands=['unwatch'])
+@traced('unwatch')
+def output_unwatch_message(message: Message) -> None:
+    """
+    Функция по команде /unwatch удаляет подписки пользователя на снижение стоимости компонентов.
+
+    :param: message - объект из telebot, содержащий информацию о сообщении.
+    :type: Message
+    """
+    unwatch(bot, message, names_computer_components)
+
+
+@bot.message_handler(commands=['watch'])
+@traced('watch')
+def output_watch_message(message: Message) -> None:
+    """
+    Функция по команде /watch сохраняет подписку пользователя на снижение стоимости компонента
+    (без параметров выводит подписки пользователя).
+
+    :param: message - объект из telebot, содержащий информацию о сообщении.
+    :type: Message
+    """
+    watch(bot, message, names_computer_components)
+
+
 @bot.callback_query_handler(func=lambda call: True)
+@traced('callback_query')
 def callback_query(call: CallbackQuery) -> None:
     """
     Функция обрабатывает нажатие кнопок в чате.
@@ -194,7 +301,18 @@ def callback_query(call: CallbackQuery) -> None:
     """
     if call.message:
         key = str(call.data)
-        if key in names_commands.keys():
+        request_parameters = chat_request_parameters(call.message.chat.id)
+        history_info = chat_history_info(call.message.chat.id)
+        page_cursor = decode_page_cursor(key)
+        # Вывод страницы записей по данным кнопки перехода (состояние перехода передается в данных кнопки)
+        if page_cursor is not None:
+            output_records_by_cursor(bot, call.message, page_cursor,
+                                     names_computer_components[page_cursor.computer_component],
+                                     max_number_records, is_edit=pagination_mode == 'edit')
+        # Вывод компонентов, совместимых с записью (по индексу совместимости)
+        elif key.startswith(f'{COMPATIBLE_PREFIX}:'):
+            compatible(bot, call.message, key, names_computer_components)
+        elif key in names_commands.keys():
             function_commands[key](call.message)
         # Выбор компьютерного компонента
         elif key in names_computer_components.keys():
@@ -217,6 +335,27 @@ def callback_query(call: CallbackQuery) -> None:
                 request_parameters['start_index'] = 1
                 output_records_history(bot, call.message, names_computer_components, request_parameters,
                                        max_number_records, history_info)
+        # Вывод следующей (предыдущей) страницы записей редактированием сообщения (режим "edit")
+        elif key in ('next_output', 'previous_output') and pagination_mode == 'edit':
+            if key == 'previous_output':
+                request_parameters['start_index'] = max(1, request_parameters['start_index'] -
+                                                        2 * max_number_records)
+            if (request_parameters['command'] in names_commands.keys() and
+                    request_parameters['computer_component'] in names_computer_components.keys() and
+                    request_parameters['min_price'] and request_parameters['max_price'] and
+                    request_parameters['price_from'] and request_parameters['price_up_to']):
+                db_records_by_price = ComputerComponentDatabase.records_in_range_by_price()
+                records_by_price = load_query_in_rows(db_records_by_price(request_parameters['computer_component'],
+                                                                          request_parameters['price_from'],
+                                                                          request_parameters['price_up_to']))
+                output_records(bot, call.message, request_parameters, request_parameters['computer_component'],
+                               names_computer_components[request_parameters['computer_component']],
+                               request_parameters['command'], request_parameters['price_from'],
+                               request_parameters['price_up_to'], request_parameters['start_index'],
+                               max_number_records, records_by_price, is_edit=True)
+            elif request_parameters['command'] == 'history' and request_parameters['key_button'] is not None:
+                output_records_history(bot, call.message, names_computer_components, request_parameters,
+                                       max_number_records, history_info, is_edit=True)
         # Вывод следующих записей по найденным компьютерным компонентам
         elif key == 'next_output':
             if (request_parameters['command'] in names_commands.keys() and
@@ -225,10 +364,10 @@ def callback_query(call: CallbackQuery) -> None:
                     request_parameters['price_from'] and request_parameters['price_up_to'] and
                     request_parameters['start_index'] > 1):
                 db_records_by_price = ComputerComponentDatabase.records_in_range_by_price()
-                records_by_price = db_records_by_price(request_parameters['computer_component'],
-                                                       request_parameters['price_from'],
-                                                       request_parameters['price_up_to'])
-                output_records(bot, call.message, request_parameters,
+                records_by_price = load_query_in_rows(db_records_by_price(request_parameters['computer_component'],
+                                                                          request_parameters['price_from'],
+                                                                          request_parameters['price_up_to']))
+                output_records(bot, call.message, request_parameters, request_parameters['computer_component'],
                                names_computer_components[request_parameters['computer_component']],
                                request_parameters['command'], request_parameters['price_from'],
                                request_parameters['price_up_to'], request_parameters['start_index'],
@@ -237,13 +376,21 @@ def callback_query(call: CallbackQuery) -> None:
                     request_parameters['start_index_button'] > 1:
                 output_records_history(bot, call.message, names_computer_components, request_parameters,
                                        max_number_records, history_info)
+        # Вывод следующей (предыдущей) страницы истории запросов редактированием сообщения (режим "edit")
+        elif key in ('next_records_history', 'previous_records_history') and pagination_mode == 'edit':
+            if key == 'previous_records_history':
+                request_parameters['start_index_button'] = max(1, request_parameters['start_index_button'] -
+                                                               2 * max_number_records)
+            if request_parameters['command'] == 'history':
+                history(bot, call.message, names_computer_components, request_parameters, history_info,
+                        is_edit=True)
         # Вывод следующих записей из истории запросов пользователя
         elif key == 'next_records_history':
             if request_parameters['command'] == 'history' and request_parameters['start_index_button'] > 1:
                 history(bot, call.message, names_computer_components, request_parameters, history_info)
 
         else:
-            logger.warning(f'Неожиданная команда {key}\n{request_parameters}')
+            logger.warning('Неожиданная команда %s\n%s', key, payload(request_parameters))
             bot.send_message(call.message.chat.id, f'Неожиданная команда {key}\nВыберите другую команду')
             reset_request_parameters(request_parameters, 'command', 'computer_component',
                                      'min_price', 'max_price',
@@ -252,7 +399,21 @@ def callback_query(call: CallbackQuery) -> None:
             send_message_with_markup(bot, call.message, 'Поиск компонентов по:', names_commands)
 
 
+@bot.inline_handler(func=lambda query: True)
+@traced('inline_query')
+def inline_query(query: InlineQuery) -> None:
+    """
+    Функция отвечает на inline запросы (например: @ComputerComponentsBot gpu 300-400)
+    записями каталога в заданном диапазоне цен.
+
+    :param: query - объект из telebot, содержащий информацию об inline запросе.
+    :type: InlineQuery
+    """
+    answer_inline_query(bot, query, names_computer_components)
+
+
 @bot.message_handler(content_types=["text"])
+@traced('text_query')
 def text_query(message: Message) -> None:
     """
     Функция обрабатывает сообщения из чата от пользователя и в случае соответствия одной из команд,
@@ -262,6 +423,7 @@ def text_query(message: Message) -> None:
     :param: message - объект из telebot, содержащий информацию о сообщении.
     :type: Message
     """
+    request_parameters = chat_request_parameters(message.chat.id)
     # Приветствие. Вывод сообщения о боте.
     if message.text.lower().startswith('привет'):
         bot.send_message(message.chat.id, ''.join(("Привет! ", ABOUT_BOT)))
@@ -293,48 +455,166 @@ def text_query(message: Message) -> None:
         send_message(bot, message, 'Не понял Вашу команду\n/help - справка по командам')
 
 
-def database_loading() -> None:
+def notify_subscribers(computer_component: str, since: datetime) -> None:
     """
-    Функция периодически (1 раз в сутки) производит проверку таблицы Update
-    и обновляет информацию о компьютерных компонентах с сайта rapidAPI.
+    Функция отправляет уведомления подписчикам о снижении стоимости компонента после загрузки данных с API.
+    Ошибки записываются в лог и не прерывают обновление компонента.
 
+    :param: computer_component - наименование компьютерного компонента.
+    :type: str
+    :param: since - время начала загрузки данных.
+    :type: datetime
     """
+    try:
+        notify_price_drops(notification_sender, computer_component, since,
+                           names_computer_components[computer_component])
+    except Exception as exc:
+        logger.error('%s: ошибка отправки уведомлений о снижении стоимости\n%s %s', computer_component, exc, type(exc))
+
+
+def refresh_component(computer_component: str) -> datetime:
+    """
+    Функция обновляет информацию о компьютерном компоненте с сайта rapidAPI
+    и сохраняет время следующего обновления в таблице Update.
+
+    :param: computer_component - наименование компьютерного компонента.
+    :type: str
+    :return: update_date - время следующего обновления компонента.
+    В случае ошибки загрузки данных обновление повторяется через сутки.
+    :rtype: datetime
+    """
+    db_load = ComputerComponentDatabase.load()
     db_read_update_table = ComputerComponentDatabase.read_update_table()
     db_save_update_table = ComputerComponentDatabase.save_update_table()
-    db_load = ComputerComponentDatabase.load()
+    db_count = crud.count()
+
+    date_now: datetime = datetime.now()
+    if db_load(computer_component, on_page=scheduler.report_page, on_loaded=notify_subscribers,
+               is_cancelled=ingest_lease.is_lost):
+        number_records = db_count(db, computer_components[computer_component])
+        update_date: datetime = date_now + timedelta(days=db_update_frequency)
+        logger.info('%s: данные с API успешно загружены. Дата обновления %s. Количество записей в БД %s.',
+                    computer_component, date_now, number_records)
+        for element in list(db_read_update_table()):
+            if element.computer_component == computer_component:
+                update_table_dict = [{'id': element.id, 'computer_component': computer_component,
+                                      'update_date': update_date}]
+                db_save_update_table(update_table_dict)
+    else:
+        number_records = db_count(db, computer_components[computer_component])
+        update_date = date_now + timedelta(days=1)
+        logger.warning('%s: ошибка загрузки данных API. Количество записей в БД %s. Повторное обновление %s.',
+                       computer_component, number_records, update_date)
+    return update_date
+
+
+# Планировщик обновления компьютерных компонентов
+scheduler = RefreshScheduler(refresh_component, site.max_parallel_refreshes)
+
+
+def database_loading() -> None:
+    """
+    Функция проверяет таблицу Update и обновляет информацию о компьютерных компонентах с сайта rapidAPI
+    по наступлении времени обновления каждого компонента.
+    Компоненты обновляются параллельно (планировщик scheduler) с общим лимитом запросов к API.
+    Прерванные загрузки (сохранены контрольные точки) продолжаются сразу после запуска.
+
+    """
+    db_read_update_table = ComputerComponentDatabase.read_update_table()
+    db_read_checkpoints = ComputerComponentDatabase.read_checkpoints()
     db_count = crud.count()
 
     # Заполнение таблицы Update в базе
     if not db_count(db, update['update']) == len(computer_components):
         db_load_update_table = ComputerComponentDatabase.load_update_table()
         update_table = list()
-        i_date: date = datetime.now().date()
+        i_date: datetime = datetime.now()
         for key in computer_components.keys():
             i_date += timedelta(days=1)
             update_table.append({'computer_component': key, 'update_date': i_date})
         db_load_update_table(update_table)
 
+    # Добавление в индекс совместимости записей, отсутствующих в индексе (например, загруженных до появления индекса)
+    db_fill_compatibility_index = ComputerComponentDatabase.fill_compatibility_index()
+    for key in computer_components.keys():
+        number_values = db_fill_compatibility_index(key)
+        if number_values:
+            logger.info('%s: индекс совместимости заполнен, атрибутов %s', key, number_values)
+
+    checkpoints = db_read_checkpoints()
+    date_now: datetime = datetime.now()
+    for element in list(db_read_update_table()):
+        if element.computer_component in checkpoints:
+            logger.info('%s: найдена контрольная точка прерванной загрузки', element.computer_component)
+            scheduler.schedule(element.computer_component, date_now)
+        else:
+            scheduler.schedule(element.computer_component, element.update_date)
+    scheduler.run()
+
+
+def ingestion() -> None:
+    """
+    Функция загрузки данных с API с арендой в базе данных: данные загружает только один процесс,
+    удерживающий аренду 'ingest' (остальные процессы ожидают аренды). При потере аренды новые обновления
+    не запускаются, текущие обновления прерываются перед запросом следующей страницы (без удаления
+    отсутствующих записей), и процесс снова ожидает аренды.
+
+    """
     while True:
-        update_table = db_read_update_table()
-
-        date_now: date = datetime.now().date()
-        for element in update_table:
-            if date_now >= element.update_date:
-                computer_component: str = element.computer_component
-                if db_load(computer_component):
-                    number_records = db_count(db, computer_components[computer_component])
-                    logger.info(f'{computer_component}: данные с API успешно загружены. '
-                                f'Дата обновления {date_now}. Количество записей в БД {number_records}.')
-                    element.update_date = date_now + timedelta(days=db_update_frequency)
-                    update_table_dict = [{'id': element.id, 'computer_component': element.computer_component,
-                                          'update_date': element.update_date}]
-                    db_save_update_table(update_table_dict)
-                else:
-                    number_records = db_count(db, computer_components[computer_component])
-                    logger.warning(f'{computer_component}: ошибка загрузки данных API. '
-                                   f'Дата последнего обновления {element.update_date}. '
-                                   f'Количество записей в БД {number_records}.')
-        sleep(86400)
+        ingest_lease.wait()
+        logger.info('Аренда загрузки данных получена: %s', ingest_lease.holder)
+        ingest_lease.keep(on_lost=scheduler.stop)
+        try:
+            database_loading()
+        finally:
+            ingest_lease.release()
+        scheduler.reset()
+
+
+def _chat_state(chat_id: int) -> Tuple[Dict, List[Dict]]:
+    """
+    Функция возвращает состояние чата: параметры запроса и историю запросов (при первом обращении -
+    исходные параметры и пустую историю). Состояние хранится отдельно для каждого чата, поэтому команды
+    пользователей разных чатов, обрабатываемые одновременно, не влияют друг на друга.
+
+    :param: chat_id - идентификатор чата.
+    :type: int
+    :return: - параметры запроса и история запросов чата (изменяются обработчиками команд и кнопок).
+    :rtype: Tuple[Dict, List[Dict]]
+    """
+    with _chats_lock:
+        state = _chats_state.get(chat_id)
+        if state is None:
+            state = _chats_state[chat_id] = (deepcopy(DEFAULT_REQUEST_PARAMETERS), list())
+            if len(_chats_state) > MAX_CHATS:
+                _chats_state.popitem(last=False)
+        else:
+            _chats_state.move_to_end(chat_id)
+        return state
+
+
+def chat_request_parameters(chat_id: int) -> Dict:
+    """
+    Функция возвращает параметры запроса чата.
+
+    :param: chat_id - идентификатор чата.
+    :type: int
+    :return: - параметры запроса чата.
+    :rtype: Dict
+    """
+    return _chat_state(chat_id)[0]
+
+
+def chat_history_info(chat_id: int) -> List[Dict]:
+    """
+    Функция возвращает историю запросов чата, выведенную по команде /history (для выбора записи истории).
+
+    :param: chat_id - идентификатор чата.
+    :type: int
+    :return: - список словарей с информацией по истории запросов.
+    :rtype: List[Dict]
+    """
+    return _chat_state(chat_id)[1]
 
 
 def reset_request_parameters(parameters: Dict, *key: str, start_index: str = 'start_index',
@@ -376,21 +656,52 @@ def is_int(value: Optional[Any]) -> bool:
         return False
 
 
+def register_commands() -> None:
+    """
+    Функция заполняет словарь функций обработчиками команд (вызываются из обработчиков кнопок и меню).
+
+    """
+    function_commands['build'] = output_build
+    function_commands['custom'] = output_custom_values
+    function_commands['help'] = help_on_bot_commands
+    function_commands['high'] = output_high_values
+    function_commands['history'] = output_history
+    function_commands['low'] = output_low_values
+    function_commands['start'] = output_start_message
+    function_commands['stop'] = output_stop_message
+    function_commands['unwatch'] = output_unwatch_message
+    function_commands['watch'] = output_watch_message
+
+
 class TelegramBot:
     """
     Класс TelegramBot - предоставляет метод для запуска телеграм бота.
 
     """
     @staticmethod
-    def run():
-        function_commands['custom'] = output_custom_values
-        function_commands['help'] = help_on_bot_commands
-        function_commands['high'] = output_high_values
-        function_commands['history'] = output_history
-        function_commands['low'] = output_low_values
-        function_commands['start'] = output_start_message
-        function_commands['stop'] = output_stop_message
-        Thread(target=database_loading).start()
+    def run(mode: str = 'all'):
+        """
+        Метод запускает бота в заданном режиме.
+
+        :param: mode - режим запуска: 'bot' - обработка запросов к боту (без загрузки данных),
+        'ingest' - загрузка данных с API (без обработки запросов), 'all' - обработка запросов и загрузка данных
+        (по умолчанию). Данные загружает только процесс, удерживающий аренду загрузки.
+        :type: str
+        """
+        if mode not in RUN_MODES:
+            raise ValueError(f'Неизвестный режим запуска {mode}, допустимые режимы: {", ".join(RUN_MODES)}')
+        register_commands()
+        if site.metrics_port:
+            MetricsServer(host=site.metrics_host, port=site.metrics_port).start()
+        if mode == 'ingest':
+            ingestion()
+            return
+        # Профилирование следующих обновлений по сигналу (например: kill -USR1 <pid>)
+        profile_signal = Signals.__members__.get(site.profile_signal)
+        if profile_signal is not None:
+            signal(profile_signal, lambda signal_number, frame: update_profiler.enable(site.profile_updates))
+        if mode == 'all':
+            Thread(target=ingestion, name='ingestion').start()
         bot.infinity_polling()
 
 
@@ -0,0 +1,269 @@
+"""
+Локальный сервер, имитирующий Telegram Bot API (api.telegram.org) для нагрузочной проверки бота.
+
+Сервер выдает боту обновления (getUpdates, long polling) из очереди, в которую их передает генератор нагрузки,
+отвечает на запросы отправки и редактирования сообщений и учитывает количество запросов по методам Bot API.
+Последнее сообщение бота и последняя inline клавиатура сохраняются по чатам (для нажатия кнопок),
+тексты всех сообщений бота - для проверки ответов.
+Сервер также отдает изображения компонентов (/images/<имя>), чтобы вывод записей не обращался к сети.
+
+Для работы бота с сервером: telebot.apihelper.API_URL = server.api_url
+"""
+from typing import Any, Dict, List, Optional, Tuple
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from json import dumps, loads
+from threading import Condition, Lock, Thread
+from time import monotonic, sleep, time
+from urllib.parse import urlparse, parse_qs
+
+# Максимальное время ожидания обновлений в запросе getUpdates (в секундах)
+MAX_POLL_WAIT = 1.0
+# Изображение компонента (содержимое не проверяется ботом)
+IMAGE_CONTENT = b'\xff\xd8\xff\xe0' + b'\x00' * 1024 + b'\xff\xd9'
+# Данные бота (ответ на getMe)
+BOT_USER = {'id': 1, 'is_bot': True, 'first_name': 'ComputerComponentsBot', 'username': 'ComputerComponentsBot'}
+# Методы Bot API, в ответ на которые возвращается сообщение
+MESSAGE_METHODS = ('sendMessage', 'sendPhoto', 'editMessageText', 'editMessageMedia', 'editMessageCaption',
+                   'editMessageReplyMarkup')
+
+
+class FakeBotApiServer:
+    """
+    Класс FakeBotApiServer - локальный HTTP сервер, имитирующий Telegram Bot API.
+
+    Args:
+    host (str): адрес сервера (по умолчанию '127.0.0.1')
+    port (int): порт сервера (по умолчанию 0 - свободный порт)
+    latency (float): задержка ответа на запросы, кроме getUpdates (в секундах, по умолчанию 0)
+
+    Attributes:
+    method_calls (Dict[str, int]): количество запросов по методам Bot API
+    """
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency: float = 0.0) -> None:
+        self.latency = latency
+        self.method_calls: Dict[str, int] = dict()
+        self._lock = Lock()
+        self._updates_ready = Condition(self._lock)
+        self._updates: List[Dict] = list()
+        self._next_update_id: int = 1
+        self._next_message_id: int = 1
+        self._last_messages: Dict[int, Dict] = dict()
+        self._last_keyboards: Dict[int, List[str]] = dict()
+        self._texts: Dict[int, List[str]] = dict()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[Thread] = None
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self._httpd.server_address[:2]
+
+    @property
+    def api_url(self) -> str:
+        """Значение для telebot.apihelper.API_URL."""
+        return 'http://{0}:{1}/bot{{0}}/{{1}}'.format(*self.address)
+
+    @property
+    def image_url(self) -> str:
+        """Адрес изображений компонентов (к адресу добавляется имя файла)."""
+        return 'http://{0}:{1}/images/'.format(*self.address)
+
+    def push_update(self, update: Dict) -> int:
+        """
+        Метод добавляет обновление в очередь (обновление получает следующий update_id).
+
+        :param: update - обновление без update_id (например: {'message': {...}}).
+        :type: Dict
+        :return: - update_id обновления.
+        :rtype: int
+        """
+        with self._updates_ready:
+            update_id = self._next_update_id
+            self._next_update_id += 1
+            self._updates.append(dict(update, update_id=update_id))
+            self._updates_ready.notify_all()
+        return update_id
+
+    def last_message(self, chat_id: int) -> Optional[Dict]:
+        """
+        Метод возвращает последнее сообщение бота в чате (отправленное или отредактированное).
+
+        :param: chat_id - идентификатор чата.
+        :type: int
+        :return: - сообщение (объект Message Bot API) или None.
+        :rtype: Optional[Dict]
+        """
+        with self._lock:
+            return self._last_messages.get(chat_id)
+
+    def last_keyboard(self, chat_id: int) -> List[str]:
+        """
+        Метод возвращает данные кнопок (callback_data) последней inline клавиатуры бота в чате.
+
+        :param: chat_id - идентификатор чата.
+        :type: int
+        :return: - данные кнопок.
+        :rtype: List[str]
+        """
+        with self._lock:
+            return list(self._last_keyboards.get(chat_id, ()))
+
+    def texts(self, chat_id: int, start: int = 0) -> List[str]:
+        """
+        Метод возвращает тексты (подписи изображений) сообщений бота в чате в порядке отправки
+        или редактирования.
+
+        :param: chat_id - идентификатор чата.
+        :type: int
+        :param: start - номер первого возвращаемого текста (по умолчанию 0).
+        :type: int
+        :return: - тексты сообщений.
+        :rtype: List[str]
+        """
+        with self._lock:
+            return self._texts.get(chat_id, list())[start:]
+
+    def _get_updates(self, offset: int, limit: int, timeout: float) -> List[Dict]:
+        """
+        Метод возвращает обновления начиная с offset, подтвержденные обновления (update_id < offset) удаляются.
+        Если обновлений нет, ожидает их не дольше timeout секунд.
+
+        :param: offset - первый запрашиваемый update_id.
+        :type: int
+        :param: limit - максимальное количество обновлений.
+        :type: int
+        :param: timeout - время ожидания обновлений (в секундах).
+        :type: float
+        :return: - обновления.
+        :rtype: List[Dict]
+        """
+        deadline = monotonic() + min(timeout, MAX_POLL_WAIT)
+        with self._updates_ready:
+            while True:
+                self._updates = [update for update in self._updates if update['update_id'] >= offset]
+                if self._updates:
+                    return self._updates[:limit]
+                remaining = deadline - monotonic()
+                if remaining <= 0:
+                    return list()
+                self._updates_ready.wait(remaining)
+
+    def _message(self, method: str, params: Dict[str, str]) -> Dict:
+        """
+        Метод формирует сообщение бота в ответ на запрос отправки или редактирования сообщения
+        и сохраняет его как последнее сообщение чата (текст сообщения добавляется к текстам чата).
+
+        :param: method - метод Bot API.
+        :type: str
+        :param: params - параметры запроса.
+        :type: Dict[str, str]
+        :return: - сообщение (объект Message Bot API).
+        :rtype: Dict
+        """
+        chat_id = int(params.get('chat_id', 0))
+        with self._lock:
+            if method.startswith('edit') and params.get('message_id'):
+                message_id = int(params['message_id'])
+            else:
+                message_id = self._next_message_id
+                self._next_message_id += 1
+        message: Dict[str, Any] = {'message_id': message_id, 'date': int(time()), 'from': BOT_USER,
+                                   'chat': {'id': chat_id, 'type': 'private'}}
+        if method == 'sendPhoto':
+            message['photo'] = [{'file_id': f'photo{message_id}', 'file_unique_id': f'photo{message_id}',
+                                 'width': 1, 'height': 1}]
+            message['caption'] = params.get('caption', '')
+        else:
+            message['text'] = params.get('text', params.get('caption', ''))
+        keyboard: Optional[List[str]] = None
+        if params.get('reply_markup'):
+            reply_markup = loads(params['reply_markup'])
+            if 'inline_keyboard' in reply_markup:
+                message['reply_markup'] = reply_markup
+                keyboard = [button['callback_data'] for row in reply_markup['inline_keyboard']
+                            for button in row if 'callback_data' in button]
+        with self._lock:
+            self._last_messages[chat_id] = message
+            text = message.get('text', message.get('caption'))
+            if text:
+                self._texts.setdefault(chat_id, list()).append(text)
+            if keyboard is not None:
+                self._last_keyboards[chat_id] = keyboard
+        return message
+
+    def _call(self, method: str, params: Dict[str, str]) -> Any:
+        """
+        Метод выполняет запрос к Bot API и возвращает результат (поле result ответа).
+
+        :param: method - метод Bot API.
+        :type: str
+        :param: params - параметры запроса.
+        :type: Dict[str, str]
+        :return: - результат запроса.
+        :rtype: Any
+        """
+        with self._lock:
+            self.method_calls[method] = self.method_calls.get(method, 0) + 1
+        if method == 'getUpdates':
+            return self._get_updates(int(params.get('offset', 0)), int(params.get('limit', 100)),
+                                     float(params.get('timeout', 0)))
+        if self.latency:
+            sleep(self.latency)
+        if method == 'getMe':
+            return BOT_USER
+        if method in MESSAGE_METHODS:
+            return self._message(method, params)
+        return True
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Заголовки и тело ответа передаются отдельными пакетами, без Nagle ответ не задерживается
+            disable_nagle_algorithm = True
+
+            def _send(self, status_code: int, body: bytes, content_type: str = 'application/json') -> None:
+                self.send_response(status_code)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _handle(self) -> None:
+                request = urlparse(self.path)
+                body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+                if request.path.startswith('/images/'):
+                    self._send(200, IMAGE_CONTENT, 'image/jpeg')
+                    return
+                parts = request.path.strip('/').split('/')
+                if len(parts) != 2 or not parts[0].startswith('bot'):
+                    self._send(404, b'{"ok": false, "error_code": 404, "description": "Not Found"}')
+                    return
+                params = {key: values[0] for key, values in parse_qs(request.query).items()}
+                if self.headers.get('Content-Type', '').startswith('application/x-www-form-urlencoded'):
+                    params.update({key: values[0] for key, values in parse_qs(body.decode('utf-8')).items()})
+                result = server._call(parts[1], params)
+                self._send(200, dumps({'ok': True, 'result': result}, ensure_ascii=False).encode('utf-8'))
+
+            do_GET = do_POST = _handle
+
+            def log_message(self, *args) -> None:
+                pass
+
+        return Handler
+
+    def start(self) -> 'FakeBotApiServer':
+        """
+        Метод запускает сервер в отдельном потоке.
+
+        :return: - запущенный сервер.
+        :rtype: FakeBotApiServer
+        """
+        self._thread = Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
@@ -0,0 +1,60 @@
+from typing import Dict, List
+from time import perf_counter
+from telebot import TeleBot
+from telebot.types import Message
+from tg_API.utils.db import ComputerComponentDatabase
+from tg_API.common.captions import render_caption
+from tg_API.common.markup_and_output import send_message
+from tg_API.common.pc_builder import BUILD_WEIGHTS, SOCKET_CATEGORIES, best_build, candidate_columns, \
+    load_candidates
+from log.logging import Logging
+
+# Подсказка по команде /build
+BUILD_USAGE = "/build <бюджет> - подобрать сборку компьютера в пределах бюджета (в долларах)\n" \
+              "Например: /build 1500"
+# Подготовка к записи ошибок в лог файл
+logger = Logging('main').get_logger()
+
+
+def build(bot: TeleBot, message: Message, names_computer_components: Dict[str, str]) -> None:
+    """
+    Функция build подбирает сборку компьютера с максимальной оценкой в пределах бюджета
+    (по одному компоненту каждой категории сборки, процессор и материнская плата с одинаковым разъемом).
+
+    :param: bot - телеграм бот.
+    :type: TeleBot
+    :param: message - объект из telebot, содержащий информацию о сообщении.
+    :type: Message
+    :param: names_computer_components - словарь наименований компьютерных компонентов для отображения.
+    :type: Dict[str, str]
+    """
+    parts = (message.text or '').split()
+    if len(parts) < 2 or not parts[1].isdigit() or int(parts[1]) == 0:
+        send_message(bot, message, BUILD_USAGE)
+        return
+    budget: int = int(parts[1]) * 100
+
+    start_time = perf_counter()
+    db_columns_by_price = ComputerComponentDatabase.columns_in_range_by_price()
+    candidates = {key: load_candidates(key, db_columns_by_price(key, candidate_columns(key), 1, budget))
+                  for key in BUILD_WEIGHTS}
+    result = best_build(candidates, budget)
+    logger.info('Сборка за %s$: %.3f с, записей %s', budget / 100, perf_counter() - start_time,
+                sum(len(element) for element in candidates.values()))
+
+    missing: List[str] = [names_computer_components[key] for key, element in candidates.items()
+                          if not element and key not in SOCKET_CATEGORIES]
+    if result is None:
+        send_message(bot, message, f'Сборку в пределах {budget / 100}$ подобрать не удалось')
+        return
+    option, categories = result
+    db_records_by_ids = ComputerComponentDatabase.records_by_ids()
+    lines = [f'Сборка за {option.price / 100}$ (бюджет {budget / 100}$), '
+             f'оценка {round(option.score / sum(BUILD_WEIGHTS.values()) * 100)} из 100:']
+    for key, record_id in zip(categories, option.records):
+        for record in db_records_by_ids(key, [record_id]):
+            lines.append(f'{names_computer_components[key]}: '
+                         f'{render_caption(record.title, record.link, record.price)}')
+    if missing:
+        lines.append(f'Нет подходящих записей: {", ".join(missing)}')
+    send_message(bot, message, '\n'.join(lines))
@@ -0,0 +1,62 @@
+from typing import Dict, List
+from telebot import TeleBot
+from telebot.types import Message
+from settings import get_settings
+from tg_API.utils.db import ComputerComponentDatabase
+from tg_API.common.captions import render_caption
+from tg_API.common.compatibility import COMPATIBLE_COMPONENTS, decode_compatible_data
+from tg_API.common.markup_and_output import send_message
+from tg_API.common.printing_records import page_captions
+from log.logging import Logging
+from log.pipeline import payload
+
+# Общие параметры
+site = get_settings()
+# Количество выводимых совместимых записей каждого компонента
+max_number_records: int = site.max_number_records
+# Подготовка к записи ошибок в лог файл
+logger = Logging('main').get_logger()
+
+
+def compatible(bot: TeleBot, message: Message, data: str, names_computer_components: Dict[str, str]) -> None:
+    """
+    Функция compatible выводит компоненты, совместимые с выбранной записью (по нажатию кнопки «Совместимые»):
+    материнские платы для процессора, процессоры и оперативную память для материнской платы,
+    материнские платы для оперативной памяти. Совместимые записи читаются из индекса совместимости
+    (атрибуты нормализуются при загрузке данных), текст наименований при запросе не разбирается.
+
+    :param: bot - телеграм бот.
+    :type: TeleBot
+    :param: message - объект из telebot, содержащий информацию о сообщении.
+    :type: Message
+    :param: data - данные нажатой кнопки (callback_data).
+    :type: str
+    :param: names_computer_components - словарь наименований компьютерных компонентов для отображения.
+    :type: Dict[str, str]
+    """
+    decoded = decode_compatible_data(data)
+    if decoded is None:
+        logger.warning('Неверные данные кнопки совместимых компонентов: %s', payload(data))
+        return
+    key, record_id = decoded
+    records = ComputerComponentDatabase.records_by_ids()(key, [record_id])
+    values = ComputerComponentDatabase.read_compatibility()(key, record_id)
+    if not records:
+        send_message(bot, message, 'Запись не найдена (каталог обновлен)')
+        return
+
+    record = records[0]
+    lines: List[str] = [f'{names_computer_components[key]}: {render_caption(record.title, record.link, record.price)}']
+    db_compatible_records = ComputerComponentDatabase.compatible_records()
+    for target, attribute in COMPATIBLE_COMPONENTS[key]:
+        name = names_computer_components[target]
+        if attribute not in values:
+            lines.append(f'\n{name}: совместимость не определена')
+            continue
+        number_records, page = db_compatible_records(target, attribute, values[attribute], max_number_records)
+        if not page:
+            lines.append(f'\n{name} ({values[attribute]}): совместимые записи не найдены')
+            continue
+        lines.append(f'\n{name} ({values[attribute]}), всего {number_records}:')
+        lines.extend(element['text'].rstrip('\n') for element in page_captions(target, page, 1, max_number_records))
+    send_message(bot, message, '\n'.join(lines))
@@ -1,29 +1,46 @@
-from typing import List, Dict, Optional, Any
-from time import sleep
-from json import loads
+from typing import List, Dict, Optional, Any, Set, Callable, Tuple, Iterable, Union
+from time import sleep, perf_counter
+from datetime import datetime, timedelta
+from json import dumps
+from hashlib import blake2b
+from uuid import uuid4
 from requests import ReadTimeout, ConnectionError, ConnectTimeout
+from requests.exceptions import ChunkedEncodingError
 from urllib3.exceptions import ReadTimeoutError
-from settings import SiteSettings
-from peewee import IntegrityError, ModelSelect
+from settings import get_settings
+from peewee import IntegrityError, ModelSelect, EXCLUDED, chunked
 from database.common.models import db
-from database.core import crud, computer_components, update, history, load_data_in_model
-from site_API.core import headers, params, site_api, url
+from database.core import crud, computer_components, update, history, load_query_in_rows
+from database.core import row_hash, price_change, checkpoint, caption, lease, subscription, compatibility
+from database.utils.CRUD import SQLITE_MAX_VARIABLES
+from site_API.core import headers, params, site_api, url, response_cache
+from site_API.utils.rate_limit import PageSizeController, TOO_MANY_REQUESTS
+from site_API.utils.json_stream import iter_json_array
+from site_API.utils.response_cache import spool_content, NOT_MODIFIED
+from tg_API.common.captions import render_caption, CAPTION_TEMPLATE_VERSION
+from tg_API.common.compatibility import COMPATIBILITY_ATTRIBUTES, compatibility_rows
 from log.logging import Logging
+from log.pipeline import payload
+from metrics.core import ingest_rows_total, ingest_rows_per_second
 
 # Общие параметры
-site = SiteSettings()
+site = get_settings()
 # Паузы между запросами к данным API (в секундах)
 query_intervals: List[int] = site.query_intervals
 # Количество запрашиваемых позиций
 number_requested_items: List[int] = site.number_requested_items
 # Максимальное количество запросов
 max_number_requests: int = site.max_number_requests
+# Размер блока данных при чтении ответа API (в байтах)
+RESPONSE_CHUNK_SIZE = 65536
 
 db_write = crud.create()
+db_upsert = crud.upsert()
 db_read = crud.retrieve()
 db_count = crud.count()
 db_delete = crud.delete()
-db_save = crud.save()
+db_delete_by_values = crud.delete_by_values()
+db_update_by_values = crud.update_by_values()
 db_min = crud.min_value()
 db_max = crud.max_value()
 db_records_in_range = crud.records_in_range()
@@ -51,13 +68,14 @@ def _load_update_table(data: List[Dict]) -> bool:
         db_write(db, update['update'], data)
         return True
     except IntegrityError as exc:
-        logger.error(f"Таблица Update не заполнена\n{exc} {type(exc)}\ndb: {db}\ndata: {data}")
+        logger.error("Таблица Update не заполнена\n%s %s\ndb: %s\ndata: %s", exc, type(exc), db, payload(data))
         return False
 
 
 def _save_update_table(data: List[Dict]) -> bool:
     """
     Функция сохранения обновленных данных в таблицу Update базы данных.
+    Записи заменяются по ключевому полю (id) без создания экземпляров модели.
 
     :param: data - список словарей с данными об обновлении таблиц базы данными.
     Ключ - наименование таблицы (модели), значение - дата следующего обновления.
@@ -66,12 +84,10 @@ def _save_update_table(data: List[Dict]) -> bool:
     :rtype: bool
     """
     try:
-        data_model = load_data_in_model(update['update'], data)
-        for i_data_model in data_model:
-            db_save(db, i_data_model)
+        db_upsert(db, update['update'], data)
         return True
     except IntegrityError as exc:
-        logger.error(f"Таблица Update не сохранена\n{exc} {type(exc)}\ndb: {db}\ndata: {data}")
+        logger.error("Таблица Update не сохранена\n%s %s\ndb: %s\ndata: %s", exc, type(exc), db, payload(data))
         return False
 
 
@@ -83,8 +99,7 @@ def _read_update_table() -> List[Dict]:
     Ключ - наименование таблицы (модели), значение - дата следующего обновления.
     :rtype: List[Dict]
     """
-    return db_read(db, update['update'], update['update'].id,
-                   update['update'].computer_component, update['update'].update_date)
+    return load_query_in_rows(db_read(db, update['update']))
 
 
 def _load_history_table(data: List[Dict]) -> bool:
@@ -101,7 +116,7 @@ def _load_history_table(data: List[Dict]) -> bool:
         db_write(db, history['history'], data)
         return True
     except IntegrityError as exc:
-        logger.error(f"Таблица History не заполнена\n{exc} {type(exc)}\ndb: {db}\ndata: {data}")
+        logger.error("Таблица History не заполнена\n%s %s\ndb: %s\ndata: %s", exc, type(exc), db, payload(data))
         return False
 
 
@@ -122,73 +137,554 @@ def _read_history_table() -> List[Dict]:
     return retrieved
 
 
-def _load_data(key: str, param_offset: int = 0) -> bool:
+def _row_hash(record: Dict) -> str:
+    """
+    Функция возвращает хеш содержимого записи компьютерного компонента.
+
+    :param: record - словарь с данными записи.
+    :type: Dict
+    :return: - хеш содержимого записи.
+    :rtype: str
+    """
+    content = dumps(record, sort_keys=True, ensure_ascii=False, default=str)
+    return blake2b(content.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _read_stored_hashes(key: str) -> Dict[str, str]:
+    """
+    Функция читает из базы данных хеши записей заданного компьютерного компонента.
+
+    :param: key - наименование компонента.
+    :type: str
+    :return: - словарь хешей записей. Ключ - идентификатор компонента, значение - хеш записи.
+    :rtype: Dict[str, str]
+    """
+    model = row_hash['row_hash']
+    retrieved = db_read(db, model, model.record_id, model.row_hash).where(model.computer_component == key)
+    return {record_id: hash_value for record_id, hash_value in retrieved.tuples()}
+
+
+def _read_stored_prices(key: str) -> Dict[str, int]:
+    """
+    Функция читает из базы данных стоимость всех записей заданного компьютерного компонента.
+
+    :param: key - наименование компонента.
+    :type: str
+    :return: - словарь стоимости. Ключ - идентификатор компонента, значение - стоимость.
+    :rtype: Dict[str, int]
+    """
+    model = computer_components[key]
+    return {record_id: price for record_id, price in db_read(db, model, model.id, model.price).tuples()}
+
+
+def _caption_row(key: str, record: Dict) -> Dict:
+    """
+    Функция возвращает строку таблицы Caption (подпись записи для вывода в чат).
+
+    :param: key - наименование компонента.
+    :type: str
+    :param: record - словарь с данными записи (стоимость в центах).
+    :type: Dict
+    :return: - строка таблицы Caption.
+    :rtype: Dict
+    """
+    return {'computer_component': key, 'record_id': record['id'], 'version': CAPTION_TEMPLATE_VERSION,
+            'caption': render_caption(record.get('title'), record.get('link'), record.get('price'))}
+
+
+def _replace_compatibility(key: str, records: List[Dict]) -> None:
+    """
+    Функция заменяет строки индекса совместимости заданных записей компонента.
+
+    :param: key - наименование компонента.
+    :type: str
+    :param: records - список словарей с данными записей.
+    :type: List[Dict]
+    """
+    if key not in COMPATIBILITY_ATTRIBUTES or not records:
+        return
+    model_compatibility = compatibility['compatibility']
+    db_delete_by_values(db, model_compatibility, model_compatibility.record_id, [record['id'] for record in records],
+                        model_compatibility.computer_component == key)
+    db_upsert(db, model_compatibility, compatibility_rows(key, records))
+
+
+def _store_record_indexes(key: str, records: List[Dict], run_id: str) -> None:
+    """
+    Функция сохраняет хеши, подписи и строки индекса совместимости записей, сохраненных без сравнения
+    с базой данных (например, при загрузке каталога из файла). Хеши формируются так же, как при загрузке
+    данных с API, поэтому при следующем обновлении неизменившиеся записи повторно не сохраняются.
+
+    :param: key - наименование компонента.
+    :type: str
+    :param: records - список словарей с данными записей (стоимость в центах).
+    :type: List[Dict]
+    :param: run_id - идентификатор загрузки.
+    :type: str
+    """
+    fields: List[str] = computer_components[key]._meta.sorted_field_names
+    hashes: List[Dict] = [{'computer_component': key, 'record_id': record['id'],
+                           'row_hash': _row_hash({field: record[field] for field in fields if field in record}),
+                           'run_id': run_id}
+                          for record in records]
+    with db.atomic():
+        db_upsert(db, row_hash['row_hash'], hashes)
+        db_upsert(db, caption['caption'], [_caption_row(key, record) for record in records])
+        _replace_compatibility(key, records)
+
+
+def _delete_record_indexes(key: str) -> None:
+    """
+    Функция удаляет хеши, подписи и строки индекса совместимости всех записей компонента.
+
+    :param: key - наименование компонента.
+    :type: str
+    """
+    with db.atomic():
+        for model in (row_hash['row_hash'], caption['caption'], compatibility['compatibility']):
+            db_delete_by_values(db, model, model.computer_component, [key])
+
+
+def _store_changes(key: str, run_id: str, data: List[Dict], stored_hashes: Dict[str, str],
+                   stored_prices: Dict[str, int], seen: Set[str]) -> int:
+    """
+    Функция сравнивает загруженные с API записи с сохраненными в базе данных
+    и сохраняет только новые и измененные записи. Изменения стоимости записываются в журнал PriceChange.
+    Для новых и измененных записей формируются и сохраняются подписи для вывода в чат
+    и нормализованные атрибуты совместимости (индекс Compatibility).
+    Для всех полученных записей сохраняется идентификатор загрузки.
+
+    :param: key - наименование компонента.
+    :type: str
+    :param: run_id - идентификатор загрузки.
+    :type: str
+    :param: data - список словарей с данными, загруженными с API.
+    :type: List[Dict]
+    :param: stored_hashes - словарь хешей сохраненных записей (обновляется).
+    :type: Dict[str, str]
+    :param: stored_prices - словарь стоимости сохраненных записей (обновляется).
+    :type: Dict[str, int]
+    :param: seen - множество идентификаторов записей, полученных с API (обновляется).
+    :type: Set[str]
+    :return: - количество новых и измененных записей.
+    :rtype: int
+    """
+    model = computer_components[key]
+    fields: List[str] = model._meta.sorted_field_names
+    changed_records: List[Dict] = list()
+    changed_hashes: List[Dict] = list()
+    changed_captions: List[Dict] = list()
+    price_changes: List[Dict] = list()
+    unchanged_ids: List[str] = list()
+    changed_at = datetime.now()
+
+    for element in data:
+        record: Dict = {field: element[field] for field in fields if field in element}
+        record_id: str = record['id']
+        seen.add(record_id)
+        record_hash: str = _row_hash(record)
+        if stored_hashes.get(record_id) == record_hash:
+            unchanged_ids.append(record_id)
+            continue
+
+        price_old: Optional[int] = stored_prices.get(record_id)
+        if price_old is not None and price_old != record['price']:
+            price_changes.append({'computer_component': key, 'record_id': record_id,
+                                  'price_old': price_old, 'price_new': record['price'],
+                                  'changed_at': changed_at})
+        changed_records.append(record)
+        changed_hashes.append({'computer_component': key, 'record_id': record_id,
+                               'row_hash': record_hash, 'run_id': run_id})
+        changed_captions.append(_caption_row(key, record))
+        stored_hashes[record_id] = record_hash
+        stored_prices[record_id] = record['price']
+
+    model_hash = row_hash['row_hash']
+    with db.atomic():
+        db_upsert(db, model, changed_records)
+        db_upsert(db, model_hash, changed_hashes)
+        db_upsert(db, caption['caption'], changed_captions)
+        _replace_compatibility(key, changed_records)
+        if unchanged_ids:
+            db_update_by_values(db, model_hash, {'run_id': run_id}, model_hash.record_id, unchanged_ids,
+                                model_hash.computer_component == key)
+        if price_changes:
+            db_write(db, price_change['price_change'], price_changes)
+
+    return len(changed_records)
+
+
+def _store_batch(key: str, run_id: str, batch: List[Dict], stored_hashes: Dict[str, str],
+                 stored_prices: Dict[str, int], seen: Set[str]) -> int:
+    """
+    Функция сохраняет пакет записей, полученных с API. Ошибки сохранения записываются в лог.
+
+    :param: key - наименование компонента.
+    :type: str
+    :param: run_id - идентификатор загрузки.
+    :type: str
+    :param: batch - список словарей с данными, полученными с API.
+    :type: List[Dict]
+    :param: stored_hashes - словарь хешей сохраненных записей (обновляется).
+    :type: Dict[str, str]
+    :param: stored_prices - словарь стоимости сохраненных записей (обновляется).
+    :type: Dict[str, int]
+    :param: seen - множество идентификаторов записей, полученных с API (обновляется).
+    :type: Set[str]
+    :return: - количество новых и измененных записей.
+    :rtype: int
+    """
+    try:
+        return _store_changes(key, run_id, batch, stored_hashes, stored_prices, seen)
+    except IntegrityError as exc:
+        logger.error("%s: загруженные данные не сохранены в БД\n%s %s\ndb: %s\ndata: %s",
+                     key, exc, type(exc), db, payload(batch))
+        return 0
+
+
+def _store_page(key: str, run_id: str, chunks: Iterable[bytes], stored_hashes: Dict[str, str],
+                stored_prices: Dict[str, int], seen: Set[str]) -> Tuple[List[str], int]:
+    """
+    Функция последовательно читает элементы страницы данных из ответа API,
+    приводит стоимость к целому числу центов и сохраняет изменения в базу данных пакетами.
+    Размер пакета не превышает ограничение SQLite на количество параметров в одном запросе,
+    поэтому объем используемой памяти не зависит от количества позиций на странице.
+
+    :param: key - наименование компонента.
+    :type: str
+    :param: run_id - идентификатор загрузки.
+    :type: str
+    :param: chunks - последовательность блоков данных тела ответа API.
+    :type: Iterable[bytes]
+    :param: stored_hashes - словарь хешей сохраненных записей (обновляется).
+    :type: Dict[str, str]
+    :param: stored_prices - словарь стоимости сохраненных записей (обновляется).
+    :type: Dict[str, int]
+    :param: seen - множество идентификаторов записей, полученных с API (обновляется).
+    :type: Set[str]
+    :return: - идентификаторы полученных записей и количество новых и измененных записей.
+    :rtype: Tuple[List[str], int]
+    """
+    batch_size: int = max(1, SQLITE_MAX_VARIABLES // len(computer_components[key]._meta.sorted_field_names))
+    batch: List[Dict] = list()
+    ids: List[str] = list()
+    number_changed: int = 0
+
+    for element in iter_json_array(chunks):
+        element['price'] = int(element['price'] * 100)
+        batch.append(element)
+        ids.append(element['id'])
+        if len(batch) >= batch_size:
+            number_changed += _store_batch(key, run_id, batch, stored_hashes, stored_prices, seen)
+            batch = list()
+    if batch:
+        number_changed += _store_batch(key, run_id, batch, stored_hashes, stored_prices, seen)
+
+    return ids, number_changed
+
+
+def _reuse_page(key: str, run_id: str, ids: List[str], seen: Set[str]) -> None:
+    """
+    Функция учитывает записи страницы, которая не изменилась с предыдущей загрузки:
+    записи отмечаются как полученные в текущей загрузке без чтения и сохранения данных.
+
+    :param: key - наименование компонента.
+    :type: str
+    :param: run_id - идентификатор загрузки.
+    :type: str
+    :param: ids - идентификаторы записей страницы.
+    :type: List[str]
+    :param: seen - множество идентификаторов записей, полученных с API (обновляется).
+    :type: Set[str]
+    """
+    model_hash = row_hash['row_hash']
+    seen.update(ids)
+    db_update_by_values(db, model_hash, {'run_id': run_id}, model_hash.record_id, ids,
+                        model_hash.computer_component == key)
+
+
+def _load_page(key: str, run_id: str, request_params: Dict, timeout: int, stored_hashes: Dict[str, str],
+               stored_prices: Dict[str, int], seen: Set[str]) -> Union[int, Tuple[int, int]]:
+    """
+    Функция запрашивает страницу данных с API и сохраняет изменения в базу данных.
+    Если страница уже загружалась, отправляется условный запрос (If-None-Match, If-Modified-Since).
+    Если сервер не поддерживает условные запросы, содержимое ответа сравнивается по хешу.
+    Для неизменившейся страницы разбор данных и запись в базу данных не выполняются.
+
+    :param: key - наименование компонента.
+    :type: str
+    :param: run_id - идентификатор загрузки.
+    :type: str
+    :param: request_params - параметры запроса (limit, offset).
+    :type: Dict
+    :param: timeout - время ожидания ответа.
+    :type: int
+    :param: stored_hashes - словарь хешей сохраненных записей (обновляется).
+    :type: Dict[str, str]
+    :param: stored_prices - словарь стоимости сохраненных записей (обновляется).
+    :type: Dict[str, int]
+    :param: seen - множество идентификаторов записей, полученных с API (обновляется).
+    :type: Set[str]
+    :return: - количество полученных записей и количество новых и измененных записей
+    или код статуса ответа в случае ошибки.
+    :rtype: Union[int, Tuple[int, int]]
+    """
+    limit, offset = request_params['limit'], request_params['offset']
+    entry: Optional[Dict] = response_cache.get(key, limit, offset)
+    # Сохраненные данные о странице используются, только если все ее записи есть в базе данных
+    if entry and not all(record_id in stored_hashes for record_id in entry['ids']):
+        entry = None
+    request_headers: Dict = dict(headers, **response_cache.validators(entry))
+
+    response = computer_component('GET', url, request_headers, request_params, key, timeout=timeout, stream=True)
+    if response == NOT_MODIFIED and entry:
+        _reuse_page(key, run_id, entry['ids'], seen)
+        return len(entry['ids']), 0
+    if isinstance(response, int):
+        return response
+
+    with response:
+        content, content_hash = spool_content(response.iter_content(RESPONSE_CHUNK_SIZE))
+        etag, last_modified = response.headers.get('ETag'), response.headers.get('Last-Modified')
+    with content:
+        if entry and entry['content_hash'] == content_hash:
+            _reuse_page(key, run_id, entry['ids'], seen)
+            return len(entry['ids']), 0
+        ids, number_changed = _store_page(key, run_id, iter(lambda: content.read(RESPONSE_CHUNK_SIZE), b''),
+                                          stored_hashes, stored_prices, seen)
+    response_cache.put(key, limit, offset, etag, last_modified, content_hash, ids)
+    return len(ids), number_changed
+
+
+def _delete_missing(key: str, stored_prices: Dict[str, int], seen: Set[str]) -> int:
+    """
+    Функция удаляет из базы данных записи компонента, которые не были получены с API.
+
+    :param: key - наименование компонента.
+    :type: str
+    :param: stored_prices - словарь стоимости сохраненных записей.
+    :type: Dict[str, int]
+    :param: seen - множество идентификаторов записей, полученных с API.
+    :type: Set[str]
+    :return: - количество удаленных записей.
+    :rtype: int
+    """
+    missing: List[str] = [record_id for record_id in stored_prices if record_id not in seen]
+    if not missing:
+        return 0
+    model = computer_components[key]
+    model_hash = row_hash['row_hash']
+    model_caption = caption['caption']
+    model_compatibility = compatibility['compatibility']
+    with db.atomic():
+        deleted = db_delete_by_values(db, model, model.id, missing)
+        db_delete_by_values(db, model_hash, model_hash.record_id, missing, model_hash.computer_component == key)
+        db_delete_by_values(db, model_caption, model_caption.record_id, missing,
+                            model_caption.computer_component == key)
+        db_delete_by_values(db, model_compatibility, model_compatibility.record_id, missing,
+                            model_compatibility.computer_component == key)
+
+    return deleted
+
+
+def _read_seen(key: str, run_id: str) -> Set[str]:
+    """
+    Функция читает из базы данных идентификаторы записей компонента, полученных в заданной загрузке.
+
+    :param: key - наименование компонента.
+    :type: str
+    :param: run_id - идентификатор загрузки.
+    :type: str
+    :return: - множество идентификаторов записей.
+    :rtype: Set[str]
+    """
+    model = row_hash['row_hash']
+    retrieved = db_read(db, model, model.record_id).where((model.computer_component == key) &
+                                                           (model.run_id == run_id))
+    return {record_id for record_id, in retrieved.tuples()}
+
+
+def _read_checkpoints() -> Dict[str, Dict]:
+    """
+    Функция читает из базы данных контрольные точки прерванных загрузок.
+
+    :return: - словарь контрольных точек. Ключ - наименование компонента, значение - словарь с ключами:
+    run_id - идентификатор загрузки, param_offset - смещение, page_size - количество запрашиваемых позиций.
+    :rtype: Dict[str, Dict]
+    """
+    model = checkpoint['checkpoint']
+    retrieved = db_read(db, model, model.computer_component, model.run_id, model.param_offset, model.page_size)
+    return {element['computer_component']: element for element in retrieved.dicts()}
+
+
+def _save_checkpoint(key: str, run_id: str, param_offset: int, page_size: int) -> None:
+    """
+    Функция сохраняет контрольную точку загрузки компонента.
+
+    :param: key - наименование компонента.
+    :type: str
+    :param: run_id - идентификатор загрузки.
+    :type: str
+    :param: param_offset - смещение для запроса следующей страницы данных.
+    :type: int
+    :param: page_size - количество запрашиваемых позиций.
+    :type: int
+    """
+    db_upsert(db, checkpoint['checkpoint'], [{'computer_component': key, 'run_id': run_id,
+                                              'param_offset': param_offset, 'page_size': page_size,
+                                              'updated_at': datetime.now()}])
+
+
+def _delete_checkpoint(key: str) -> None:
+    """
+    Функция удаляет контрольную точку загрузки компонента.
+
+    :param: key - наименование компонента.
+    :type: str
+    """
+    model = checkpoint['checkpoint']
+    db_delete_by_values(db, model, model.computer_component, [key])
+
+
+def _load_data(key: str, param_offset: int = 0, on_page: Optional[Callable[[str, int], None]] = None,
+               on_loaded: Optional[Callable[[str, datetime], None]] = None,
+               is_cancelled: Optional[Callable[[], bool]] = None) -> bool:
     """
     Функция загрузки данных о компьютерных компонентах с RapidAPI в локальную базу данных.
-    Существующие данные по загружаемому компоненту удаляются.
+    В базе данных сохраняются только изменения: новые и измененные записи (определяются по хешу
+    содержимого записи), записи, отсутствующие в данных API, удаляются.
+    Частота запросов определяется общим лимитом запросов к API (RateController), количество
+    запрашиваемых позиций увеличивается после успешных запросов и уменьшается вдвое после ошибок.
+    После каждой сохраненной страницы данных сохраняется контрольная точка (Checkpoint).
+    Если загрузка компонента была прервана, она продолжается с контрольной точки,
+    полученные ранее записи повторно не запрашиваются.
+    Неизменившиеся с предыдущей загрузки страницы (условный запрос или хеш содержимого)
+    не разбираются и не сохраняются.
 
     :param: key - наименование загружаемого компонента.
     :type: str
-    :param: param_offset - смещение для запроса следующих позиций.
+    :param: param_offset - смещение для запроса следующих позиций (если нет контрольной точки).
     :type: int
-    :return: result - в случае успешной загрузки данных возвращается True, иначе False.
+    :param: on_page - функция, вызываемая после сохранения каждой страницы данных
+    (передаются наименование компонента и количество полученных записей).
+    :type: Optional[Callable[[str, int], None]]
+    :param: on_loaded - функция, вызываемая после загрузки, если сохранена хотя бы одна страница данных
+    (передаются наименование компонента и время начала загрузки, например для уведомлений о снижении стоимости).
+    :type: Optional[Callable[[str, datetime], None]]
+    :param: is_cancelled - функция, проверяемая перед запросом каждой страницы и перед удалением отсутствующих
+    записей (например, потеря аренды загрузки). Если возвращает True, загрузка прерывается без удаления записей,
+    контрольная точка сохраняется.
+    :type: Optional[Callable[[], bool]]
+    :return: result - в случае успешного завершения загрузки данных возвращается True, иначе False.
     :rtype: bool
     """
-    number_requested_items_index: int = 0
     query_interval_index: int = 0
     timeout: int = 5
     number_requests: int = 0
 
     result: bool = False
+    is_page_loaded: bool = False
+    cancelled: bool = False
+
+    stored_hashes: Dict[str, str] = _read_stored_hashes(key)
+    stored_prices: Dict[str, int] = _read_stored_prices(key)
+    number_changed: int = 0
+    number_rows: int = 0
+    start_time: float = perf_counter()
+    started_at: datetime = datetime.now()
+    request_params: Dict = dict(params)
+
+    saved_checkpoint: Optional[Dict] = _read_checkpoints().get(key)
+    if saved_checkpoint:
+        run_id: str = saved_checkpoint['run_id']
+        param_offset = saved_checkpoint['param_offset']
+        page_size = PageSizeController(max(number_requested_items), min(number_requested_items),
+                                       limit=saved_checkpoint['page_size'])
+        seen: Set[str] = _read_seen(key, run_id)
+        logger.info('%s: загрузка продолжена с контрольной точки, смещение %s, получено ранее записей %s',
+                    key, param_offset, len(seen))
+    else:
+        run_id = uuid4().hex
+        page_size = PageSizeController(max(number_requested_items), min(number_requested_items))
+        seen = set()
 
     while True:
-        param_limit: int = number_requested_items[number_requested_items_index]
-        params['limit'] = param_limit
-        params['offset'] = param_offset
+        if is_cancelled is not None and is_cancelled():
+            logger.warning('%s: загрузка отменена перед запросом страницы, смещение %s', key, param_offset)
+            cancelled = True
+            break
+        param_limit: int = page_size.limit
+        request_params['limit'] = param_limit
+        request_params['offset'] = param_offset
         try:
-            response = computer_component('GET', url, headers, params, key, timeout=timeout)
-        except (ReadTimeoutError, ReadTimeout, ConnectionError, ConnectTimeout) as exc:
-            logger.warning(f"Ошибка запроса данных с API\n{exc} {type(exc)}\nurl: {url}\n"
-                           f"headers: {headers}\nparams: {params}\nkey: {key}\ntimeout: {timeout}")
+            response = _load_page(key, run_id, request_params, timeout, stored_hashes, stored_prices, seen)
+            if not isinstance(response, int):
+                number_received, number_stored = response
+                number_changed += number_stored
+                number_rows += number_received
+                ingest_rows_total.inc(number_received, key)
+        except (ReadTimeoutError, ReadTimeout, ConnectionError, ConnectTimeout,
+                ChunkedEncodingError, ValueError) as exc:
+            logger.warning("Ошибка запроса данных с API\n%s %s\nurl: %s\nheaders: %s\nparams: %s\nkey: %s\n"
+                           "timeout: %s", exc, type(exc), url, payload(headers), payload(request_params), key, timeout)
             timeout += 5
+            page_size.failure()
             if query_interval_index + 1 < len(query_intervals):
                 query_interval_index += 1
             if timeout > 15:
                 break
         else:
             if not isinstance(response, int):
-                data = loads(response.text)
-                for element in data:
-                    element['price'] = int(element['price'] * 100)
-
-                if not result:
-                    db_delete(db, computer_components[key])
-
-                try:
-                    db_write(db, computer_components[key], data)
-                except IntegrityError as exc:
-                    logger.error(f"{key}: загруженные данные не сохранены в БД\n{exc} {type(exc)}\n"
-                                 f"db: {db}\ndata: {data}")
-
-                number_records = db_count(db, computer_components[key])
                 query_interval_index = 0
-                result = True
-                param_offset = number_records
-            else:
-                if number_requested_items_index + 1 < len(number_requested_items):
-                    number_requested_items_index += 1
-                elif query_interval_index + 1 < len(query_intervals):
-                    query_interval_index += 1
-                else:
+                is_page_loaded = True
+                param_offset += number_received
+                page_size.success()
+                _save_checkpoint(key, run_id, param_offset, page_size.limit)
+                if on_page is not None:
+                    on_page(key, len(seen))
+                number_requests += 1
+                # Получено меньше запрошенного количества позиций - данные API закончились
+                if number_received < param_limit:
+                    result = True
+                    break
+                # Достигнуто максимальное количество запросов - загрузка не завершена: отсутствующие записи
+                # не удаляются, загрузка продолжится с контрольной точки
+                if number_requests > max_number_requests:
+                    logger.warning('%s: достигнуто максимальное количество запросов %s', key, max_number_requests)
                     break
+                continue
+
+            if response != TOO_MANY_REQUESTS and not page_size.is_minimum:
+                page_size.failure()
+            elif query_interval_index + 1 < len(query_intervals):
+                query_interval_index += 1
+            else:
+                break
 
             number_requests += 1
             if number_requests > max_number_requests:
                 break
 
+        # Пауза перед повтором запроса после ошибки
         query_interval: int = query_intervals[query_interval_index]
         sleep(query_interval)
 
+    ingest_rows_per_second.set(number_rows / max(perf_counter() - start_time, 1e-9), key)
+    if result and is_cancelled is not None and is_cancelled():
+        logger.warning('%s: загрузка отменена, отсутствующие записи не удалены', key)
+        result = False
+        cancelled = True
+    if result:
+        number_deleted: int = _delete_missing(key, stored_prices, seen)
+        _delete_checkpoint(key)
+        logger.info('%s: получено записей %s, сохранено новых и измененных %s, удалено %s',
+                    key, len(seen), number_changed, number_deleted)
+    elif is_page_loaded:
+        logger.warning('%s: загрузка прервана, смещение %s, получено записей %s. '
+                       'Загрузка будет продолжена с контрольной точки.', key, param_offset, len(seen))
+    if is_page_loaded and on_loaded is not None and not cancelled:
+        on_loaded(key, started_at)
+
     return result
 
 
@@ -233,10 +729,86 @@ def _records_in_range_by_price(key: str, min_price: Any, max_price: Any) -> Mode
     :type: Any
     :param: max_price - максимальное значение цены.
     :type: Any
-    :return: - записи из заданной таблицы, где значения цены находятся в заданном диапазоне.
+    :return: - записи из заданной таблицы, где значения цены находятся в заданном диапазоне
+    (упорядочены по цене и идентификатору).
     :rtype: Optional[ModelSelect]
     """
-    return db_records_in_range(db, computer_components[key], computer_components[key].price, min_price, max_price)
+    model = computer_components[key]
+    return db_records_in_range(db, model, model.price, min_price, max_price).order_by(model.price, model.id)
+
+
+def _columns_in_range_by_price(key: str, columns: Iterable[str], min_price: int, max_price: int) -> List[Tuple]:
+    """
+    Функция возвращает заданные поля записей из заданной таблицы, где значения цены находятся в заданном диапазоне
+    (строки читаются курсором базы данных без преобразования в объекты peewee, записи не упорядочиваются).
+
+    :param: key - наименование компонента.
+    :type: str
+    :param: columns - наименования полей.
+    :type: Iterable[str]
+    :param: min_price - минимальное значение цены.
+    :type: int
+    :param: max_price - максимальное значение цены.
+    :type: int
+    :return: - строки записей (значения полей по порядку columns).
+    :rtype: List[Tuple]
+    """
+    model = computer_components[key]
+    query = db_records_in_range(db, model, model.price, min_price, max_price).order_by()
+    return db.execute(query.select(*[getattr(model, column) for column in columns])).fetchall()
+
+
+def _records_page_by_price(key: str, min_price: int, max_price: int, limit: int,
+                           after: Optional[Tuple[int, str]] = None, before: Optional[Tuple[int, str]] = None,
+                           offset: int = 0) -> ModelSelect:
+    """
+    Функция возвращает страницу записей из заданной таблицы, где значения цены находятся в заданном диапазоне
+    (записи упорядочены по цене и идентификатору). Страница читается по ключу: после записи after
+    или перед записью before (ключ - цена и идентификатор записи), без ключа - со смещением offset.
+
+    :param: key - наименование компонента.
+    :type: str
+    :param: min_price - минимальное значение цены.
+    :type: int
+    :param: max_price - максимальное значение цены.
+    :type: int
+    :param: limit - количество записей страницы.
+    :type: int
+    :param: after - ключ записи, после которой начинается страница (по умолчанию None).
+    :type: Optional[Tuple[int, str]]
+    :param: before - ключ записи, перед которой заканчивается страница (по умолчанию None).
+    :type: Optional[Tuple[int, str]]
+    :param: offset - смещение первой записи страницы, если ключ не задан (по умолчанию 0).
+    :type: int
+    :return: - записи страницы (для before - в обратном порядке).
+    :rtype: ModelSelect
+    """
+    model = computer_components[key]
+    query = db_records_in_range(db, model, model.price, min_price, max_price)
+    if after is not None:
+        return query.where((model.price > after[0]) | ((model.price == after[0]) & (model.id > after[1]))) \
+            .order_by(model.price, model.id).limit(limit)
+    if before is not None:
+        return query.where((model.price < before[0]) | ((model.price == before[0]) & (model.id < before[1]))) \
+            .order_by(model.price.desc(), model.id.desc()).limit(limit)
+    return query.order_by(model.price, model.id).limit(limit).offset(offset)
+
+
+def _count_in_range_by_price(key: str, min_price: int, max_price: int) -> int:
+    """
+    Функция возвращает количество записей в заданной таблице, где значения цены находятся в заданном диапазоне.
+
+    :param: key - наименование компонента.
+    :type: str
+    :param: min_price - минимальное значение цены.
+    :type: int
+    :param: max_price - максимальное значение цены.
+    :type: int
+    :return: - количество записей.
+    :rtype: int
+    """
+    model = computer_components[key]
+    return db_records_in_range(db, model, model.price, min_price, max_price).order_by().count()
 
 
 def _records_by_user_id(user_id: int) -> ModelSelect:
@@ -253,6 +825,257 @@ def _records_by_user_id(user_id: int) -> ModelSelect:
                                       user_id, history['history'].created_at, sorting_direction=True)
 
 
+def _read_captions(key: str, ids: List[str]) -> Dict[str, str]:
+    """
+    Функция читает из базы данных подписи записей компонента текущей версии шаблона.
+
+    :param: key - наименование компонента.
+    :type: str
+    :param: ids - идентификаторы записей.
+    :type: List[str]
+    :return: - словарь подписей. Ключ - идентификатор записи, значение - текст подписи.
+    :rtype: Dict[str, str]
+    """
+    if not ids:
+        return dict()
+    model = caption['caption']
+    retrieved = db_read(db, model, model.record_id, model.caption).where(
+        (model.computer_component == key) & (model.version == CAPTION_TEMPLATE_VERSION) &
+        model.record_id.in_(ids))
+    return {record_id: text for record_id, text in retrieved.tuples()}
+
+
+def _save_captions(key: str, captions: Dict[str, str]) -> None:
+    """
+    Функция сохраняет в базу данных подписи записей компонента (текущей версии шаблона).
+
+    :param: key - наименование компонента.
+    :type: str
+    :param: captions - словарь подписей. Ключ - идентификатор записи, значение - текст подписи.
+    :type: Dict[str, str]
+    """
+    data = [{'computer_component': key, 'record_id': record_id, 'version': CAPTION_TEMPLATE_VERSION,
+             'caption': text} for record_id, text in captions.items()]
+    try:
+        db_upsert(db, caption['caption'], data)
+    except IntegrityError as exc:
+        logger.error('%s: подписи записей не сохранены\n%s %s', key, exc, type(exc))
+
+
+def _save_subscription(user_id: int, key: str, price_from: int, price_up_to: int) -> None:
+    """
+    Функция сохраняет подписку пользователя на снижение стоимости компонента в заданном диапазоне цен.
+
+    :param: user_id - ID пользователя (чата).
+    :type: int
+    :param: key - наименование компонента.
+    :type: str
+    :param: price_from - стоимость от (в центах).
+    :type: int
+    :param: price_up_to - стоимость до (в центах).
+    :type: int
+    """
+    db_upsert(db, subscription['subscription'], [{'user_id': user_id, 'computer_component': key,
+                                                  'price_from': price_from, 'price_up_to': price_up_to,
+                                                  'created_at': datetime.now()}])
+
+
+def _subscriptions_by_user_id(user_id: int) -> List[Dict]:
+    """
+    Функция возвращает подписки пользователя (по дате подписки).
+
+    :param: user_id - ID пользователя (чата).
+    :type: int
+    :return: - список словарей с ключами computer_component, price_from, price_up_to.
+    :rtype: List[Dict]
+    """
+    model = subscription['subscription']
+    retrieved = db_read(db, model, model.computer_component, model.price_from, model.price_up_to).where(
+        model.user_id == user_id).order_by(model.created_at)
+    return list(retrieved.dicts())
+
+
+def _delete_subscriptions(user_id: int, key: Optional[str] = None) -> int:
+    """
+    Функция удаляет подписки пользователя (все или по заданному компоненту).
+
+    :param: user_id - ID пользователя (чата).
+    :type: int
+    :param: key - наименование компонента (по умолчанию None - все подписки).
+    :type: Optional[str]
+    :return: - количество удаленных подписок.
+    :rtype: int
+    """
+    model = subscription['subscription']
+    if key is None:
+        return db_delete_by_values(db, model, model.user_id, [user_id])
+    return db_delete_by_values(db, model, model.user_id, [user_id], model.computer_component == key)
+
+
+def _read_subscriptions(key: str) -> List[Tuple[int, int, int]]:
+    """
+    Функция читает из базы данных все подписки на заданный компонент (одним запросом, кортежами).
+
+    :param: key - наименование компонента.
+    :type: str
+    :return: - список кортежей (ID пользователя, стоимость от, стоимость до).
+    :rtype: List[Tuple[int, int, int]]
+    """
+    model = subscription['subscription']
+    retrieved = db_read(db, model, model.user_id, model.price_from, model.price_up_to).where(
+        model.computer_component == key)
+    return list(retrieved.tuples())
+
+
+def _read_price_drops(key: str, since: datetime) -> Dict[str, Tuple[int, int]]:
+    """
+    Функция читает из журнала PriceChange снижения стоимости записей компонента, начиная с заданного времени.
+    Если стоимость записи изменялась несколько раз, сравниваются первая прежняя и последняя новая стоимость.
+
+    :param: key - наименование компонента.
+    :type: str
+    :param: since - время, начиная с которого читаются изменения стоимости.
+    :type: datetime
+    :return: - словарь снижений стоимости. Ключ - идентификатор записи, значение - прежняя и новая стоимость.
+    :rtype: Dict[str, Tuple[int, int]]
+    """
+    model = price_change['price_change']
+    retrieved = db_read(db, model, model.record_id, model.price_old, model.price_new).where(
+        (model.computer_component == key) & (model.changed_at >= since)).order_by(model.changed_at, model.id)
+    changes: Dict[str, Tuple[int, int]] = dict()
+    for record_id, price_old, price_new in retrieved.tuples():
+        changes[record_id] = (changes.get(record_id, (price_old,))[0], price_new)
+    return {record_id: prices for record_id, prices in changes.items() if prices[1] < prices[0]}
+
+
+def _records_by_ids(key: str, ids: List[str]) -> List:
+    """
+    Функция возвращает записи компонента с заданными идентификаторами (легкие записи модели).
+
+    :param: key - наименование компонента.
+    :type: str
+    :param: ids - идентификаторы записей.
+    :type: List[str]
+    :return: - записи компонента (отсутствующие в базе данных идентификаторы пропускаются).
+    :rtype: List
+    """
+    model = computer_components[key]
+    records: List = list()
+    for batch in chunked(ids, SQLITE_MAX_VARIABLES):
+        records.extend(load_query_in_rows(db_read(db, model).where(model.id.in_(batch))))
+    return records
+
+
+def _fill_compatibility_index(key: str) -> int:
+    """
+    Функция добавляет в индекс совместимости записи компонента, отсутствующие в индексе (например, записи,
+    загруженные до появления индекса). Записи выбираются по идентификатору, которого нет в индексе
+    (NOT IN по индексу), и обрабатываются пакетами. Записи без атрибутов совместимости проверяются повторно
+    при каждом вызове. Далее индекс обновляется при загрузке данных с API и загрузке каталога из файла.
+
+    :param: key - наименование компонента.
+    :type: str
+    :return: - количество добавленных в индекс атрибутов (0 - все записи есть в индексе
+    или совместимость для компонента не определяется).
+    :rtype: int
+    """
+    if key not in COMPATIBILITY_ATTRIBUTES:
+        return 0
+    model = computer_components[key]
+    model_compatibility = compatibility['compatibility']
+    indexed = model_compatibility.select(model_compatibility.record_id).where(
+        model_compatibility.computer_component == key)
+    missing = db_read(db, model).where(model.id.not_in(indexed)).dicts()
+    number_values: int = 0
+    for batch in chunked(missing.iterator(), SQLITE_MAX_VARIABLES):
+        data = compatibility_rows(key, batch)
+        db_upsert(db, model_compatibility, data)
+        number_values += len(data)
+    return number_values
+
+
+def _read_compatibility(key: str, record_id: str) -> Dict[str, str]:
+    """
+    Функция читает из индекса совместимости атрибуты записи компонента.
+
+    :param: key - наименование компонента.
+    :type: str
+    :param: record_id - идентификатор записи.
+    :type: str
+    :return: - словарь атрибутов. Ключ - атрибут совместимости, значение - нормализованное значение.
+    :rtype: Dict[str, str]
+    """
+    model = compatibility['compatibility']
+    retrieved = db_read(db, model, model.attribute, model.value).where(
+        (model.computer_component == key) & (model.record_id == record_id))
+    return {attribute: value for attribute, value in retrieved.tuples()}
+
+
+def _compatible_records(key: str, attribute: str, value: str, limit: int) -> Tuple[int, List]:
+    """
+    Функция возвращает записи компонента с заданным значением атрибута совместимости
+    (поиск по индексу совместимости, время выполнения зависит только от количества совпадений).
+
+    :param: key - наименование компонента.
+    :type: str
+    :param: attribute - атрибут совместимости.
+    :type: str
+    :param: value - нормализованное значение атрибута.
+    :type: str
+    :param: limit - максимальное количество возвращаемых записей.
+    :type: int
+    :return: - количество совместимых записей (с ценой больше 0) и самые дешевые из них (легкие записи модели,
+    упорядочены по цене и идентификатору).
+    :rtype: Tuple[int, List]
+    """
+    model = computer_components[key]
+    model_compatibility = compatibility['compatibility']
+    query = db_read(db, model).join(model_compatibility, on=(model_compatibility.record_id == model.id)).where(
+        (model_compatibility.computer_component == key) & (model_compatibility.attribute == attribute) &
+        (model_compatibility.value == value) & (model.price > 0))
+    return query.count(), load_query_in_rows(query.order_by(model.price, model.id).limit(limit))
+
+
+def _acquire_lease(name: str, holder: str, ttl: float) -> bool:
+    """
+    Функция получает или продлевает аренду. Аренда получается, если ее нет, срок аренды истек
+    или аренду уже удерживает тот же держатель. Проверка и запись выполняются одним запросом (UPSERT).
+
+    :param: name - наименование аренды.
+    :type: str
+    :param: holder - идентификатор процесса-держателя.
+    :type: str
+    :param: ttl - срок аренды (в секундах).
+    :type: float
+    :return: - True: аренду удерживает holder. False: аренду удерживает другой процесс.
+    :rtype: bool
+    """
+    model = lease['lease']
+    date_now: datetime = datetime.now()
+    with db.atomic():
+        model.insert(name=name, holder=holder, expires_at=date_now + timedelta(seconds=ttl),
+                     updated_at=date_now).on_conflict(
+            conflict_target=[model.name],
+            update={model.holder: EXCLUDED.holder, model.expires_at: EXCLUDED.expires_at,
+                    model.updated_at: EXCLUDED.updated_at},
+            where=(model.expires_at < date_now) | (model.holder == holder)).execute()
+        current_holder = db_read(db, model, model.holder).where(model.name == name).scalar()
+    return current_holder == holder
+
+
+def _release_lease(name: str, holder: str) -> None:
+    """
+    Функция освобождает аренду (если ее удерживает заданный держатель).
+
+    :param: name - наименование аренды.
+    :type: str
+    :param: holder - идентификатор процесса-держателя.
+    :type: str
+    """
+    model = lease['lease']
+    db_delete_by_values(db, model, model.name, [name], model.holder == holder)
+
+
 class ComputerComponentDatabase:
     """
     Класс ComputerComponentDatabase -
@@ -263,6 +1086,18 @@ class ComputerComponentDatabase:
     def load():
         return _load_data
 
+    @staticmethod
+    def store_record_indexes():
+        return _store_record_indexes
+
+    @staticmethod
+    def delete_record_indexes():
+        return _delete_record_indexes
+
+    @staticmethod
+    def read_checkpoints():
+        return _read_checkpoints
+
     @staticmethod
     def load_update_table():
         return _load_update_table
@@ -295,10 +1130,74 @@ class ComputerComponentDatabase:
     def records_in_range_by_price():
         return _records_in_range_by_price
 
+    @staticmethod
+    def columns_in_range_by_price():
+        return _columns_in_range_by_price
+
+    @staticmethod
+    def records_page_by_price():
+        return _records_page_by_price
+
+    @staticmethod
+    def count_in_range_by_price():
+        return _count_in_range_by_price
+
     @staticmethod
     def records_by_user_id():
         return _records_by_user_id
 
+    @staticmethod
+    def read_captions():
+        return _read_captions
+
+    @staticmethod
+    def save_captions():
+        return _save_captions
+
+    @staticmethod
+    def fill_compatibility_index():
+        return _fill_compatibility_index
+
+    @staticmethod
+    def read_compatibility():
+        return _read_compatibility
+
+    @staticmethod
+    def compatible_records():
+        return _compatible_records
+
+    @staticmethod
+    def save_subscription():
+        return _save_subscription
+
+    @staticmethod
+    def subscriptions_by_user_id():
+        return _subscriptions_by_user_id
+
+    @staticmethod
+    def delete_subscriptions():
+        return _delete_subscriptions
+
+    @staticmethod
+    def read_subscriptions():
+        return _read_subscriptions
+
+    @staticmethod
+    def read_price_drops():
+        return _read_price_drops
+
+    @staticmethod
+    def records_by_ids():
+        return _records_by_ids
+
+    @staticmethod
+    def acquire_lease():
+        return _acquire_lease
+
+    @staticmethod
+    def release_lease():
+        return _release_lease
+
 
 if __name__ == "__main__":
     ComputerComponentDatabase()
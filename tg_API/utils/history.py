@@ -1,16 +1,17 @@
 from typing import List, Dict
 from telebot import TeleBot
 from telebot.types import Message
-from settings import SiteSettings
+from settings import get_settings
 from tg_API.common.printing_records import read_and_output_history
 
 # Общие параметры
-site = SiteSettings()
+site = get_settings()
 # Количество одновременно выводимых в чат записей (шаг вывода)
 max_number_records: int = site.max_number_records
 
 
-def history(bot: TeleBot, message: Message, menu: Dict, parameters: Dict, history_info: List[Dict]) -> None:
+def history(bot: TeleBot, message: Message, menu: Dict, parameters: Dict, history_info: List[Dict],
+            is_edit: bool = False) -> None:
     """
     Функция history выводит истории запросов пользователей.
 
@@ -25,5 +26,8 @@ def history(bot: TeleBot, message: Message, menu: Dict, parameters: Dict, histor
     :type: Dict
     :param: history_info - список словарей с информацией по истории запросов.
     :type: List[Dict]
+    :param: is_edit - True: страница истории выводится редактированием сообщения message (режим "edit").
+    Значение по умолчанию False.
+    :type: bool
     """
-    read_and_output_history(bot, message, menu, parameters, max_number_records, history_info)
+    read_and_output_history(bot, message, menu, parameters, max_number_records, history_info, is_edit)
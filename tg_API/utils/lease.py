@@ -0,0 +1,108 @@
+from typing import Callable, Optional
+from os import getpid
+from socket import gethostname
+from threading import Event, Thread
+from time import sleep
+from uuid import uuid4
+from log.logging import Logging
+
+# Подготовка к записи ошибок в лог файл
+logger = Logging('db', file_name='db.log').get_logger()
+
+
+class LeaseKeeper:
+    """
+    Класс LeaseKeeper - получение и удержание аренды в базе данных (например, аренды загрузки данных с API):
+    ожидание аренды, продление аренды в отдельном потоке каждую треть срока и освобождение аренды.
+    Если продлить аренду не удалось (аренду получил другой процесс), аренда отмечается как потерянная
+    (см. is_lost - проверяется загрузкой данных перед каждой страницей) и вызывается функция on_lost.
+
+    Args:
+    name (str): наименование аренды
+    ttl (float): срок аренды (в секундах)
+    acquire (Callable[[str, str, float], bool]): функция получения (продления) аренды
+    release (Callable[[str, str], None]): функция освобождения аренды
+
+    Attributes:
+    holder (str): идентификатор процесса-держателя (хост:pid:случайный суффикс)
+    """
+    def __init__(self, name: str, ttl: float, acquire: Callable[[str, str, float], bool],
+                 release: Callable[[str, str], None]) -> None:
+        self.name = name
+        self.ttl = ttl
+        self.holder = f'{gethostname()}:{getpid()}:{uuid4().hex[:8]}'
+        self._acquire = acquire
+        self._release = release
+        self._stop_renewal: Optional[Event] = None
+        self._lost = Event()
+
+    @property
+    def interval(self) -> float:
+        return max(self.ttl / 3, 0.1)
+
+    def is_lost(self) -> bool:
+        """
+        Метод возвращает признак потери аренды (продлить аренду не удалось после вызова keep).
+
+        :return: - True: аренда потеряна, запись в базу данных от имени держателя аренды нужно прекратить.
+        :rtype: bool
+        """
+        return self._lost.is_set()
+
+    def acquire(self) -> bool:
+        """
+        Метод получает или продлевает аренду.
+
+        :return: - True: аренда получена. False: аренду удерживает другой процесс (или ошибка базы данных).
+        :rtype: bool
+        """
+        try:
+            return self._acquire(self.name, self.holder, self.ttl)
+        except Exception as exc:
+            logger.error('%s: ошибка получения аренды\n%s %s', self.name, exc, type(exc))
+            return False
+
+    def wait(self) -> None:
+        """
+        Метод ожидает получения аренды (попытки повторяются каждую треть срока аренды).
+
+        """
+        if self.acquire():
+            return
+        logger.info('%s: аренду удерживает другой процесс, ожидание аренды', self.name)
+        sleep(self.interval)
+        while not self.acquire():
+            sleep(self.interval)
+
+    def keep(self, on_lost: Callable[[], None]) -> None:
+        """
+        Метод запускает продление аренды в отдельном потоке.
+
+        :param: on_lost - функция, вызываемая при потере аренды.
+        :type: Callable[[], None]
+        """
+        stop_renewal = self._stop_renewal = Event()
+        self._lost.clear()
+
+        def renew() -> None:
+            while not stop_renewal.wait(self.interval):
+                if not self.acquire():
+                    logger.error('%s: аренда потеряна (%s)', self.name, self.holder)
+                    self._lost.set()
+                    on_lost()
+                    return
+
+        Thread(target=renew, name=f'lease {self.name}', daemon=True).start()
+
+    def release(self) -> None:
+        """
+        Метод останавливает продление и освобождает аренду.
+
+        """
+        if self._stop_renewal is not None:
+            self._stop_renewal.set()
+            self._stop_renewal = None
+        try:
+            self._release(self.name, self.holder)
+        except Exception as exc:
+            logger.error('%s: ошибка освобождения аренды\n%s %s', self.name, exc, type(exc))
@@ -1,12 +1,12 @@
 from typing import Dict
 from telebot import TeleBot
 from telebot.types import Message
-from settings import SiteSettings
+from settings import get_settings
 from tg_API.utils.db import ComputerComponentDatabase
 from tg_API.common.printing_records import request_and_output_records_by_price
 
 # Общие параметры
-site = SiteSettings()
+site = get_settings()
 # Количество одновременно выводимых в чат записей (шаг вывода)
 max_number_records: int = site.max_number_records
 
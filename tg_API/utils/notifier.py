@@ -0,0 +1,104 @@
+from typing import Iterable, Optional, Tuple
+from queue import Queue
+from threading import Lock, Thread
+from requests.exceptions import RequestException
+from telebot import TeleBot
+from telebot.apihelper import ApiTelegramException
+from site_API.utils.rate_limit import RequestBudget, TOO_MANY_REQUESTS
+from log.logging import Logging
+
+# Количество попыток отправки уведомления (ответ 429 или ошибка соединения)
+MAX_ATTEMPTS = 5
+# Пауза при ответе 429 без параметра retry_after (в секундах)
+DEFAULT_RETRY_AFTER = 1.0
+# Подготовка к записи ошибок в лог файл
+logger = Logging('main').get_logger()
+
+
+class NotificationSender:
+    """
+    Класс NotificationSender - отправка уведомлений пользователям с ограничением частоты отправки.
+    Пакеты уведомлений помещаются в очередь и отправляются в отдельном потоке не чаще заданного
+    количества сообщений в секунду (общий лимит Telegram Bot API для рассылок). Ответ 429
+    приостанавливает отправку на время retry_after, уведомление отправляется повторно.
+
+    Args:
+    bot (TeleBot): телеграм бот
+    messages_per_second (float): количество сообщений в секунду
+    burst (int): максимальное количество сообщений, отправляемых без паузы (по умолчанию 1)
+    """
+    def __init__(self, bot: TeleBot, messages_per_second: float, burst: int = 1) -> None:
+        self._bot = bot
+        self._budget = RequestBudget(int(messages_per_second * 60), burst)
+        self._queue: Queue = Queue()
+        self._lock = Lock()
+        self._thread: Optional[Thread] = None
+
+    @property
+    def pending(self) -> int:
+        return self._queue.unfinished_tasks
+
+    def send_batch(self, messages: Iterable[Tuple[int, str]]) -> int:
+        """
+        Метод помещает пакет уведомлений в очередь отправки.
+
+        :param: messages - уведомления: ID чата и текст сообщения (Markdown).
+        :type: Iterable[Tuple[int, str]]
+        :return: - количество уведомлений в пакете.
+        :rtype: int
+        """
+        number_messages: int = 0
+        for chat_id, text in messages:
+            self._queue.put((chat_id, text))
+            number_messages += 1
+        if number_messages:
+            self._start()
+        return number_messages
+
+    def join(self) -> None:
+        """
+        Метод ожидает отправки всех уведомлений из очереди.
+
+        """
+        self._queue.join()
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = Thread(target=self._run, name='notifications', daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            chat_id, text = self._queue.get()
+            try:
+                self._deliver(chat_id, text)
+            finally:
+                self._queue.task_done()
+
+    def _deliver(self, chat_id: int, text: str) -> bool:
+        """
+        Метод отправляет уведомление (с повтором после ответа 429 и ошибок соединения).
+
+        :param: chat_id - ID чата.
+        :type: int
+        :param: text - текст сообщения (Markdown).
+        :type: str
+        :return: - True: уведомление отправлено.
+        :rtype: bool
+        """
+        for _ in range(MAX_ATTEMPTS):
+            self._budget.acquire()
+            try:
+                self._bot.send_message(chat_id, text, parse_mode='Markdown', disable_web_page_preview=True)
+                return True
+            except ApiTelegramException as exc:
+                if exc.error_code != TOO_MANY_REQUESTS:
+                    logger.warning('Уведомление не отправлено, чат %s\n%s %s', chat_id, exc, type(exc))
+                    return False
+                parameters = (exc.result_json or dict()).get('parameters') or dict()
+                self._budget.pause(float(parameters.get('retry_after', DEFAULT_RETRY_AFTER)))
+            except RequestException as exc:
+                logger.warning('Ошибка отправки уведомления, чат %s\n%s %s', chat_id, exc, type(exc))
+        logger.error('Уведомление не отправлено после %s попыток, чат %s', MAX_ATTEMPTS, chat_id)
+        return False
@@ -0,0 +1,133 @@
+from typing import Callable, Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from heapq import heappush, heappop
+from threading import Condition
+from log.logging import Logging
+
+# Пауза перед повторным обновлением компонента после ошибки обновления
+# (как при ошибке загрузки данных API в refresh_component)
+RETRY_DELAY = timedelta(days=1)
+# Подготовка к записи ошибок в лог файл
+logger = Logging('db', file_name='db.log').get_logger()
+
+
+class RefreshScheduler:
+    """
+    Класс RefreshScheduler - планировщик обновления компьютерных компонентов.
+    Обновления выполняются параллельно в пуле потоков по наступлении времени следующего обновления
+    каждого компонента. Время ожидания определяется ближайшим временем обновления.
+
+    Args:
+    refresh (Callable[[str], datetime]): функция обновления компонента,
+    возвращает время следующего обновления компонента
+    max_workers (int): количество компонентов, обновляемых одновременно
+    retry_delay (timedelta): пауза перед повторным обновлением компонента, если функция обновления
+    завершилась исключением (по умолчанию RETRY_DELAY)
+    """
+    def __init__(self, refresh: Callable[[str], datetime], max_workers: int,
+                 retry_delay: timedelta = RETRY_DELAY) -> None:
+        self._refresh = refresh
+        self._max_workers = max_workers
+        self._retry_delay = retry_delay
+        self._condition = Condition()
+        self._queue: List[Tuple[datetime, str]] = list()
+        self._progress: Dict[str, Dict] = dict()
+        self._running: int = 0
+        self._stopped: bool = False
+
+    def schedule(self, computer_component: str, due_time: datetime) -> None:
+        """
+        Метод добавляет компонент в очередь обновлений.
+
+        :param: computer_component - наименование компьютерного компонента.
+        :type: str
+        :param: due_time - время обновления компонента.
+        :type: datetime
+        """
+        with self._condition:
+            heappush(self._queue, (due_time, computer_component))
+            self._progress[computer_component] = {'state': 'waiting', 'due_time': due_time,
+                                                  'started_at': None, 'records': 0}
+            self._condition.notify()
+
+    def report_page(self, computer_component: str, number_records: int) -> None:
+        """
+        Метод сохраняет количество полученных записей обновляемого компонента.
+
+        :param: computer_component - наименование компьютерного компонента.
+        :type: str
+        :param: number_records - количество полученных записей.
+        :type: int
+        """
+        with self._condition:
+            self._progress[computer_component]['records'] = number_records
+
+    def progress(self) -> Dict[str, Dict]:
+        """
+        Метод возвращает состояние обновления компонентов.
+
+        :return: - словарь состояний. Ключ - наименование компонента, значение - словарь с ключами:
+        state - состояние ('waiting' - ожидает обновления, 'running' - обновляется),
+        due_time - время обновления, started_at - время начала обновления,
+        records - количество полученных записей.
+        :rtype: Dict[str, Dict]
+        """
+        with self._condition:
+            return {key: dict(value) for key, value in self._progress.items()}
+
+    def stop(self) -> None:
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+
+    def reset(self) -> None:
+        """
+        Метод очищает очередь обновлений и снимает остановку (для повторного запуска цикла обновления).
+
+        """
+        with self._condition:
+            self._queue.clear()
+            self._progress.clear()
+            self._stopped = False
+
+    def _run_refresh(self, computer_component: str) -> None:
+        try:
+            due_time = self._refresh(computer_component)
+        except Exception as exc:
+            due_time = datetime.now() + self._retry_delay
+            logger.exception('%s: ошибка обновления, повторное обновление %s\n%s %s',
+                             computer_component, due_time, exc, type(exc))
+        with self._condition:
+            self._running -= 1
+            heappush(self._queue, (due_time, computer_component))
+            self._progress[computer_component].update(state='waiting', due_time=due_time)
+            self._condition.notify()
+
+    def _next_due(self) -> Optional[str]:
+        with self._condition:
+            while not self._stopped:
+                now = datetime.now()
+                if self._running >= self._max_workers or not self._queue:
+                    self._condition.wait()
+                elif self._queue[0][0] <= now:
+                    due_time, computer_component = heappop(self._queue)
+                    self._progress[computer_component].update(state='running', started_at=now, records=0)
+                    self._running += 1
+                    return computer_component
+                else:
+                    self._condition.wait((self._queue[0][0] - now).total_seconds())
+        return None
+
+    def run(self) -> None:
+        """
+        Метод запускает цикл обновления компонентов. Завершается после вызова метода stop.
+
+        """
+        with ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix='refresh') as executor:
+            while True:
+                computer_component = self._next_due()
+                if computer_component is None:
+                    break
+                logger.info('%s: начато обновление данных с API', computer_component)
+                executor.submit(self._run_refresh, computer_component)
@@ -0,0 +1,217 @@
+from typing import List, Dict, Optional, Tuple
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from re import compile
+from telebot import TeleBot
+from telebot.types import Message
+from settings import get_settings
+from tg_API.utils.db import ComputerComponentDatabase
+from tg_API.utils.notifier import NotificationSender
+from tg_API.common.captions import render_caption
+from tg_API.common.inline_query import parse_inline_query, PRICE_RANGE
+from tg_API.common.markup_and_output import send_message
+from log.logging import Logging
+
+# Общие параметры
+site = get_settings()
+# Максимальное количество подписок одного пользователя
+max_subscriptions: int = site.max_subscriptions
+# Количество записей в уведомлении о снижении стоимости
+max_number_records: int = site.max_number_records
+# Верхняя граница цены в конце текста подписки (в долларах), например: gpu 300
+PRICE_THRESHOLD = compile(r'(\d+)\s*$')
+# Подсказка по команде /watch
+WATCH_USAGE = "/watch <компонент> <цена до> или /watch <компонент> <цена от>-<цена до> - " \
+              "уведомлять о снижении стоимости компонента в диапазоне цен (в долларах)\n" \
+              "Например: /watch gpu 300 или /watch процессор 100-250\n" \
+              "/unwatch [компонент] - удалить подписки"
+# Подготовка к записи ошибок в лог файл
+logger = Logging('main').get_logger()
+
+
+def _command_text(message: Message) -> str:
+    parts = (message.text or '').split(maxsplit=1)
+    return parts[1] if len(parts) > 1 else ''
+
+
+def parse_watch_query(text: str, names_computer_components: Dict[str, str]) -> Optional[Tuple[str, int, int]]:
+    """
+    Функция разбирает текст подписки: компьютерный компонент и диапазон цен или верхняя граница цены в долларах.
+
+    :param: text - текст подписки (например: 'gpu 300' или 'gpu 200-300').
+    :type: str
+    :param: names_computer_components - словарь наименований компьютерных компонентов для отображения.
+    :type: Dict[str, str]
+    :return: - компьютерный компонент, цена от и цена до (в центах)
+    или None, если компонент не найден или цена не задана.
+    :rtype: Optional[Tuple[str, int, int]]
+    """
+    if not PRICE_RANGE.search(text):
+        threshold = PRICE_THRESHOLD.search(text)
+        if threshold is None:
+            return None
+        text = f'{text[:threshold.start()]} 0-{threshold.group(1)}'
+    return parse_inline_query(text, names_computer_components)
+
+
+def _price_range_text(price_from: int, price_up_to: int) -> str:
+    if price_from == 0:
+        return f'до {price_up_to / 100}$'
+    return f'от {price_from / 100}$ до {price_up_to / 100}$'
+
+
+def watch(bot: TeleBot, message: Message, names_computer_components: Dict[str, str]) -> None:
+    """
+    Функция watch сохраняет подписку пользователя на снижение стоимости компонента в диапазоне цен.
+    Без параметров выводит подписки пользователя.
+
+    :param: bot - телеграм бот.
+    :type: TeleBot
+    :param: message - объект из telebot, содержащий информацию о сообщении.
+    :type: Message
+    :param: names_computer_components - словарь наименований компьютерных компонентов для отображения.
+    :type: Dict[str, str]
+    """
+    db_subscriptions_by_user_id = ComputerComponentDatabase.subscriptions_by_user_id()
+    subscriptions = db_subscriptions_by_user_id(message.chat.id)
+    text = _command_text(message)
+    if not text:
+        if subscriptions:
+            lines = [f'{index}. {names_computer_components.get(element["computer_component"])} '
+                     f'{_price_range_text(element["price_from"], element["price_up_to"])}'
+                     for index, element in enumerate(subscriptions, 1)]
+            send_message(bot, message, '\n'.join(('Ваши подписки:', *lines)))
+        else:
+            send_message(bot, message, '\n'.join(('Подписок нет', WATCH_USAGE)))
+        return
+
+    parsed = parse_watch_query(text, names_computer_components)
+    if parsed is None:
+        send_message(bot, message, '\n'.join(('Не понял подписку', WATCH_USAGE)))
+        return
+    key, price_from, price_up_to = parsed
+    is_new = {'computer_component': key, 'price_from': price_from, 'price_up_to': price_up_to} not in subscriptions
+    if is_new and len(subscriptions) >= max_subscriptions:
+        send_message(bot, message, f'Не более {max_subscriptions} подписок. /unwatch - удалить подписки')
+        return
+    ComputerComponentDatabase.save_subscription()(message.chat.id, key, price_from, price_up_to)
+    send_message(bot, message, f'{names_computer_components[key]}: сообщу о снижении стоимости '
+                               f'{_price_range_text(price_from, price_up_to)}')
+
+
+def unwatch(bot: TeleBot, message: Message, names_computer_components: Dict[str, str]) -> None:
+    """
+    Функция unwatch удаляет подписки пользователя (все или по заданному компоненту).
+
+    :param: bot - телеграм бот.
+    :type: TeleBot
+    :param: message - объект из telebot, содержащий информацию о сообщении.
+    :type: Message
+    :param: names_computer_components - словарь наименований компьютерных компонентов для отображения.
+    :type: Dict[str, str]
+    """
+    db_delete_subscriptions = ComputerComponentDatabase.delete_subscriptions()
+    text = _command_text(message)
+    if not text:
+        number_deleted = db_delete_subscriptions(message.chat.id)
+    else:
+        parsed = parse_inline_query(text, names_computer_components)
+        if parsed is None:
+            send_message(bot, message, '\n'.join(('Компонент не найден', WATCH_USAGE)))
+            return
+        number_deleted = db_delete_subscriptions(message.chat.id, parsed[0])
+    send_message(bot, message, f'Удалено подписок: {number_deleted}')
+
+
+def match_subscriptions(subscriptions: List[Tuple[int, int, int]],
+                        prices: List[int]) -> Dict[int, List[Tuple[int, int]]]:
+    """
+    Функция сопоставляет подписки с новыми ценами записей за один проход по подпискам:
+    для каждой подписки границы диапазона цен ищутся бинарным поиском в упорядоченном списке цен,
+    время выполнения - O(количество подписок * log(количество цен)).
+
+    :param: subscriptions - подписки: ID пользователя, стоимость от, стоимость до.
+    :type: List[Tuple[int, int, int]]
+    :param: prices - новые цены записей (по возрастанию).
+    :type: List[int]
+    :return: - словарь совпадений. Ключ - ID пользователя, значение - объединенные диапазоны индексов
+    списка цен [начало, конец) по возрастанию.
+    :rtype: Dict[int, List[Tuple[int, int]]]
+    """
+    matches: Dict[int, List[Tuple[int, int]]] = dict()
+    for user_id, price_from, price_up_to in subscriptions:
+        left = bisect_left(prices, price_from)
+        right = bisect_right(prices, price_up_to, left)
+        if left < right:
+            matches.setdefault(user_id, list()).append((left, right))
+
+    for user_id, ranges in matches.items():
+        if len(ranges) > 1:
+            ranges.sort()
+            merged: List[Tuple[int, int]] = [ranges[0]]
+            for left, right in ranges[1:]:
+                if left <= merged[-1][1]:
+                    merged[-1] = (merged[-1][0], max(merged[-1][1], right))
+                else:
+                    merged.append((left, right))
+            matches[user_id] = merged
+    return matches
+
+
+def _first_indexes(ranges: List[Tuple[int, int]], number: int) -> List[int]:
+    indexes: List[int] = list()
+    for left, right in ranges:
+        indexes.extend(range(left, min(right, left + number - len(indexes))))
+        if len(indexes) >= number:
+            break
+    return indexes
+
+
+def notify_price_drops(sender: NotificationSender, key: str, since: datetime, name: str) -> int:
+    """
+    Функция отправляет пользователям уведомления о снижении стоимости записей компонента после загрузки данных.
+    Снижения стоимости читаются из журнала PriceChange, подписки на компонент - одним запросом,
+    пользователь получает одно сообщение с самыми дешевыми записями из диапазонов цен своих подписок.
+
+    :param: sender - отправка уведомлений с ограничением частоты.
+    :type: NotificationSender
+    :param: key - наименование компонента.
+    :type: str
+    :param: since - время начала загрузки данных.
+    :type: datetime
+    :param: name - наименование компонента для отображения в чате.
+    :type: str
+    :return: - количество уведомлений.
+    :rtype: int
+    """
+    drops = ComputerComponentDatabase.read_price_drops()(key, since)
+    if not drops:
+        return 0
+    subscriptions = ComputerComponentDatabase.read_subscriptions()(key)
+    if not subscriptions:
+        return 0
+
+    items: List[Tuple[int, str, int]] = sorted((price_new, record_id, price_old)
+                                               for record_id, (price_old, price_new) in drops.items())
+    matches = match_subscriptions(subscriptions, [item[0] for item in items])
+    shown: Dict[int, List[int]] = {user_id: _first_indexes(ranges, max_number_records)
+                                   for user_id, ranges in matches.items()}
+    ids = sorted({items[index][1] for indexes in shown.values() for index in indexes})
+    records = {record.id: record for record in ComputerComponentDatabase.records_by_ids()(key, ids)}
+
+    messages: List[Tuple[int, str]] = list()
+    for user_id, indexes in shown.items():
+        lines: List[str] = list()
+        for price_new, record_id, price_old in (items[index] for index in indexes):
+            record = records.get(record_id)
+            if record is not None:
+                lines.append(f'{render_caption(record.title, record.link, price_new)} (было {price_old / 100}$)')
+        if not lines:
+            continue
+        number_matched = sum(right - left for left, right in matches[user_id])
+        messages.append((user_id, '\n'.join((f'{name}: снижение стоимости ({number_matched})', *lines))))
+
+    sender.send_batch(messages)
+    logger.info('%s: снижений стоимости %s, подписок %s, уведомлений %s', key, len(drops), len(subscriptions),
+                len(messages))
+    return len(messages)